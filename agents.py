@@ -1,81 +1,115 @@
 # agents.py
 
+from dataclasses import dataclass
+
 from crewai import Agent
 # IMPORT the new JiraCreateTicketTool
-from tools import JiraFetchIssuesTool, HumanInputTool, JiraCreateTicketTool
-from llm_config import llm
+from tools import JiraFetchIssuesTool, HumanInputTool, JiraCreateTicketTool, JiraBulkCreateTicketsTool
+from llm_config import get_llm
+
+
+@dataclass
+class AgentSet:
+    """One isolated crew: its own agents and tool instances, used by one run at a time."""
+    coordinator: Agent
+    allocator: Agent
+    tracker: Agent
+    reviewer: Agent
+    resolver: Agent
+    reporter: Agent
+
+    def all(self) -> list:
+        return [self.coordinator, self.allocator, self.tracker, self.reviewer, self.resolver, self.reporter]
+
+    def reset(self):
+        """Drops what a run left on the agents, so the next run starts clean."""
+        for agent in self.all():
+            agent.crew = None
+            agent.step_callback = None
+            agent.agent_executor = None
+            if hasattr(agent, "tools_results"):
+                agent.tools_results = []
+
 
 # --- Agent Definitions ---
 
-coordinator = Agent(
-    role='Project Coordinator',
-    goal='Oversee the project, ensuring tasks align with the main goal.',
-    backstory=(
-        "You are a seasoned Project Coordinator... You ensure all agents stay in harmony."
-    ),
-    tools=[],
-    allow_delegation=True,
-    verbose=True,
-    llm=llm
-)
-
-# Allocator agent is now equipped with the Jira Ticket Creator tool
-allocator = Agent(
-  role='Task Allocator',
-  goal='Break down the project plan into granular, actionable sub-tasks and create them in Jira.', # Goal updated
-  backstory=(
-    "You are a meticulous Task Allocator... Your work ensures that everyone knows exactly what they need to do."
-  ),
-  tools=[JiraCreateTicketTool()], # <-- ADDED the new Jira creation tool
-  allow_delegation=False,
-  verbose=True,
-  llm=llm
-)
-
-tracker = Agent(
-  role='Progress Tracker',
-  goal='Monitor the development process, track task status, and report any deviations or blockers.',
-  backstory=(
-    "You are a vigilant Progress Tracker... ensuring the Coordinator always has an accurate picture of the project's status."
-  ),
-  tools=[JiraFetchIssuesTool()],
-  allow_delegation=False,
-  verbose=True,
-  llm=llm
-)
-
-reviewer = Agent(
-  role='Code Reviewer',
-  goal='Analyze code submissions for quality, adherence to standards, and potential bugs.',
-  backstory=(
-    "You are a senior software engineer... ensuring that every line of code is clean, efficient, and bug-free."
-  ),
-  tools=[],
-  allow_delegation=False,
-  verbose=True,
-  llm=llm
-)
-
-resolver = Agent(
-  role='Conflict Resolver',
-  goal='Identify and resolve conflicts, technical blockers, or ambiguities in tasks.',
-  backstory=(
-    "You are the team's troubleshooter... you are responsible for escalating the issue to a human for a final decision."
-  ),
-  tools=[HumanInputTool()],
-  allow_delegation=True,
-  verbose=True,
-  llm=llm
-)
-
-reporter = Agent(
-  role='Reporting Specialist',
-  goal='Compile a final, comprehensive report of the project, including outcomes, metrics, and tasks performed.',
-  backstory=(
-    "You are a Reporting Specialist... summarizing its successes and outcomes."
-  ),
-  tools=[],
-  allow_delegation=False,
-  verbose=True,
-  llm=llm
-)
\ No newline at end of file
+def create_agents(llm=None) -> AgentSet:
+    """
+    Builds a fresh set of agents. Unless `llm` is given, each agent gets a routed model that sends
+    every call to the tier its task or role maps to (see llm_config.MODEL_ROUTES).
+    """
+
+    coordinator = Agent(
+        role='Project Coordinator',
+        goal='Oversee the project, ensuring tasks align with the main goal.',
+        backstory=(
+            "You are a seasoned Project Coordinator... You ensure all agents stay in harmony."
+        ),
+        tools=[],
+        allow_delegation=True,
+        verbose=True,
+        llm=llm or get_llm('Project Coordinator')
+    )
+
+    # Allocator agent is now equipped with the Jira Ticket Creator tool
+    allocator = Agent(
+      role='Task Allocator',
+      goal='Break down the project plan into granular, actionable sub-tasks and create them in Jira.', # Goal updated
+      backstory=(
+        "You are a meticulous Task Allocator... Your work ensures that everyone knows exactly what they need to do."
+      ),
+      tools=[JiraBulkCreateTicketsTool(), JiraCreateTicketTool()], # Bulk creation first; single tickets for follow-ups
+      allow_delegation=False,
+      verbose=True,
+      llm=llm or get_llm('Task Allocator')
+    )
+
+    tracker = Agent(
+      role='Progress Tracker',
+      goal='Monitor the development process, track task status, and report any deviations or blockers.',
+      backstory=(
+        "You are a vigilant Progress Tracker... ensuring the Coordinator always has an accurate picture of the project's status."
+      ),
+      tools=[JiraFetchIssuesTool()],
+      allow_delegation=False,
+      verbose=True,
+      llm=llm or get_llm('Progress Tracker')
+    )
+
+    reviewer = Agent(
+      role='Code Reviewer',
+      goal='Analyze code submissions for quality, adherence to standards, and potential bugs.',
+      backstory=(
+        "You are a senior software engineer... ensuring that every line of code is clean, efficient, and bug-free."
+      ),
+      tools=[],
+      allow_delegation=False,
+      verbose=True,
+      llm=llm or get_llm('Code Reviewer')
+    )
+
+    resolver = Agent(
+      role='Conflict Resolver',
+      goal='Identify and resolve conflicts, technical blockers, or ambiguities in tasks.',
+      backstory=(
+        "You are the team's troubleshooter... you are responsible for escalating the issue to a human for a final decision."
+      ),
+      tools=[HumanInputTool()],
+      allow_delegation=True,
+      verbose=True,
+      llm=llm or get_llm('Conflict Resolver')
+    )
+
+    reporter = Agent(
+      role='Reporting Specialist',
+      goal='Compile a final, comprehensive report of the project, including outcomes, metrics, and tasks performed.',
+      backstory=(
+        "You are a Reporting Specialist... summarizing its successes and outcomes."
+      ),
+      tools=[],
+      allow_delegation=False,
+      verbose=True,
+      llm=llm or get_llm('Reporting Specialist')
+    )
+
+    return AgentSet(coordinator, allocator, tracker, reviewer, resolver, reporter)
@@ -1,25 +1,39 @@
 import os
+from typing import List, Type, Union
 from dotenv import load_dotenv
 from crewai import Agent
-from langchain_community.tools import DuckDuckGoSearchRun
 from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from web_search import SEARCH_MAX_QUERIES, format_results, get_web_search
 
 # Load environment variables
 load_dotenv()
 
-# Define a custom tool for DuckDuckGo search
+class WebSearchArgs(BaseModel):
+    queries: Union[str, List[str]] = Field(
+        description="One or more search queries. Pass every query you need in one call; they run at the same time."
+    )
+
+# Web search over the shared client and result cache in web_search.py
 class DuckDuckGoSearchTool(BaseTool):
     name: str = "Web Search"
-    description: str = "Search the internet for relevant information and articles."
+    description: str = (
+        "Search the internet for relevant information and articles. "
+        f"Accepts up to {SEARCH_MAX_QUERIES} queries at once and returns the results for each."
+    )
+    args_schema: Type[BaseModel] = WebSearchArgs
+
+    @staticmethod
+    def _queries(queries) -> List[str]:
+        return ([queries] if isinstance(queries, str) else list(queries))[:SEARCH_MAX_QUERIES]
 
-    def _run(self, query: str):
-        """Run a DuckDuckGo search with the provided query."""
-        search_tool = DuckDuckGoSearchRun()
-        return search_tool.run(query)
+    def _run(self, queries: Union[str, List[str]]) -> str:
+        """Run the queries concurrently; repeated queries are answered from the cache."""
+        return format_results(get_web_search().search_many(self._queries(queries)))
 
-    async def _arun(self, query: str):
-        # Optional: implement async if needed
-        return self._run(query)
+    async def _arun(self, queries: Union[str, List[str]]) -> str:
+        return format_results(await get_web_search().asearch_many(self._queries(queries)))
 
 # Agent
 coordinator = Agent(
@@ -1,43 +1,36 @@
-import requests
-from requests.auth import HTTPBasicAuth
-from collections import defaultdict
+# Prints every issue of a Jira project grouped by status.
+# A thin CLI over the same paginated fetch the Jira Issue Fetcher tool uses:
+#
+#   python anshul/jira.py [PROJECT_KEY]
+
 import os
+import sys
 from dotenv import load_dotenv
-load_dotenv()
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jira_client import get_jira_client, fetch_status_buckets  # noqa: E402
 
-# Now you can access the environment variable
-api_token = os.getenv("JIRA_API_TOKEN")
-jira_domain = os.getenv("JIRA_DOMAIN")
-email = os.getenv("EMAIL")
-url = os.getenv("URL")
-
+load_dotenv()
 
-query = {
-    'jql': 'project=TEST',
-    'maxResults': 50
-}
+project_key = sys.argv[1] if len(sys.argv) > 1 else 'TEST'
 
-response = requests.get(url, params=query, auth=HTTPBasicAuth(email, api_token))
+jira = get_jira_client()
+if jira is None:
+    sys.exit("Failed to fetch issues. JIRA_DOMAIN, EMAIL and JIRA_API_TOKEN must be set.")
 
-if response.status_code == 200:
-    data = response.json()
-    status_groups = defaultdict(list)
+try:
+    buckets = fetch_status_buckets(jira, project_key)
+except Exception as e:
+    sys.exit(f"Failed to fetch issues. {e}")
 
-    # Group issues by status name
-    for issue in data.get('issues', []):
-        status_name = issue['fields']['status']['name']
-        status_groups[status_name.upper()].append(issue)
+# Define list of statuses to print in desired order
+statuses_to_print = ['TO DO', 'IN PROGRESS', 'DONE']
 
-    # Define list of statuses to print in desired order
-    statuses_to_print = ['TO DO', 'IN PROGRESS', 'DONE']
+# Print issues grouped by status, only for these statuses and in order
+for status in statuses_to_print:
+    print(f"{status}:")
+    for key, summary in buckets.groups.get(status, []):
+        print(f"- {key}: {summary}")
+    print()  # Blank line for spacing
 
-    # Print issues grouped by status, only for these statuses and in order
-    for status in statuses_to_print:
-        print(f"{status}:")
-        for issue in status_groups.get(status, []):
-            print(f"- {issue['key']}: {issue['fields']['summary']}")
-        print()  # Blank line for spacing
-else:
-    print(f"Failed to fetch issues. Status code: {response.status_code}")
-    print(response.text)
\ No newline at end of file
+print(f"{buckets.done}/{buckets.total} issues done ({buckets.progress}%)")
\ No newline at end of file
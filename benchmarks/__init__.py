@@ -0,0 +1 @@
+# Offline benchmarks. Run from the repository root, e.g. `python -m benchmarks.jira_client_latency`.
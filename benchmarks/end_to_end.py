@@ -0,0 +1,206 @@
+# benchmarks/end_to_end.py
+#
+# Drives main.app end to end with no network access: Jira is the local stub server and the
+# model is scripted. With --llm direct (the default) llm_config.llm is the fake model; with
+# --llm routed the agents keep their RoutedLLM and only litellm.completion is faked, so model
+# routing, escalation, the shared rate limiter and the LLM metrics are part of the measurement.
+# Each concurrency level submits a batch of projects through the job API and waits for all of them.
+#
+#   python -m benchmarks.end_to_end --concurrency 1,2,4,8 --requests 8 --token-latency 0.002
+#
+# Results are written as JSON (one file per invocation) so runs can be compared across commits.
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_jira import StubJira
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentiles(values: list) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+    return {"count": len(ordered), "mean": round(statistics.mean(ordered), 4),
+            "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(ordered[-1], 4)}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def configure_offline(stub: StubJira, data_dir: str):
+    # Must run before main/agents/tools are imported: they read these at import time.
+    os.environ.update({
+        "JIRA_DOMAIN": stub.url, "EMAIL": "bench@example.com", "JIRA_API_TOKEN": "token",
+        # Never used: the fake model answers every request before it would reach the provider
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-offline-benchmark"),
+        "DEVBOSS_DATA_DIR": data_dir,
+        # Measure the real work, not cache hits from earlier iterations
+        "LLM_CACHE_PATH": "", "PLAN_LIBRARY_PATH": "",
+    })
+
+
+def install_fake_llm(token_latency: float, first_token_latency: float, tickets: int, routed: bool = False):
+    import llm_config
+    from benchmarks.fake_llm import ScriptedLLM
+
+    fake = ScriptedLLM(token_latency=token_latency, first_token_latency=first_token_latency, tickets=tickets)
+    if routed:
+        llm_config.litellm.completion = fake.completion
+    else:
+        llm_config.llm = fake
+    return fake
+
+
+def start_server(app, port: int = 0):
+    import uvicorn
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+def _http(method: str, url: str, body: dict = None) -> dict:
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=600) as response:
+        return json.load(response)
+
+
+def run_project(base_url: str, goal: str, options: dict, poll_interval: float) -> dict:
+    started = time.perf_counter()
+    job = _http("POST", f"{base_url}/run-project", {"goal": goal, **options})
+    while True:
+        status = _http("GET", f"{base_url}/jobs/{job['job_id']}")
+        if status["status"] in ("succeeded", "failed", "cancelled"):
+            break
+        time.sleep(poll_interval)
+    status["latency"] = time.perf_counter() - started
+    return status
+
+
+def task_durations(event_bus, job_id: str) -> dict:
+    """Per-task durations (by task name, e.g. "plan" and "review" apart) from the run's start/finish events."""
+    channel = event_bus.get(job_id)
+    durations, starts = defaultdict(list), {}
+    for event in channel.history() if channel else []:
+        if event["type"] == "task_started":
+            starts[event["task_index"]] = event["timestamp"]
+        elif event["type"] == "task_finished" and event["task_index"] in starts:
+            durations[event["task"] or event["agent"]].append(event["timestamp"] - starts.pop(event["task_index"]))
+    return durations
+
+
+def run_level(base_url: str, event_bus, concurrency: int, requests: int, options: dict, poll_interval: float) -> dict:
+    goals = [f"Benchmark project {concurrency}-{i}: build a login page with OAuth" for i in range(requests)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda goal: run_project(base_url, goal, options, poll_interval), goals))
+    elapsed = time.perf_counter() - started
+
+    per_task = defaultdict(list)
+    for result in results:
+        for task, durations in task_durations(event_bus, result["job_id"]).items():
+            per_task[task].extend(durations)
+    succeeded = [r for r in results if r["status"] == "succeeded"]
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "succeeded": len(succeeded),
+        "failed": [r.get("error") for r in results if r["status"] != "succeeded"],
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(succeeded) / elapsed, 3) if elapsed else 0.0,
+        "request_latency_s": percentiles([r["latency"] for r in results]),
+        "task_latency_s": {task: percentiles(values) for task, values in per_task.items()},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end throughput benchmark for main.app.")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=8, help="Projects submitted per level")
+    parser.add_argument("--mode", choices=["sequential", "dag"], default="sequential")
+    parser.add_argument("--llm", choices=["direct", "routed"], default="direct",
+                        help="direct: agents hold the fake model; routed: the fake answers behind RoutedLLM")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="Fake LLM seconds per word")
+    parser.add_argument("--first-token-latency", type=float, default=0.2, help="Fake LLM seconds per call")
+    parser.add_argument("--tickets", type=int, default=10, help="Tickets the fake allocator creates per run")
+    parser.add_argument("--jira-latency", type=float, default=0.02)
+    parser.add_argument("--jira-connect-latency", type=float, default=0.05)
+    parser.add_argument("--issues", type=int, default=200, help="Issues pre-seeded in the stub Jira project")
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--out", default=None, help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    stub = StubJira(issue_count=args.issues, latency=args.jira_latency,
+                    connect_latency=args.jira_connect_latency).start()
+    data_dir = tempfile.mkdtemp(prefix="devboss-bench-")
+    configure_offline(stub, data_dir)
+    os.environ.setdefault("DEVBOSS_MAX_WORKERS", str(max(levels)))
+    fake_llm = install_fake_llm(args.token_latency, args.first_token_latency, args.tickets, args.llm == "routed")
+
+    import main as devboss
+
+    server, base_url = start_server(devboss.app)
+    options = {"execution_mode": args.mode}
+    try:
+        results = []
+        for level in levels:
+            result = run_level(base_url, devboss.event_bus, level, args.requests, options, args.poll_interval)
+            print(json.dumps({k: result[k] for k in ("concurrency", "succeeded", "requests_per_s",
+                                                     "request_latency_s", "peak_rss_mb")}))
+            results.append(result)
+    finally:
+        server.should_exit = True
+        stub.stop()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": vars(args),
+        "llm_calls": fake_llm.calls,
+        "jira_requests": stub.requests,
+        "levels": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
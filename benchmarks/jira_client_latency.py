@@ -0,0 +1,84 @@
+# benchmarks/jira_client_latency.py
+#
+# Compares creating tickets the old way (a fresh requests.post per call) with the shared,
+# pooled JiraClient, against a local stub Jira server.
+#
+#   python -m benchmarks.jira_client_latency --tickets 30
+
+import argparse
+import json
+import statistics
+import time
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+import jira_client
+from benchmarks.stub_jira import StubJira
+from jira_client import JiraClient
+from rate_limits import RateLimiter
+
+
+def _payload(i: int) -> dict:
+    return {"fields": {"project": {"key": "TEST"}, "summary": f"Benchmark ticket {i}",
+                       "description": "Created by the latency benchmark.", "issuetype": {"name": "Task"}}}
+
+
+def per_call(base_url: str, i: int):
+    # The path the tools used before the shared client: new auth, headers and connection every time
+    auth = HTTPBasicAuth("bench@example.com", "token")
+    headers = {"Accept": "application/json", "Content-Type": "application/json"}
+    response = requests.post(f"{base_url}/rest/api/2/issue", json=_payload(i), headers=headers, auth=auth, timeout=10)
+    response.raise_for_status()
+
+
+def pooled(client: JiraClient, i: int):
+    response = client.post("rest/api/2/issue", json=_payload(i))
+    response.raise_for_status()
+
+
+def measure(name: str, call, tickets: int, stub: StubJira) -> dict:
+    connections_before = stub.connections
+    latencies = []
+    started = time.perf_counter()
+    for i in range(tickets):
+        t0 = time.perf_counter()
+        call(i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    total = (time.perf_counter() - started) * 1000
+    return {
+        "path": name,
+        "tickets": tickets,
+        "total_ms": round(total, 1),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(sorted(latencies)[int(0.95 * (len(latencies) - 1))], 2),
+        "connections": stub.connections - connections_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call vs pooled Jira ticket creation latency.")
+    parser.add_argument("--tickets", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.02, help="Server time per request (s)")
+    parser.add_argument("--connect-latency", type=float, default=0.05, help="Cost of each new connection (s)")
+    args = parser.parse_args()
+
+    # Measure the client, not the shared request budget: the per-call path never spent from it
+    jira_client.jira_limiter = RateLimiter("jira", {})
+    with StubJira(issue_count=0, latency=args.latency, connect_latency=args.connect_latency) as stub:
+        client = JiraClient(stub.url, "bench@example.com", "token")
+        results = [
+            measure("per-call requests.post", lambda i: per_call(stub.url, i), args.tickets, stub),
+            measure("shared JiraClient", lambda i: pooled(client, i), args.tickets, stub),
+        ]
+        client.close()
+
+    for result in results:
+        print(json.dumps(result))
+    speedup = results[0]["total_ms"] / results[1]["total_ms"]
+    print(f"Shared client is {speedup:.2f}x faster for {args.tickets} tickets.")
+
+
+if __name__ == "__main__":
+    main()
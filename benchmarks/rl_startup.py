@@ -0,0 +1,85 @@
+# benchmarks/rl_startup.py
+#
+# Cold start and memory of the two RL modes. Each mode runs in a fresh interpreter, so the
+# numbers include importing the policy's dependencies (PyTorch for "train", NumPy for "inference").
+#
+#   python -m benchmarks.rl_startup --repeats 3 --batch 1024
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints one JSON line
+CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+from rl_policy import create_policy
+policy = create_policy()
+ready = time.perf_counter()
+policy.select_action([30, 6, 5, 1])
+first_action = time.perf_counter()
+states = [[i % 200, 6, 5, 1] for i in range({batch})]
+t0 = time.perf_counter()
+for _ in range({rounds}):
+    policy.select_actions(states)
+batched = (time.perf_counter() - t0) / {rounds}
+t0 = time.perf_counter()
+for state in states[:{singles}]:
+    policy.select_action(state)
+single = (time.perf_counter() - t0) / {singles}
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "startup_s": ready - started,
+    "first_action_s": first_action - ready,
+    "batch_s": batched,
+    "single_action_s": single,
+    "peak_rss_mb": rss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    "torch_imported": "torch" in sys.modules,
+}}))
+"""
+
+
+def run_mode(mode: str, data_dir: str, batch: int, rounds: int, singles: int) -> dict:
+    env = dict(os.environ, RL_MODE=mode, DEVBOSS_DATA_DIR=data_dir, RL_CHECKPOINT_PATH="",
+               RL_POLICY_PATH=os.path.join(data_dir, "rl_policy.npz"),
+               RL_EXPERIENCE_PATH=os.path.join(data_dir, "rl_experience.jsonl"))
+    code = CHILD.format(batch=batch, rounds=rounds, singles=singles)
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=REPO_ROOT, env=env, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(samples: list) -> dict:
+    summary = {key: round(statistics.median(s[key] for s in samples), 6)
+               for key in ("startup_s", "first_action_s", "batch_s", "single_action_s", "peak_rss_mb")}
+    summary["torch_imported"] = samples[0]["torch_imported"]
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time and RSS of RL_MODE=train vs RL_MODE=inference.")
+    parser.add_argument("--repeats", type=int, default=3, help="Fresh interpreters per mode (medians reported)")
+    parser.add_argument("--batch", type=int, default=1024, help="States per batched select_actions call")
+    parser.add_argument("--rounds", type=int, default=20, help="Batched calls timed per interpreter")
+    parser.add_argument("--singles", type=int, default=200, help="Single select_action calls timed")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="devboss-rl-bench-")
+    report = {"config": vars(args)}
+    for mode in ("inference", "train"):
+        samples = [run_mode(mode, data_dir, args.batch, args.rounds, args.singles) for _ in range(args.repeats)]
+        report[mode] = summarize(samples)
+        print(json.dumps({mode: report[mode]}))
+    print(json.dumps({
+        "startup_speedup": round(report["train"]["startup_s"] / report["inference"]["startup_s"], 1),
+        "rss_saved_mb": round(report["train"]["peak_rss_mb"] - report["inference"]["peak_rss_mb"], 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
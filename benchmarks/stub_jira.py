@@ -0,0 +1,170 @@
+# benchmarks/stub_jira.py
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+STATUSES = ["To Do", "In Progress", "Done"]
+# The stub's statuses double as their own status categories
+STATUS_FILTER = re.compile(r'status(?:Category)?\s*=\s*"([^"]+)"', re.IGNORECASE)
+
+
+class StubJira:
+    """
+    A local stand-in for the Jira REST API, good enough for the tools in tools.py.
+    `latency` is added to every request; `connect_latency` is added once per new TCP
+    connection to model the TLS handshake a real Jira Cloud connection pays.
+    """
+
+    def __init__(self, issue_count: int = 30, latency: float = 0.02, connect_latency: float = 0.05,
+                 project_key: str = "TEST", host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.project_key = project_key
+        self.issues = []
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        for i in range(issue_count):
+            self._add_issue(f"Seeded issue {i + 1}", "", STATUSES[i % len(STATUSES)])
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real Jira
+            # Buffer the headers and body into one write and send it at once: written separately,
+            # Nagle's algorithm holds the body back until the client's delayed ACK (~40 ms on Linux)
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+                time.sleep(stub.connect_latency)
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                stub._handle(self, "GET")
+
+            def do_POST(self):
+                stub._handle(self, "POST")
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubJira":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Request Handling ---
+    def _add_issue(self, summary: str, description: str, status: str = "To Do") -> dict:
+        with self._lock:
+            number = len(self.issues) + 1
+            issue = {
+                "id": str(10000 + number),
+                "key": f"{self.project_key}-{number}",
+                "fields": {"summary": summary, "description": description, "status": {"name": status}},
+            }
+            self.issues.append(issue)
+        return issue
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+
+        parsed = urlparse(handler.path)
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length)) if length else {}
+
+        if method == "GET" and parsed.path == "/rest/api/2/search":
+            self._send(handler, 200, self._search(parse_qs(parsed.query)))
+        elif method == "POST" and parsed.path == "/rest/api/2/issue":
+            fields = body.get("fields", {})
+            issue = self._add_issue(fields.get("summary", ""), fields.get("description", ""))
+            self._send(handler, 201, {"id": issue["id"], "key": issue["key"], "self": f"{self.url}/rest/api/2/issue/{issue['id']}"})
+        elif method == "POST" and parsed.path == "/rest/api/2/issue/bulk":
+            self._send(handler, *self._bulk_create(body.get("issueUpdates", [])))
+        else:
+            self._send(handler, 404, {"errorMessages": [f"No stub for {method} {parsed.path}"]})
+
+    def _bulk_create(self, updates: list) -> tuple:
+        # Like Jira: at most 50 per call, and issues without a summary fail individually
+        if len(updates) > 50:
+            return 400, {"errorMessages": ["Too many issues in the bulk request (max 50)."]}
+        issues, errors = [], []
+        for index, update in enumerate(updates):
+            fields = update.get("fields", {})
+            if not fields.get("summary"):
+                errors.append({"status": 400, "failedElementNumber": index,
+                               "elementErrors": {"errors": {"summary": "You must specify a summary of the issue."}}})
+                continue
+            issue = self._add_issue(fields["summary"], fields.get("description", ""))
+            issues.append({"id": issue["id"], "key": issue["key"], "self": f"{self.url}/rest/api/2/issue/{issue['id']}"})
+        return (201 if issues else 400), {"issues": issues, "errors": errors}
+
+    def _search(self, query: dict) -> dict:
+        start_at = int(query.get("startAt", ["0"])[0])
+        max_results = int(query.get("maxResults", ["50"])[0])
+        fields = query.get("fields", [""])[0]
+        status = STATUS_FILTER.search(query.get("jql", [""])[0])
+        with self._lock:
+            matching = self.issues
+            if status:
+                wanted_status = status.group(1).lower()
+                matching = [i for i in matching if i["fields"]["status"]["name"].lower() == wanted_status]
+            issues = matching[start_at:start_at + max_results]
+            total = len(matching)
+        if fields:
+            wanted = fields.split(",")
+            issues = [{**issue, "fields": {k: v for k, v in issue["fields"].items() if k in wanted}} for issue in issues]
+        return {"startAt": start_at, "maxResults": max_results, "total": total, "issues": issues}
+
+    def _send(self, handler: BaseHTTPRequestHandler, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a local stub of the Jira REST API.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--issues", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--connect-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    stub = StubJira(args.issues, args.latency, args.connect_latency, port=args.port).start()
+    print(f"Stub Jira listening on {stub.url} (set JIRA_DOMAIN={stub.url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,162 @@
+# context_compaction.py
+
+import json
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# --- Configuration ---
+# Tokens of earlier task outputs a task may receive as context; 0 hands them over in full.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("DEVBOSS_CONTEXT_BUDGET", "1500"))
+# The allocator turns the whole plan into tickets, so it gets more room by default
+DEFAULT_TASK_BUDGETS = {"allocate": 4000}
+
+
+def _parse_budgets(value: str) -> Dict[str, int]:
+    # "allocate=4000,execute=800"
+    budgets = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        task, _, tokens = item.partition("=")
+        budgets[task.strip()] = int(tokens)
+    return budgets
+
+
+TASK_CONTEXT_BUDGETS = {**DEFAULT_TASK_BUDGETS, **_parse_budgets(os.getenv("DEVBOSS_CONTEXT_BUDGETS", ""))}
+
+# Rough, but it only has to rank and bound prompt sizes, not bill them
+CHARS_PER_TOKEN = 4
+
+_TICKET_KEY = re.compile(r"\b[A-Z][A-Z0-9]+-\d+\b")
+_MILESTONE = re.compile(r"^\s*(?:#{1,4}\s+|\d+[.)]\s+|\*\*|(?:milestone|phase|stage)\b)", re.IGNORECASE)
+_STATUS_COUNT = re.compile(r"\b(to do|in progress|done|total)\b\W{0,3}(\d+)", re.IGNORECASE)
+_PROGRESS = re.compile(r"(\d{1,3})\s?%")
+_CLIPPED = "\n[...]"
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def clip(text: str, tokens: int) -> str:
+    """The start of `text` within `tokens`, cut at a line break where possible."""
+    limit = max(0, tokens) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    # The marker counts against the budget too
+    limit = max(0, limit - len(_CLIPPED))
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut if cut > limit // 2 else limit].rstrip() + _CLIPPED
+
+
+# --- Digests ---
+# Each keeps the facts later tasks act on and drops the prose around them.
+def milestones(text: str) -> str:
+    lines = [line.strip().strip("#*").strip() for line in text.splitlines() if _MILESTONE.match(line)]
+    lines = [line for line in lines if line]
+    return "Milestones:\n" + "\n".join(f"- {line}" for line in lines) if lines else ""
+
+
+def ticket_keys(text: str) -> str:
+    keys = list(dict.fromkeys(_TICKET_KEY.findall(text)))
+    failed = [line.strip() for line in text.splitlines() if line.strip().lower().startswith("failed to create")]
+    parts = [f"Jira tickets ({len(keys)}): {', '.join(keys)}"] if keys else []
+    return "\n".join(parts + failed)
+
+
+def status_counts(text: str) -> str:
+    counts = {}
+    try:
+        counts = {status.upper(): count for status, count in json.loads(text).get("counts", {}).items()}
+    except (ValueError, AttributeError):
+        pass
+    for status, count in _STATUS_COUNT.findall(text):
+        counts.setdefault(status.upper(), int(count))
+    if not counts:
+        return ""
+    digest = "Jira status counts: " + ", ".join(f"{status} {count}" for status, count in counts.items())
+    progress = _PROGRESS.search(text)
+    return digest + (f"; {progress.group(1)}% done" if progress else "")
+
+
+def lead(text: str) -> str:
+    """The first paragraph, where agents put their conclusion."""
+    return text.strip().split("\n\n", 1)[0]
+
+
+# Producing task -> how its output is digested. Tasks not listed are only clipped.
+DIGESTS = {
+    "plan": [milestones],
+    "allocate": [ticket_keys],
+    "track": [status_counts, lead],
+}
+
+
+def digest(task_name: Optional[str], text: str) -> str:
+    sections = [section for section in (extract(text) for extract in DIGESTS.get(task_name, [])) if section]
+    return "\n".join(sections) if sections else text
+
+
+@dataclass
+class CompactionReport:
+    task: Optional[str]
+    budget: int
+    raw_tokens: int
+    context_tokens: int
+    sources: List[str] = field(default_factory=list)
+    digested: List[str] = field(default_factory=list)
+
+    @property
+    def reduction(self) -> float:
+        return 1 - self.context_tokens / self.raw_tokens if self.raw_tokens else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "task": self.task,
+            "budget": self.budget,
+            "raw_tokens": self.raw_tokens,
+            "context_tokens": self.context_tokens,
+            "reduction": round(self.reduction, 3),
+            "sources": self.sources,
+            "digested": self.digested,
+        }
+
+
+class ContextCompactor:
+    """
+    Fits the outputs a task receives as context into that task's token budget. Context that
+    already fits is handed over verbatim; otherwise each output is replaced by its digest
+    (ticket keys, status counts, milestones) and whatever is still too long is clipped, the
+    longest outputs first.
+    """
+
+    def __init__(self, budget: int = CONTEXT_TOKEN_BUDGET, task_budgets: Optional[Dict[str, int]] = None):
+        self.budget = budget
+        self.task_budgets = TASK_CONTEXT_BUDGETS if task_budgets is None else task_budgets
+
+    def budget_for(self, task_name: Optional[str]) -> int:
+        return self.task_budgets.get(task_name, self.budget) if self.budget > 0 else 0
+
+    def compact(self, task_name: Optional[str], sources: List[Tuple[str, str]]) -> Tuple[List[str], CompactionReport]:
+        """`sources` are (producing task, raw output) pairs; returns the outputs to hand over, in order."""
+        budget = self.budget_for(task_name)
+        names = [name for name, _ in sources]
+        raws = [raw or "" for _, raw in sources]
+        raw_tokens = sum(estimate_tokens(raw) for raw in raws)
+        report = CompactionReport(task_name, budget, raw_tokens, raw_tokens, names)
+        if budget <= 0 or raw_tokens <= budget:
+            return raws, report
+
+        parts = [digest(name, raw) for name, raw in zip(names, raws)]
+        report.digested = [name for name, raw, part in zip(names, raws, parts) if part != raw]
+        # Short outputs keep everything; the budget they leave is shared by the longer ones
+        remaining, left = budget, len(parts)
+        for i in sorted(range(len(parts)), key=lambda i: estimate_tokens(parts[i])):
+            share = remaining // left
+            if estimate_tokens(parts[i]) > share:
+                parts[i] = clip(parts[i], share)
+            remaining -= min(estimate_tokens(parts[i]), share)
+            left -= 1
+        report.context_tokens = sum(estimate_tokens(part) for part in parts)
+        return parts, report
@@ -0,0 +1,107 @@
+# crew_factory.py
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from crewai import Crew, Process
+
+from agents import AgentSet, create_agents
+from job_queue import MAX_WORKERS
+
+# --- Configuration ---
+# One agent set per concurrent crew is enough; more would never be checked out.
+AGENT_POOL_SIZE = int(os.getenv("DEVBOSS_AGENT_POOL_SIZE", str(MAX_WORKERS)))
+
+
+class AgentPool:
+    """
+    Pre-built, isolated agent sets. A run checks one out, so no two concurrent runs share an
+    agent, and it is reset on return. Sets are built lazily (or by warm()) up to `size`.
+    """
+
+    def __init__(self, size: int = AGENT_POOL_SIZE, factory: Callable[[], AgentSet] = create_agents):
+        self.size = max(1, size)
+        self.factory = factory
+        self._idle: List[AgentSet] = []
+        self._built = 0
+        self._cond = threading.Condition()
+
+    def _reserve(self) -> Optional[AgentSet]:
+        """An idle set, or None when the caller may build a new one (its slot is then reserved)."""
+        with self._cond:
+            while not self._idle and self._built >= self.size:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._built += 1
+            return None
+
+    def _build(self) -> AgentSet:
+        try:
+            return self.factory()
+        except Exception:
+            with self._cond:
+                self._built -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, agents: AgentSet):
+        with self._cond:
+            self._idle.append(agents)
+            self._cond.notify()
+
+    @contextmanager
+    def checkout(self):
+        """Yields an agent set for the duration of one run; waits if every set is in use."""
+        agents = self._reserve()
+        if agents is None:
+            agents = self._build()
+        try:
+            yield agents
+        finally:
+            agents.reset()
+            self._release(agents)
+
+    def warm(self, count: Optional[int] = None) -> int:
+        """Builds idle sets until `count` (default: the pool size) exist; returns how many were built."""
+        target, built = min(count or self.size, self.size), 0
+        while True:
+            with self._cond:
+                if self._built >= target:
+                    return built
+                self._built += 1
+            self._release(self._build())
+            built += 1
+
+    def warm_async(self, count: Optional[int] = None) -> threading.Thread:
+        """Warms the pool on a background thread, so the server accepts requests meanwhile."""
+
+        def warm():
+            try:
+                self.warm(count)
+            except Exception as e:
+                # Runs still build their agents on checkout; the error will surface there
+                print(f"--- Warming the agent pool failed: {e} ---")
+
+        thread = threading.Thread(target=warm, name="agent-pool-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"size": self.size, "built": self._built, "idle": len(self._idle),
+                    "in_use": self._built - len(self._idle)}
+
+
+def build_crew(agents: AgentSet, tasks: list, step_callback: Callable, task_callback: Callable) -> Crew:
+    """The sequential crew for one run, over that run's checked-out agents."""
+    return Crew(
+      agents=agents.all(),
+      tasks=tasks,
+      process=Process.sequential,
+      verbose=True,
+      step_callback=step_callback,
+      task_callback=task_callback,
+    )
@@ -0,0 +1,144 @@
+# human_loop.py
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+from run_store import current_task
+
+# --- Configuration ---
+DATA_DIR = os.getenv("DEVBOSS_DATA_DIR", ".devboss")
+HUMAN_LOOP_PATH = os.getenv("HUMAN_LOOP_PATH", os.path.join(DATA_DIR, "human_loop.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    task TEXT,
+    question TEXT NOT NULL,
+    asked_at REAL NOT NULL,
+    answer TEXT,
+    answered_at REAL
+);
+CREATE INDEX IF NOT EXISTS questions_by_run ON questions (run_id, asked_at);
+"""
+
+
+class NoPendingQuestion(Exception):
+    """Raised when an answer is posted for a run (or question id) that is not waiting for one."""
+
+
+@dataclass
+class Question:
+    id: str
+    run_id: str
+    task: Optional[str]
+    question: str
+    asked_at: float
+    answer: Optional[str] = None
+    answered_at: Optional[float] = None
+
+    @property
+    def pending(self) -> bool:
+        return self.answer is None
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "pending": self.pending}
+
+
+class HumanLoop:
+    """
+    Questions agents asked humans. A run waiting for answers is suspended: its finished tasks
+    are checkpointed in the run store, so it holds no thread and no crew in memory.
+    """
+
+    def __init__(self, path: str = HUMAN_LOOP_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def ask(self, run_id: str, question: str, task: Optional[str] = None) -> Question:
+        entry = Question(uuid.uuid4().hex, run_id, task, question, time.time())
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO questions (id, run_id, task, question, asked_at) VALUES (?, ?, ?, ?, ?)",
+                               (entry.id, run_id, task, question, entry.asked_at))
+        return entry
+
+    def questions(self, run_id: str) -> List[Question]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, run_id, task, question, asked_at, answer, answered_at FROM questions "
+                "WHERE run_id = ? ORDER BY asked_at", (run_id,)).fetchall()
+        return [Question(*row) for row in rows]
+
+    def pending(self, run_id: str) -> List[Question]:
+        return [q for q in self.questions(run_id) if q.pending]
+
+    def answer(self, run_id: str, answer: str, question_id: Optional[str] = None) -> Question:
+        """Answers the given question, or the oldest pending one of the run."""
+        pending = [q for q in self.pending(run_id) if question_id is None or q.id == question_id]
+        if not pending:
+            raise NoPendingQuestion(question_id or run_id)
+        entry = pending[0]
+        entry.answer, entry.answered_at = answer, time.time()
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE questions SET answer = ?, answered_at = ? WHERE id = ?",
+                               (answer, entry.answered_at, entry.id))
+        return entry
+
+    def discard(self, run_id: str):
+        """Forgets the questions a run still has pending (e.g. when it is cancelled)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM questions WHERE run_id = ? AND answer IS NULL", (run_id,))
+
+
+# --- The Current Run ---
+# HumanInputTool runs deep inside crewai, so the run it belongs to travels in a context variable
+# (the task comes from run_store, which tracks it for every tool).
+_session: ContextVar[Optional["HumanSession"]] = ContextVar("human_session", default=None)
+
+
+@dataclass
+class HumanSession:
+    run_id: str
+    loop: HumanLoop
+    asked: List[Question] = field(default_factory=list)
+
+    def ask(self, question: str) -> str:
+        for entry in self.loop.questions(self.run_id):
+            if entry.question.strip() == question.strip() and not entry.pending:
+                return f"The human answered: {entry.answer}"
+        self.asked.append(self.loop.ask(self.run_id, question, current_task()))
+        return (
+            "Your question has been sent to a human and the project is paused until they answer. "
+            "Do not guess the answer. Finish this task now, stating that you are waiting for the human's decision."
+        )
+
+    def asked_in(self, task_name: Optional[str]) -> bool:
+        return any(entry.task == task_name for entry in self.asked)
+
+    def answers(self) -> List[Question]:
+        """Every question of this run a human has answered so far, oldest first."""
+        return [q for q in self.loop.questions(self.run_id) if not q.pending]
+
+
+def current_session() -> Optional[HumanSession]:
+    return _session.get()
+
+
+@contextmanager
+def human_session(run_id: str, loop: HumanLoop):
+    session = HumanSession(run_id, loop)
+    token = _session.set(session)
+    try:
+        yield session
+    finally:
+        _session.reset(token)
@@ -0,0 +1,162 @@
+# jira_cache.py
+
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from jira_client import JiraClient, StatusBuckets
+
+# --- Configuration ---
+DATA_DIR = os.getenv("DEVBOSS_DATA_DIR", ".devboss")
+# Set JIRA_CACHE_PATH to an empty string to always read from Jira directly
+JIRA_CACHE_PATH = os.getenv("JIRA_CACHE_PATH", os.path.join(DATA_DIR, "jira_cache.sqlite3"))
+# How old the local copy may be before the next read pulls a delta from Jira
+JIRA_CACHE_MAX_AGE = float(os.getenv("JIRA_CACHE_MAX_AGE", "30"))
+# Deltas cannot see deleted issues, so the whole project is re-read this often
+JIRA_CACHE_FULL_SYNC = float(os.getenv("JIRA_CACHE_FULL_SYNC", "86400"))
+# Extra minutes added to each delta window to cover clock skew between us and Jira
+SYNC_OVERLAP_MINUTES = 2
+
+# Bumped whenever the tables change; it is only a cache, so an older layout is dropped and re-synced
+SCHEMA_VERSION = 2
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    domain TEXT NOT NULL,
+    key TEXT NOT NULL,
+    project TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    status TEXT NOT NULL,
+    status_category TEXT NOT NULL,
+    updated TEXT,
+    PRIMARY KEY (domain, key)
+);
+CREATE INDEX IF NOT EXISTS issues_by_status ON issues (domain, project, status);
+CREATE INDEX IF NOT EXISTS issues_by_updated ON issues (domain, project, updated);
+CREATE TABLE IF NOT EXISTS sync_state (
+    domain TEXT NOT NULL,
+    project TEXT NOT NULL,
+    last_sync REAL NOT NULL,
+    last_full_sync REAL NOT NULL,
+    PRIMARY KEY (domain, project)
+);
+"""
+
+SYNC_FIELDS = ["status", "summary", "updated"]
+
+
+def _row(domain: str, project_key: str, issue: dict) -> tuple:
+    fields = issue["fields"]
+    status = fields["status"]
+    category = status.get("statusCategory", {}).get("name") or status["name"]
+    return (domain, issue["key"], project_key, fields.get("summary", ""), status["name"], category,
+            fields.get("updated"))
+
+
+class JiraIssueCache:
+    """
+    A local SQLite copy of Jira issues, indexed by key, status and updated time, and kept apart
+    per Jira site (the client's base URL), since project keys are only unique within one site.
+    Reads are served locally; when the copy is older than `max_age` it is brought up to date
+    with an `updated >= -Nm` JQL delta instead of re-downloading the project.
+    """
+
+    def __init__(self, path: str = JIRA_CACHE_PATH, max_age: float = JIRA_CACHE_MAX_AGE,
+                 full_sync_interval: float = JIRA_CACHE_FULL_SYNC):
+        self.max_age = max_age
+        self.full_sync_interval = full_sync_interval
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._conn.executescript("DROP TABLE IF EXISTS issues; DROP TABLE IF EXISTS sync_state;")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        # One sync per site and project at a time; concurrent readers wait for it instead of syncing again
+        self._sync_locks = defaultdict(threading.Lock)
+
+    # --- Sync ---
+    def ensure_fresh(self, jira: JiraClient, project_key: str):
+        with self._lock:
+            sync_lock = self._sync_locks[jira.base_url, project_key]
+        with sync_lock:
+            state = self._sync_state(jira.base_url, project_key)
+            now = time.time()
+            if state is None or now - state[1] >= self.full_sync_interval:
+                self._full_sync(jira, project_key, now)
+            elif now - state[0] >= self.max_age:
+                self._delta_sync(jira, project_key, state[0], now)
+
+    def _full_sync(self, jira: JiraClient, project_key: str, now: float):
+        # Pages are reduced to small row tuples as they stream in; the database lock is only taken to write
+        domain = jira.base_url
+        rows = [_row(domain, project_key, issue) for issue in
+                jira.iter_issues(f"project = {project_key} ORDER BY key ASC", fields=SYNC_FIELDS)]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM issues WHERE domain = ? AND project = ?", (domain, project_key))
+            self._upsert(rows)
+            self._conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                               (domain, project_key, now, now))
+
+    def _delta_sync(self, jira: JiraClient, project_key: str, last_sync: float, now: float):
+        # A relative JQL window sidesteps the Jira user's timezone; JQL dates only have minute precision
+        minutes = int((now - last_sync) // 60) + SYNC_OVERLAP_MINUTES
+        jql = f"project = {project_key} AND updated >= -{minutes}m ORDER BY key ASC"
+        domain = jira.base_url
+        rows = [_row(domain, project_key, issue) for issue in jira.iter_issues(jql, fields=SYNC_FIELDS)]
+        with self._lock, self._conn:
+            self._upsert(rows)
+            self._conn.execute("UPDATE sync_state SET last_sync = ? WHERE domain = ? AND project = ?",
+                               (now, domain, project_key))
+
+    def _upsert(self, rows: Iterable[tuple]):
+        # Caller must hold self._lock
+        self._conn.executemany("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _sync_state(self, domain: str, project_key: str) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT last_sync, last_full_sync FROM sync_state WHERE domain = ? AND project = ?",
+                (domain, project_key)
+            ).fetchone()
+
+    # --- Write-through ---
+    def record_created(self, domain: str, key: str, summary: str, status: str = "To Do"):
+        """Adds a ticket we just created on `domain`, so the next read sees it without a sync."""
+        project_key = key.rsplit("-", 1)[0]
+        updated = time.strftime("%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime())
+        with self._lock, self._conn:
+            self._upsert([(domain, key, project_key, summary, status, status, updated)])
+
+    # --- Reads ---
+    def status_buckets(self, domain: str, project_key: str) -> StatusBuckets:
+        buckets = StatusBuckets()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, summary, status FROM issues WHERE domain = ? AND project = ? ORDER BY rowid",
+                (domain, project_key)
+            ).fetchall()
+        for key, summary, status in rows:
+            buckets.add_entry(key, summary, status)
+        return buckets
+
+
+# --- Process-wide Cache ---
+_cache: Optional[JiraIssueCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_issue_cache() -> Optional[JiraIssueCache]:
+    """Returns the shared issue cache, or None when caching is disabled (JIRA_CACHE_PATH='')."""
+    global _cache
+    if not JIRA_CACHE_PATH:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = JiraIssueCache()
+    return _cache
@@ -0,0 +1,320 @@
+# jira_client.py
+
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+
+from metrics import JIRA_REQUESTS
+from rate_limits import jira_limiter
+
+# --- Configuration ---
+JIRA_POOL_SIZE = int(os.getenv("JIRA_POOL_SIZE", "10"))
+JIRA_MAX_RETRIES = int(os.getenv("JIRA_MAX_RETRIES", "3"))
+JIRA_BACKOFF_BASE = float(os.getenv("JIRA_BACKOFF_BASE", "0.5"))
+JIRA_BACKOFF_CAP = float(os.getenv("JIRA_BACKOFF_CAP", "8"))
+JIRA_TIMEOUT = float(os.getenv("JIRA_TIMEOUT", "10"))
+# Jira Cloud caps search pages at 100 issues; page fetches after the first run concurrently
+JIRA_PAGE_SIZE = int(os.getenv("JIRA_PAGE_SIZE", "100"))
+JIRA_PAGE_WORKERS = int(os.getenv("JIRA_PAGE_WORKERS", "4"))
+# Jira accepts at most 50 issues per /issue/bulk request
+JIRA_BULK_CHUNK_SIZE = min(int(os.getenv("JIRA_BULK_CHUNK_SIZE", "50")), 50)
+JIRA_BULK_WORKERS = int(os.getenv("JIRA_BULK_WORKERS", "4"))
+# Jira's status categories, in the order we report them
+STATUS_CATEGORIES = {"TO DO": "To Do", "IN PROGRESS": "In Progress", "DONE": "Done"}
+# Longest Retry-After we are willing to sleep for inside a single tool call
+JIRA_RETRY_AFTER_CAP = float(os.getenv("JIRA_RETRY_AFTER_CAP", "60"))
+
+# Statuses worth retrying. For non-idempotent requests (creating tickets) we only retry the
+# ones where Jira guarantees it did not process the request, so retries never duplicate tickets.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+SAFE_RETRY_STATUSES = {429, 503}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class JiraClient:
+    """
+    A keep-alive Jira REST client shared by every Jira tool.
+    Connections are pooled per process, and failed calls are retried with jittered
+    exponential backoff that honours Jira's Retry-After header.
+    """
+
+    def __init__(self, domain: str, email: str, api_token: str, pool_size: int = JIRA_POOL_SIZE,
+                 max_retries: int = JIRA_MAX_RETRIES, backoff_base: float = JIRA_BACKOFF_BASE,
+                 backoff_cap: float = JIRA_BACKOFF_CAP, timeout: float = JIRA_TIMEOUT):
+        # JIRA_DOMAIN is normally a bare host; a full URL (e.g. a local stub server) is used as is.
+        self.base_url = domain.rstrip("/") if "://" in domain else f"https://{domain}"
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(email, api_token)
+        self.session.headers.update({"Accept": "application/json", "Content-Type": "application/json"})
+        # Retries are handled below so that we can honour Retry-After, so the adapter never retries itself.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Sends a request, retrying transient failures. The final response is returned as is,
+        so callers still decide what to do with a 4xx/5xx via raise_for_status().
+        """
+        method = method.upper()
+        kwargs.setdefault("timeout", self.timeout)
+        retry_statuses = RETRY_STATUSES if method in IDEMPOTENT_METHODS else SAFE_RETRY_STATUSES
+
+        endpoint = path.strip("/")
+        attempt = 0
+        while True:
+            # Every attempt, retries included, spends from the budget shared by all runs
+            jira_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, self.url(path), **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                JIRA_REQUESTS.observe(time.perf_counter() - started, method=method, endpoint=endpoint,
+                                      status=type(e).__name__)
+                # A POST that failed after connecting may still have created the ticket
+                retryable = method in IDEMPOTENT_METHODS or isinstance(e, requests.exceptions.ConnectTimeout)
+                if attempt >= self.max_retries or not retryable:
+                    raise
+                time.sleep(self._backoff(attempt))
+            else:
+                JIRA_REQUESTS.observe(time.perf_counter() - started, method=method, endpoint=endpoint,
+                                      status=response.status_code)
+                if response.status_code not in retry_statuses or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_after(response)
+                if response.status_code == 429:
+                    # Hold back every caller, not just this one, until Jira lets us in again
+                    jira_limiter.cool_down(delay)
+                response.close()
+                time.sleep(delay if delay is not None else self._backoff(attempt))
+            attempt += 1
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": a random delay up to the capped exponential step
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0.0), JIRA_RETRY_AFTER_CAP)
+
+    # --- Issue Search ---
+    def search_page(self, jql: str, start_at: int = 0, max_results: int = JIRA_PAGE_SIZE,
+                    fields: Optional[Iterable[str]] = None) -> dict:
+        """Fetches one page of /search results. Only the requested fields are returned by Jira."""
+        params = {"jql": jql, "startAt": start_at, "maxResults": max_results}
+        if fields is not None:
+            params["fields"] = ",".join(fields)
+        response = self.get("rest/api/2/search", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def iter_issues(self, jql: str, fields: Optional[Iterable[str]] = None, page_size: int = JIRA_PAGE_SIZE,
+                    max_workers: int = JIRA_PAGE_WORKERS) -> Iterator[dict]:
+        """
+        Yields every issue matching `jql`, page by page and in order.
+        The first page tells us `total`; the remaining pages are fetched concurrently, but at most
+        `2 * max_workers` pages are in flight so memory stays bounded however large the project is.
+        """
+        fields = list(fields) if fields is not None else None
+        first = self.search_page(jql, 0, page_size, fields)
+        total = first.get("total", 0)
+        page_size = first.get("maxResults") or page_size  # Jira may lower the page size we asked for
+        yield from first.get("issues", [])
+        del first
+
+        offsets = iter(range(page_size, total, page_size))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jira-page") as pool:
+            in_flight = []
+            for start_at in offsets:
+                # Page requests keep the caller's rate-limit priority
+                in_flight.append(pool.submit(contextvars.copy_context().run, self.search_page, jql, start_at,
+                                             page_size, fields))
+                if len(in_flight) >= 2 * max_workers:
+                    yield from in_flight.pop(0).result().get("issues", [])
+            while in_flight:
+                yield from in_flight.pop(0).result().get("issues", [])
+
+
+    def count_issues(self, jql: str) -> int:
+        """Asks Jira only for the number of matching issues (maxResults=0 returns no issue bodies)."""
+        return self.search_page(jql, 0, 0, fields=["key"]).get("total", 0)
+
+    # --- Issue Creation ---
+    def create_issues_bulk(self, issues: List[dict], chunk_size: int = JIRA_BULK_CHUNK_SIZE,
+                           max_workers: int = JIRA_BULK_WORKERS) -> List[dict]:
+        """
+        Creates many issues through /issue/bulk. `issues` is a list of `fields` dicts (see issue_fields).
+        Chunks of up to 50 are submitted concurrently. Returns one result per input, in input order:
+        {"key": ...} on success or {"error": ...} on failure.
+        """
+        chunks = [issues[i:i + chunk_size] for i in range(0, len(issues), chunk_size)]
+        if not chunks:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)), thread_name_prefix="jira-bulk") as pool:
+            futures = [pool.submit(contextvars.copy_context().run, self._create_chunk, chunk) for chunk in chunks]
+            chunk_results = [future.result() for future in futures]
+        return [result for results in chunk_results for result in results]
+
+    def _create_chunk(self, chunk: List[dict]) -> List[dict]:
+        try:
+            response = self.post("rest/api/2/issue/bulk", json={"issueUpdates": [{"fields": f} for f in chunk]})
+            body = response.json() if response.content else {}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return [{"error": f"Error connecting to Jira: {e}"} for _ in chunk]
+
+        # Jira lists the created issues in request order and reports failures by their index in the chunk
+        failures = {}
+        for error in body.get("errors", []):
+            element = error.get("elementErrors", {})
+            messages = list(element.get("errors", {}).values()) + element.get("errorMessages", [])
+            failures[error.get("failedElementNumber")] = "; ".join(messages) or f"HTTP {error.get('status')}"
+        if not failures and response.status_code >= 400:
+            message = "; ".join(body.get("errorMessages", [])) or f"HTTP {response.status_code}: {response.text}"
+            return [{"error": message} for _ in chunk]
+
+        created = iter(body.get("issues", []))
+        results = []
+        for index in range(len(chunk)):
+            if index in failures:
+                results.append({"error": failures[index]})
+            else:
+                issue = next(created, None)
+                results.append({"key": issue["key"]} if issue else {"error": "Jira did not report this issue."})
+        return results
+
+
+def issue_fields(project_key: str, summary: str, description: str, issue_type: str = "Task") -> dict:
+    """The `fields` payload Jira expects for a new issue."""
+    return {
+        "project": {
+            "key": project_key
+        },
+        "summary": summary,
+        "description": description,
+        "issuetype": {
+            "name": issue_type
+        }
+    }
+
+
+# --- Status Grouping ---
+class StatusBuckets:
+    """
+    Issues grouped by upper-cased status name, built one issue at a time.
+    Only each issue's key and summary are kept, never the raw JSON.
+    """
+
+    def __init__(self):
+        self.groups = defaultdict(list)
+        self.total = 0
+        self.done = 0
+
+    def add(self, issue: dict):
+        self.add_entry(issue['key'], issue['fields'].get('summary', ''), issue['fields']['status']['name'])
+
+    def add_entry(self, key: str, summary: str, status: str):
+        status_name = status.upper()
+        self.groups[status_name].append((key, summary))
+        self.total += 1
+        if status_name == 'DONE':
+            self.done += 1
+
+    @property
+    def progress(self) -> int:
+        return int((self.done / self.total) * 100) if self.total > 0 else 0
+
+    @classmethod
+    def from_issues(cls, issues: Iterable[dict]) -> "StatusBuckets":
+        buckets = cls()
+        for issue in issues:
+            buckets.add(issue)
+        return buckets
+
+
+def fetch_status_buckets(jira: JiraClient, project_key: str) -> StatusBuckets:
+    """Streams every issue in a project into StatusBuckets, asking Jira only for the fields we use."""
+    jql = f"project = {project_key} ORDER BY key ASC"
+    return StatusBuckets.from_issues(jira.iter_issues(jql, fields=["status", "summary"]))
+
+
+# --- Process-wide Client ---
+_client: Optional[JiraClient] = None
+_client_lock = threading.Lock()
+
+
+def get_jira_client() -> Optional[JiraClient]:
+    """
+    Returns the shared JiraClient, building it from the environment on first use.
+    Returns None when the Jira credentials are not fully set.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                jira_domain = os.getenv("JIRA_DOMAIN")
+                email = os.getenv("EMAIL")
+                api_token = os.getenv("JIRA_API_TOKEN")
+                if not all([jira_domain, email, api_token]):
+                    return None
+                _client = JiraClient(jira_domain, email, api_token)
+    return _client
+
+
+def reset_jira_client():
+    """Drops the shared client, e.g. after the credentials in the environment have changed."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+def fetch_status_counts(jira: JiraClient, project_key: str) -> dict:
+    """
+    Counts a project's issues per status category without downloading any of them.
+    One maxResults=0 query per category, run in parallel.
+    """
+    queries = {
+        bucket: f'project = {project_key} AND statusCategory = "{category}"'
+        for bucket, category in STATUS_CATEGORIES.items()
+    }
+    with ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="jira-count") as pool:
+        futures = {bucket: pool.submit(contextvars.copy_context().run, jira.count_issues, jql)
+                   for bucket, jql in queries.items()}
+        return {bucket: future.result() for bucket, future in futures.items()}
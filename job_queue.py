@@ -0,0 +1,217 @@
+# job_queue.py
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from metrics import JOBS_ACTIVE, JOBS_TOTAL, JOB_DURATION, JOB_QUEUE_WAIT
+
+# --- Configuration ---
+# The worker pool bounds how many crews run at once; the pending limit bounds how much
+# work we accept before telling clients to back off.
+MAX_WORKERS = int(os.getenv("DEVBOSS_MAX_WORKERS", "4"))
+MAX_PENDING = int(os.getenv("DEVBOSS_MAX_PENDING", "100"))
+JOB_RETENTION = int(os.getenv("DEVBOSS_JOB_RETENTION", "1000"))
+
+QUEUED = "queued"
+RUNNING = "running"
+WAITING = "waiting_for_input"  # suspended until a human answers; holds no worker
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds MAX_PENDING jobs that have not started."""
+
+
+class JobCancelled(Exception):
+    """Raised from inside a running job once cancellation has been requested."""
+
+
+class JobSuspended(Exception):
+    """Raised by a runner that saved its state and wants its worker back until `JobQueue.resume`."""
+
+
+@dataclass
+class Job:
+    id: str
+    goal: str
+    options: dict = field(default_factory=dict)
+    status: str = QUEUED
+    result: Any = None
+    reward: Optional[float] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    queued_at: Optional[float] = None  # last time the job entered the queue (created or resumed)
+    resume_requested: bool = False
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Call between units of work so a running job stops at the next safe point."""
+        if self.cancel_event.is_set():
+            raise JobCancelled(self.id)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "goal": self.goal,
+            "options": self.options,
+            "status": self.status,
+            "result": self.result,
+            "reward": self.reward,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# --- The Job Queue ---
+class JobQueue:
+    """
+    Runs jobs on a bounded pool of worker threads.
+    `runner(job)` does the actual work and returns `(result, reward)`.
+    """
+
+    def __init__(self, runner: Callable[[Job], tuple], max_workers: int = MAX_WORKERS,
+                 max_pending: int = MAX_PENDING, retention: int = JOB_RETENTION):
+        self.runner = runner
+        self.max_pending = max_pending
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crew-worker")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, goal: str, options: Optional[dict] = None) -> Job:
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.status == QUEUED)
+            if pending >= self.max_pending:
+                raise QueueFullError(f"{pending} jobs are already waiting")
+            job = Job(id=uuid.uuid4().hex, goal=goal, options=options or {})
+            self._jobs[job.id] = job
+            self._enqueue(job)
+            self._evict_finished()
+        return job
+
+    def resume(self, job_id: str) -> Optional[Job]:
+        """
+        Puts a suspended job back in the queue. A job that is still running (it has not
+        reached the point where it suspends) is requeued as soon as it does.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == WAITING:
+                JOBS_ACTIVE.dec(state=WAITING)
+                self._enqueue(job)
+            elif job.status == RUNNING:
+                job.resume_requested = True
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Queued jobs are dropped before they start. Running jobs are flagged and stop
+        at the next point where the runner calls `job.check_cancelled()`.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return job
+            job.cancel_event.set()
+            future = self._futures.get(job_id)
+            if future is not None and future.cancel():
+                self._finish(job, CANCELLED)
+            elif job.status == WAITING:
+                self._finish(job, CANCELLED)
+        return job
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _execute(self, job: Job):
+        with self._lock:
+            if job.cancel_requested:
+                self._finish(job, CANCELLED)
+                return
+            job.status = RUNNING
+            now = time.time()
+            if job.started_at is None:
+                job.started_at = now
+            JOBS_ACTIVE.dec(state=QUEUED)
+            JOBS_ACTIVE.inc(state=RUNNING)
+            JOB_QUEUE_WAIT.observe(now - job.queued_at)
+
+        try:
+            result, reward = self.runner(job)
+        except JobSuspended:
+            with self._lock:
+                if job.cancel_requested:
+                    self._finish(job, CANCELLED)
+                else:
+                    JOBS_ACTIVE.dec(state=RUNNING)
+                    self._futures.pop(job.id, None)
+                    if job.resume_requested:
+                        # Answered before the job got to suspend; go straight back in the queue
+                        self._enqueue(job)
+                    else:
+                        job.status = WAITING
+                        JOBS_ACTIVE.inc(state=WAITING)
+        except JobCancelled:
+            with self._lock:
+                self._finish(job, CANCELLED)
+        except Exception as e:
+            with self._lock:
+                job.error = str(e)
+                self._finish(job, FAILED)
+        else:
+            with self._lock:
+                if job.cancel_requested:
+                    self._finish(job, CANCELLED)
+                else:
+                    job.result, job.reward = result, reward
+                    self._finish(job, SUCCEEDED)
+
+    def _enqueue(self, job: Job):
+        # Caller must hold self._lock
+        job.status = QUEUED
+        job.queued_at = time.time()
+        job.resume_requested = False
+        self._futures[job.id] = self._executor.submit(self._execute, job)
+        JOBS_ACTIVE.inc(state=QUEUED)
+
+    def _finish(self, job: Job, status: str):
+        # Caller must hold self._lock
+        JOBS_ACTIVE.dec(state=job.status)
+        JOBS_TOTAL.inc(status=status)
+        job.status = status
+        job.finished_at = time.time()
+        if job.started_at is not None:
+            JOB_DURATION.observe(job.finished_at - job.started_at, status=status)
+        self._futures.pop(job.id, None)
+
+    def _evict_finished(self):
+        # Caller must hold self._lock. Drop the oldest finished jobs beyond the retention limit.
+        excess = len(self._jobs) - self.retention
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.status in FINISHED_STATES][:excess]:
+            del self._jobs[job_id]
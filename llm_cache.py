@@ -0,0 +1,157 @@
+# llm_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# --- Configuration ---
+DATA_DIR = os.getenv("DEVBOSS_DATA_DIR", ".devboss")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(DATA_DIR, "llm_cache.sqlite3"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_access ON responses (last_access);
+"""
+
+# Set for the duration of a request that must always reach the model
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache(enabled: bool = True):
+    """Within this block (on this thread/context) LLM calls skip the cache entirely."""
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _normalize_request(request: dict) -> str:
+    # Sorted keys and trimmed message text make formatting-only differences hit the same entry
+    def strip(value):
+        if isinstance(value, dict):
+            return {k: strip(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [strip(v) for v in value]
+        return value.strip() if isinstance(value, str) else value
+
+    return json.dumps(strip(request), sort_keys=True, separators=(",", ":"), default=str)
+
+
+class LLMResponseCache:
+    """
+    A disk-backed cache of model replies. Entries are keyed on the request (the model, its
+    sampling parameters and the normalized message list), expire after `ttl` seconds, and are
+    evicted least-recently-used first once the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 ttl: float = LLM_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        # When each missed key was looked up, so update() can record how long the model took
+        self._pending = {}
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "evictions": 0, "expired": 0, "saved_seconds": 0.0}
+
+    @staticmethod
+    def _key(request: dict) -> str:
+        return hashlib.sha256(_normalize_request(request).encode()).hexdigest()
+
+    def lookup(self, request: dict) -> Optional[str]:
+        """The cached reply to `request`, or None on a miss."""
+        if _bypass.get():
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return None
+
+        key = self._key(request)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, size, latency, created FROM responses WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is not None and now - row[3] > self.ttl:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._size -= row[1]
+                self.stats["expired"] += 1
+                row = None
+            if row is None:
+                self.stats["misses"] += 1
+                if len(self._pending) >= 1024:
+                    # Calls that failed never reach update(); forget the oldest of them
+                    self._pending.pop(next(iter(self._pending)))
+                self._pending[key] = now
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+            self.stats["saved_seconds"] += row[2]
+        return row[0]
+
+    def update(self, request: dict, value: str):
+        if _bypass.get():
+            return
+        key = self._key(request)
+        now = time.time()
+        with self._lock:
+            latency = now - self._pending.pop(key, now)
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                                   (key, value, len(value), latency, now, now))
+            self._size += len(value) - (old[0] if old else 0)
+            self._evict()
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._size = 0
+
+    def _evict(self):
+        # Caller must hold self._lock. Drop least-recently-used entries until we fit again.
+        while self._size > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 32").fetchall()
+            if not rows:
+                break
+            with self._conn:
+                for key, size in rows:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._size -= size
+                    self.stats["evictions"] += 1
+                    if self._size <= self.max_bytes:
+                        break
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0],
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
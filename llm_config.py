@@ -1,7 +1,263 @@
 # llm_config.py
 
-from langchain_openai import ChatOpenAI
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
 
-# Initialize and configure the OpenAI LLM
-# We recommend gpt-4o for its strong reasoning and tool-use capabilities
-llm = ChatOpenAI(model="gpt-4o")
\ No newline at end of file
+import litellm
+from crewai import LLM
+
+from llm_cache import LLMResponseCache, LLM_CACHE_PATH
+from metrics import (LLM_CALLS, LLM_COST, LLM_ESCALATIONS, LLM_LATENCY, LLM_TIER_LATENCY, LLM_TOKENS,
+                     TASK_PROMPT_TOKENS)
+from rate_limits import LLM_TOKENS_PER_CALL_ESTIMATE, RateLimiter, llm_limiter
+from run_store import current_task
+
+# --- Configuration ---
+# Times a request the provider answered with 429 is sent again, after the shared cool-down
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "2"))
+# Longest Retry-After we honour before trying again
+LLM_RETRY_AFTER_CAP = float(os.getenv("LLM_RETRY_AFTER_CAP", "60"))
+
+
+class LLMRateLimiter:
+    """
+    Spends from the shared LLM budget (rate_limits.llm_limiter) for every request that reaches
+    the provider. The call is charged an estimate of its tokens up front; settle() corrects that
+    with the real usage once the response arrives.
+    """
+
+    def __init__(self, limiter: RateLimiter = llm_limiter, estimate: float = LLM_TOKENS_PER_CALL_ESTIMATE):
+        self.limiter = limiter
+        self.estimate = estimate
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Blocks until the budget covers one more request; returns the estimate charged."""
+        estimate = self.estimate
+        self.limiter.acquire({"requests": 1, "tokens": estimate})
+        return estimate
+
+    def settle(self, charged: float, tokens: float):
+        self.limiter.charge("tokens", tokens - charged)
+        # Track the typical call size, so the up-front charge stays close to reality
+        with self._lock:
+            self.estimate = 0.8 * self.estimate + 0.2 * tokens
+
+    def refund(self, charged: float):
+        """The request failed before using any tokens."""
+        self.limiter.charge("tokens", -charged)
+
+    def cool_down(self, error: Exception):
+        """The provider said 429: nobody calls it again until its Retry-After (or the default) has passed."""
+        self.limiter.cool_down(_retry_after(error))
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return isinstance(error, litellm.RateLimitError) or getattr(error, "status_code", None) == 429
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return min(max(float(headers.get("retry-after")), 0.0), LLM_RETRY_AFTER_CAP)
+    except (TypeError, ValueError):
+        return None
+
+
+llm_rate_limiter = LLMRateLimiter()
+
+
+# Identical prompts (resubmitted goals, retries) are answered from a disk-backed cache.
+# Set LLM_CACHE_PATH to an empty string to disable it.
+llm_cache = LLMResponseCache() if LLM_CACHE_PATH else None
+# Request fields that do not change the reply, so they are left out of the cache key
+UNCACHED_PARAMS = {"api_key", "timeout", "stream"}
+
+# --- Model Routing ---
+# Each call goes to a model tier picked by the task being worked on (or, outside a task, by the
+# agent). Mechanical steps use the small model; planning, review and decisions keep the large one.
+LLM_MODEL_LARGE = os.getenv("LLM_MODEL_LARGE", "gpt-4o")
+LLM_MODEL_SMALL = os.getenv("LLM_MODEL_SMALL", "gpt-4o-mini")
+MODEL_TIERS = {"large": LLM_MODEL_LARGE, "small": LLM_MODEL_SMALL}
+# Set LLM_ROUTING=0 to send every call to the large model
+LLM_ROUTING = os.getenv("LLM_ROUTING", "1") != "0"
+# Retry a small-model answer on the large model when it fails validation; 0 turns this off
+LLM_ESCALATION = os.getenv("LLM_ESCALATION", "1") != "0"
+# USD per million tokens (prompt, completion), for the cost metric
+MODEL_PRICES = {"gpt-4o": (2.50, 10.00), "gpt-4o-mini": (0.15, 0.60)}
+
+
+def _parse_routes(value: str) -> dict:
+    # "track=small,Reporting Specialist=large"
+    routes = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        key, _, tier = item.partition("=")
+        routes[key.strip()] = tier.strip()
+    return routes
+
+
+# Task names (see main.py) and agent roles -> tier; a task's route wins over its agent's
+DEFAULT_ROUTES = {
+    "plan": "large", "review": "large", "resolve": "large", "execute": "large",
+    "allocate": "small", "track": "small",
+    "Project Coordinator": "large", "Code Reviewer": "large", "Conflict Resolver": "large",
+    "Task Allocator": "small", "Progress Tracker": "small", "Reporting Specialist": "small",
+}
+MODEL_ROUTES = {**DEFAULT_ROUTES, **_parse_routes(os.getenv("DEVBOSS_MODEL_ROUTES", ""))}
+
+_TICKET_KEY = re.compile(r"\b[A-Z][A-Z0-9]+-\d+\b")
+# What a task's final answer must contain to be accepted from the small model
+OUTPUT_CHECKS = {
+    "allocate": lambda answer: bool(_TICKET_KEY.search(answer)) or "failed to create" in answer.lower(),
+    "track": lambda answer: any(ch.isdigit() for ch in answer),
+}
+
+
+def validate_output(task: Optional[str], answer: str) -> Optional[str]:
+    """Why a model reply is unusable for `task`, or None if it is fine."""
+    text = answer or ""
+    if not text.strip():
+        return "empty"
+    # The agents work in the ReAct format: every reply takes an action or gives the final answer
+    if "Final Answer:" not in text and "Action:" not in text:
+        return "format"
+    check = OUTPUT_CHECKS.get(task)
+    if "Final Answer:" in text and check is not None and not check(text.split("Final Answer:", 1)[1]):
+        return "invalid"
+    return None
+
+
+class ModelRouter:
+    """The model tiers, the routing table and the escalation policy."""
+
+    def __init__(self, tiers: dict = MODEL_TIERS, routes: dict = MODEL_ROUTES, escalation: bool = LLM_ESCALATION):
+        self.tiers = tiers
+        self.routes = routes
+        self.escalation = escalation
+
+    def tier_for(self, agent: Optional[str], task: Optional[str]) -> str:
+        tier = self.routes.get(task) or self.routes.get(agent) or "large"
+        return tier if tier in self.tiers else "large"
+
+    def stats(self) -> dict:
+        return {"tiers": self.tiers, "routes": self.routes, "escalation": self.escalation, "routing": LLM_ROUTING}
+
+
+router = ModelRouter()
+
+
+class RoutedLLM(LLM):
+    """
+    What the agents hold: a crewai LLM that sends each call to the model of the tier the task
+    being worked on (or, outside a task, the agent) maps to, and redoes small-model replies that
+    fail validation on the large model. `tier` pins every call to one tier instead.
+    crewai keeps LLM instances as they are, so this is the layer every agent call goes through.
+    """
+
+    def __init__(self, agent: Optional[str] = None, tier: Optional[str] = None, **kwargs):
+        self.agent = agent
+        self.tier = tier
+        # crewai sizes the context window and stop words from the agent's usual model
+        super().__init__(model=router.tiers[tier or router.tier_for(agent, None)], **kwargs)
+
+    def call(self, messages: List[Dict[str, str]], callbacks: Optional[List[Any]] = None, **kwargs) -> str:
+        if callbacks:
+            # crewai's token counters, registered with litellm as LLM.call does
+            self.set_callbacks(callbacks)
+        task = current_task()
+        tier = self.tier or router.tier_for(self.agent, task)
+        answer = self._generate(tier, messages)
+        if router.escalation and self.tier is None and tier != "large":
+            reason = validate_output(task, answer)
+            if reason is not None:
+                LLM_ESCALATIONS.inc(tier=tier, reason=reason)
+                answer = self._generate("large", messages)
+        return answer
+
+    def _generate(self, tier: str, messages: List[Dict[str, str]]) -> str:
+        started = time.perf_counter()
+        params = self._params(router.tiers[tier], messages)
+        request = {key: value for key, value in params.items() if key not in UNCACHED_PARAMS}
+        answer = llm_cache.lookup(request) if llm_cache is not None else None
+        if answer is None:
+            answer = self._complete(tier, params)
+            if llm_cache is not None:
+                llm_cache.update(request, answer)
+        LLM_TIER_LATENCY.observe(time.perf_counter() - started, tier=tier)
+        return answer
+
+    def _complete(self, tier: str, params: dict) -> str:
+        """One chat completion on the tier's model; only cache misses get here."""
+        model = params["model"]
+        attempt = 0
+        while True:
+            # Every request, retries included, waits for the process-wide request/token budget
+            charged = llm_rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = litellm.completion(**params)
+                break
+            except Exception as e:
+                LLM_CALLS.inc(model=model, status="error")
+                llm_rate_limiter.refund(charged)
+                if not is_rate_limited(e):
+                    raise
+                # Hold back every caller, not just this one, until the provider lets us in again
+                llm_rate_limiter.cool_down(e)
+                if attempt >= LLM_RATE_LIMIT_RETRIES:
+                    raise
+                attempt += 1
+        LLM_CALLS.inc(model=model, status="ok")
+        LLM_LATENCY.observe(time.perf_counter() - started, model=model)
+        usage = response.get("usage") or {}
+        if usage.get("total_tokens"):
+            llm_rate_limiter.settle(charged, usage["total_tokens"])
+        LLM_TOKENS.inc(usage.get("prompt_tokens", 0), model=model, kind="prompt")
+        LLM_TOKENS.inc(usage.get("completion_tokens", 0), model=model, kind="completion")
+        # Per task, so the effect of context compaction on prompt size shows up directly
+        TASK_PROMPT_TOKENS.inc(usage.get("prompt_tokens", 0), task=current_task() or "none")
+        prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+        LLM_COST.inc((usage.get("prompt_tokens", 0) * prompt_price
+                      + usage.get("completion_tokens", 0) * completion_price) / 1e6, tier=tier)
+        return response["choices"][0]["message"]["content"] or ""
+
+    def _params(self, model: str, messages: List[Dict[str, str]]) -> dict:
+        # The same request LLM.call builds, for the routed model
+        params = {
+            "model": model,
+            "messages": messages,
+            "timeout": self.timeout,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "n": self.n,
+            "stop": self.stop,
+            "max_tokens": self.max_tokens or self.max_completion_tokens,
+            "presence_penalty": self.presence_penalty,
+            "frequency_penalty": self.frequency_penalty,
+            "logit_bias": self.logit_bias,
+            "response_format": self.response_format,
+            "seed": self.seed,
+            "logprobs": self.logprobs,
+            "top_logprobs": self.top_logprobs,
+            "api_base": self.base_url,
+            "api_version": self.api_version,
+            "api_key": self.api_key,
+            "stream": False,
+            **self.kwargs,
+        }
+        return {key: value for key, value in params.items() if value is not None}
+
+
+# Assign a model here before the first agent is built to use it for every agent and task,
+# with no routing (the benchmarks install a scripted model this way).
+llm = None
+
+
+def get_llm(agent: Optional[str] = None):
+    """The model for `agent` (its role): routed per task, or always the large model when routing is off."""
+    if llm is not None:
+        return llm
+    return RoutedLLM(agent=agent, tier=None if LLM_ROUTING else "large")
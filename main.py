@@ -1,16 +1,54 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict
+from typing import Literal, Optional
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
+from sse_starlette.sse import EventSourceResponse
+from crewai.tasks.task_output import TaskOutput
 
-from crewai import Crew, Process
-from agents import coordinator, allocator, tracker, reviewer, resolver, reporter
+from crew_factory import AgentPool, build_crew
 from tasks import ProjectTasks
-from rl_optimizer import RLOptimizer, calculate_reward
+from rl_policy import calculate_reward, create_policy
+from job_queue import FINISHED_STATES, JobQueue, JobSuspended, QueueFullError
+from single_flight import SingleFlight
+from human_loop import HumanLoop, NoPendingQuestion, human_session
+from run_store import RunStore, recording
+from run_history import RUN_HISTORY_PAGE_SIZE, InvalidCursor, RunHistory, summarize, task_timings
+from run_events import EventBus, CrewEventForwarder
+from task_graph import run_task_graph, CONTEXT_SEPARATOR, TASK_GRAPH_PARALLELISM
+from context_compaction import ContextCompactor
+from llm_cache import bypass_llm_cache
+from llm_config import llm_cache, router
+import metrics
+import rate_limits
+from rate_limits import PRIORITY_FINISH, PRIORITY_START, request_priority, set_priority
+from plan_library import PlanLibrary, PlanMatch, PLAN_LIBRARY_PATH, PLAN_SEED_THRESHOLD, PLAN_SKIP_THRESHOLD
 
 # --- Application Setup ---
+# "sequential" runs the tasks one after another as a crew; "dag" runs every task whose
+# context is ready concurrently, so a run takes as long as its longest dependency chain.
+EXECUTION_MODE = os.getenv("DEVBOSS_EXECUTION_MODE", "sequential")
+# Whether runs include the technical review of the plan (an extra large-model task, so off by
+# default). Both modes run the same tasks; "dag" only overlaps the review with allocation and tracking.
+PLAN_REVIEW = os.getenv("DEVBOSS_PLAN_REVIEW", "0") != "0"
+
 class ProjectRequest(BaseModel):
     goal: str
+    bypass_cache: bool = False  # always call the model, even for prompts we have answered before
+    execution_mode: Optional[Literal["sequential", "dag"]] = None  # defaults to DEVBOSS_EXECUTION_MODE
+    max_parallel: Optional[int] = None  # task concurrency in "dag" mode
+    review_plan: Optional[bool] = None  # defaults to DEVBOSS_PLAN_REVIEW
+
+class AnswerRequest(BaseModel):
+    answer: str
+    question_id: Optional[str] = None  # defaults to the run's oldest pending question
 
 app = FastAPI(title="DevBoss Swarm API", version="0.1.0")
 app.add_middleware(
@@ -18,49 +56,456 @@ app.add_middleware(
     allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"],
 )
 
-rl_optimizer = RLOptimizer()
+# RL_MODE=inference keeps PyTorch out of the API process entirely
+rl_optimizer = create_policy()
+rl_optimizer.start()
+event_bus = EventBus()
+event_bus.add_listener(metrics.record_run_event)
+plan_library = PlanLibrary() if PLAN_LIBRARY_PATH else None
+# Agents (and the LLM client) are built off the request path; see warm_agent_pool below
+agent_pool = AgentPool()
+# Questions for humans, and per-task checkpoints that let suspended or failed runs continue
+human_loop = HumanLoop()
+run_store = RunStore()
+# Every finished run, for the history view and for trend analysis
+run_history = RunHistory()
+# Later tasks get bounded digests of earlier outputs instead of all of them verbatim
+context_compactor = ContextCompactor()
 
-# --- API Endpoints ---
-@app.get("/")
-def read_root():
-    return {"status": "ok", "message": "Welcome to DevBoss Swarm!"}
+# --- Crew Execution ---
+def record_history(job, channel, status, action, reward=None, error=None):
+    """Appends a finished run to the history log; a failure here never fails the run."""
+    try:
+        saved = run_store.get(job.id)
+        timings = task_timings(channel.history())
+        finished = time.time()
+        run_history.append(job.id, {
+            "run_id": job.id,
+            "goal": job.goal,
+            "options": job.options,
+            "status": status,
+            "action": action,
+            "reward": reward,
+            "error": error,
+            "resumed_from": saved.resumed_from if saved else None,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": finished,
+            "duration": round(finished - job.started_at, 3) if job.started_at else None,
+            "tasks": [{"name": name, **timings.get(name, {}), "output": output}
+                      for name, output in (saved.outputs.items() if saved else [])],
+            "jira_keys": [issue["key"] for issue in saved.issues] if saved else [],
+        })
+    except Exception as e:
+        print(f"--- Could not record run {job.id} in the history: {e} ---")
 
-@app.post("/run-project")
-def run_project(request: ProjectRequest):
+def run_crew(job):
     """
-    Endpoint to kick off the multi-agent crew synchronously.
-    The entire process will run before a response is sent.
+    Runs the full multi-agent crew for a queued job on a worker thread.
+    Returns the crew result and the reward it earned.
     """
-    dummy_state = [len(request.goal), 6, 5, 1] # e.g. goal length, team size, etc.
-    rl_optimizer.select_action(dummy_state)
+    # A run resuming after a human answered (same id), or retried with POST /runs/{id}/resume
+    # (resume_from), starts from the checkpoints saved so far
+    saved = run_store.get(job.options.get("resume_from") or job.id)
+    # The run has these agents to itself; they are reset when they go back to the pool.
+    # Its rate-limit priority is reset as well, so the next job on this worker starts from the default.
+    with agent_pool.checkout() as agents, human_session(job.id, human_loop) as session, \
+            recording(job.id, run_store) as recorder, request_priority(PRIORITY_START):
+        return execute_crew(job, agents, session, recorder, saved)
+
+def execute_crew(job, agents, session, recorder, saved):
+    attempt_started = time.time()
+    dummy_state = [len(job.goal), 6, 5, 1] # e.g. goal length, team size, etc.
+    if saved is not None and saved.action is not None:
+        action = saved.action
+    else:
+        action = rl_optimizer.select_action(dummy_state)
     
     tasks = ProjectTasks()
+    dag_mode = job.options.get("execution_mode", EXECUTION_MODE) == "dag"
+
+    # Near-duplicate goals start from (or reuse outright) a plan we made before
+    if saved is not None:
+        reference = PlanMatch(**saved.reference) if saved.reference else None
+    else:
+        reference = plan_library.best_match(job.goal, PLAN_SEED_THRESHOLD) if plan_library else None
+    reuse_plan = reference is not None and reference.similarity >= PLAN_SKIP_THRESHOLD
+    run_store.start(job.id, job.goal, job.options, action, asdict(reference) if reference is not None else None,
+                    resumed_from=saved if saved is not None and saved.run_id != job.id else None)
+    existing_issues = saved.issues_for("allocate") if saved is not None else None
     
     # Define the full sequence of tasks
-    plan_task = tasks.plan_project_task(coordinator, request.goal)
-    allocation_task = tasks.allocate_tasks_task(allocator, [plan_task])
-    track_task = tasks.track_progress_task(tracker, [allocation_task])
-    resolve_task = tasks.resolve_conflicts_task(resolver, [track_task])
-    execution_task = tasks.manage_project_execution_task(coordinator, [resolve_task])
-    
-    project_crew = Crew(
-      agents=[coordinator, allocator, tracker, reviewer, resolver, reporter],
-      tasks=[plan_task, allocation_task, track_task, resolve_task, execution_task],
-      process=Process.sequential,
-      verbose=True
-    )
-    
-    # 1. The crew runs the project
-    result = project_crew.kickoff()
+    if reuse_plan:
+        plan_task = None
+        allocation_task = tasks.allocate_tasks_task(agents.allocator, [], plan=reference.plan,
+                                                    existing_issues=existing_issues)
+    else:
+        plan_task = tasks.plan_project_task(agents.coordinator, job.goal, reference)
+        allocation_task = tasks.allocate_tasks_task(agents.allocator, [plan_task], existing_issues=existing_issues)
+    track_task = tasks.track_progress_task(agents.tracker, [allocation_task])
+    resolve_task = tasks.resolve_conflicts_task(agents.resolver, [track_task],
+                                                answers=[(q.question, q.answer) for q in session.answers()])
+    if job.options.get("review_plan", PLAN_REVIEW):
+        # The reviewer only needs the plan, so in "dag" mode it runs while tickets are created and tracked
+        review_task = tasks.review_plan_task(agents.reviewer, [plan_task] if plan_task else [],
+                                             plan=reference.plan if reuse_plan else None)
+        execution_task = tasks.manage_project_execution_task(agents.coordinator, [resolve_task, review_task])
+    else:
+        review_task = None
+        execution_task = tasks.manage_project_execution_task(agents.coordinator, [resolve_task])
     
-    # 2. We calculate a reward based on the outcome
-    reward = calculate_reward(result)
-    rl_optimizer.rewards.append(reward)
+    named_tasks = [("plan", plan_task), ("allocate", allocation_task), ("review", review_task),
+                   ("track", track_task), ("resolve", resolve_task), ("execute", execution_task)]
+    named_tasks = [(name, task) for name, task in named_tasks if task is not None]
+    producer_of = {id(task): name for name, task in named_tasks}
+    # Tasks checkpointed by an earlier attempt keep their outputs (later tasks read them as
+    # context) and are not run again
+    completed = saved.outputs if saved is not None else {}
+    for name, task in named_tasks:
+        if name in completed:
+            task.output = TaskOutput(description=task.description, raw=completed[name], agent=task.agent.role)
+    named_tasks = [(name, task) for name, task in named_tasks if name not in completed]
+    pipeline = [task for _, task in named_tasks]
+    task_names = [name for name, _ in named_tasks]
+    name_of = {id(task): name for name, task in named_tasks}
+
+    channel = event_bus.open(job.id)
+    events = CrewEventForwarder(channel, pipeline, names=task_names)
+
+    def enter_task(task_name):
+        recorder.enter_task(task_name)
+        # Once a run is past planning, its LLM and Jira calls go ahead of runs that are just starting
+        set_priority(PRIORITY_START if task_name == "plan" else PRIORITY_FINISH)
+
+    def compacted_context(task, raws):
+        parts, report = context_compactor.compact(
+            producer_of[id(task)], [(producer_of.get(id(dep)), raw) for dep, raw in zip(task.context or [], raws)])
+        if task.context:
+            channel.publish("context_compacted", **report.to_dict())
+        return parts
+
+    # A sequential crew reads a task's context straight from the earlier tasks' outputs, so
+    # digests stand in for those outputs while the task runs; the full ones are put back afterwards
+    handed_over = {}  # id(task) -> (task, its full output)
+
+    def hand_over_context(task):
+        deps = task.context or []
+        for dep in deps:
+            handed_over.setdefault(id(dep), (dep, dep.output))
+        parts = compacted_context(task, [handed_over[id(dep)][1].raw for dep in deps])
+        for dep, part in zip(deps, parts):
+            dep.output = handed_over[id(dep)][1].model_copy(update={"raw": part})
+
+    def restore_context():
+        for dep, output in handed_over.values():
+            dep.output = output
+        handed_over.clear()
+
+    def task_done(task_name, output):
+        # A task that asked a human something is not complete: it runs again once answered
+        asked_human = session.asked_in(task_name)
+        if not asked_human:
+            run_store.checkpoint(job.id, task_name, getattr(output, "raw", str(output)))
+        # A cancelled job stops at the next task boundary
+        job.check_cancelled()
+        if asked_human:
+            raise JobSuspended(job.id)
+
+    def on_task_finished(output):
+        finished = task_names[events.current]
+        events.task_completed(output)
+        # Raises if the run suspends or is cancelled here, before the next task is announced
+        task_done(finished, output)
+        events.task_started()
+        enter_task(task_names[events.current] if events.current < len(task_names) else None)
+        if events.current < len(pipeline):
+            hand_over_context(pipeline[events.current])
+
+    def on_graph_task_started(task):
+        enter_task(name_of[id(task)])
+        events.task_started(task)
+
+    def on_graph_task_finished(task, output):
+        events.task_finished(task, output)
+        task_done(name_of[id(task)], output)
+
+    # Task-graph runs execute tasks without the crew, so the agents report their steps directly
+    for agent in agents.all():
+        agent.step_callback = events.step_callback
+    project_crew = build_crew(agents, pipeline, step_callback=events.step_callback, task_callback=on_task_finished)
     
-    # 3. We update the RL agent's policy using that reward
-    rl_optimizer.update_policy()
+    suspended = False
+    try:
+        if saved is None or saved.run_id != job.id:
+            channel.publish("run_started", goal=job.goal)
+        if saved is not None:
+            channel.publish("run_resumed", resumed_from=saved.run_id, skipped_tasks=list(completed))
+        if reference is not None and saved is None:
+            channel.publish("plan_reused", similar_goal=reference.goal, similarity=round(reference.similarity, 3),
+                            planning_skipped=reuse_plan)
+        # 1. The crew runs the project
+        with bypass_llm_cache(job.options.get("bypass_cache", False)):
+            if dag_mode:
+                result = run_task_graph(pipeline, job.options.get("max_parallel") or TASK_GRAPH_PARALLELISM,
+                                        on_task_started=on_graph_task_started,
+                                        on_task_finished=on_graph_task_finished,
+                                        context_builder=lambda task, raws: CONTEXT_SEPARATOR.join(
+                                            compacted_context(task, raws)),
+                                        agents=agents.all())
+                channel.publish("run_timing", wall_time=round(result.wall_time, 3),
+                                critical_path_time=round(result.critical_path_time, 3),
+                                critical_path=result.critical_path)
+            else:
+                enter_task(task_names[0] if task_names else None)
+                if pipeline:
+                    hand_over_context(pipeline[0])
+                events.task_started()
+                try:
+                    result = project_crew.kickoff()
+                finally:
+                    restore_context()
+        
+        # Remember freshly made plans so similar goals can reuse them
+        if plan_library is not None and plan_task is not None and plan_task.output is not None:
+            plan_library.add(job.goal, plan_task.output.raw)
+
+        # 2. We calculate a reward based on the outcome. Only this attempt's time counts, so a run
+        # is not charged for the time it spent waiting for a human.
+        created = run_store.get(job.id).issues
+        reward = calculate_reward(True, duration=time.time() - attempt_started, tickets_created=len(created))
+        
+        # 3. The background trainer learns from it; the run does not wait for a gradient step
+        rl_optimizer.record(dummy_state, action, reward)
+    except JobSuspended:
+        # Finished tasks are already checkpointed; give the worker and the agents back
+        suspended = True
+        run_store.set_status(job.id, "suspended")
+        channel.publish("run_suspended", questions=[q.to_dict() for q in session.asked])
+        raise
+    except Exception as e:
+        status = "cancelled" if job.cancel_requested else "failed"
+        if status == "failed":
+            # Failures are outcomes too; without them the trainer would only ever see successes
+            rl_optimizer.record(dummy_state, action, calculate_reward(False))
+        run_store.set_status(job.id, status)
+        channel.publish("run_finished", status=status, error=str(e))
+        record_history(job, channel, status, action, error=str(e))
+        raise
+    else:
+        run_store.set_status(job.id, "succeeded")
+        channel.publish("run_finished", status="succeeded", reward=reward)
+        record_history(job, channel, "succeeded", action, reward=reward)
+    finally:
+        # A suspended run keeps its event stream open; it continues when the run resumes
+        if not suspended:
+            channel.close()
     
-    return {"status": "success", "result": result, "reward": reward}
+    return result, reward
+
+job_queue = JobQueue(run_crew)
+# Identical concurrent goals share one crew instead of each starting their own
+single_flight = SingleFlight(job_queue)
+
+@app.on_event("startup")
+def warm_agent_pool():
+    # In the background, so the server answers before the LLM client and agents exist
+    agent_pool.warm_async()
+
+@app.on_event("shutdown")
+def shutdown_job_queue():
+    job_queue.shutdown(wait=False)
+    rl_optimizer.stop()
+
+# --- API Endpoints ---
+@app.get("/")
+def read_root():
+    return {"status": "ok", "message": "Welcome to DevBoss Swarm!"}
+
+@app.post("/run-project", status_code=202)
+def run_project(request: ProjectRequest):
+    """
+    Endpoint to enqueue a project for the multi-agent crew.
+    Returns a job id immediately; poll GET /jobs/{job_id} for the outcome.
+    A duplicate of a goal that is already running gets that run's job id ("coalesced").
+    """
+    try:
+        job, coalesced = single_flight.submit(request.goal, request.model_dump(exclude={"goal"}, exclude_none=True))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=f"Job queue is full: {e}")
+    event_bus.open(job.id)
+    return {"job_id": job.id, "status": job.status, "coalesced": coalesced}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Returns the status of a job, plus its result and reward once it has finished."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+    return job.to_dict()
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """
+    Cancels a queued or waiting job, or stops a running job at its next task boundary.
+    A run shared by coalesced requests is only cancelled once every requester has cancelled.
+    """
+    job, cancelled = single_flight.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+    if not cancelled:
+        return {**job.to_dict(), "requesters": single_flight.requesters(job_id)}
+    channel = event_bus.get(job_id)
+    if job.status == "cancelled":
+        human_loop.discard(job_id)
+        run_store.set_status(job_id, "cancelled")
+    if channel is not None and job.status == "cancelled" and not channel.closed:
+        # No crew is running (it never started, or it is suspended), so nothing else will close its event stream
+        channel.publish("run_finished", status="cancelled")
+        channel.close()
+    return job.to_dict()
+
+@app.get("/runs")
+def list_runs(cursor: Optional[str] = None, limit: int = RUN_HISTORY_PAGE_SIZE,
+              order: Literal["desc", "asc"] = "desc", since: Optional[float] = None, until: Optional[float] = None):
+    """
+    Finished runs, newest first, one page at a time; pass `next_cursor` back as `cursor` for the next page.
+    With order=asc, polling the last cursor returns runs as they finish. since/until are Unix timestamps.
+    """
+    try:
+        records, next_cursor = run_history.page(cursor, limit, order, since, until)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'.")
+    return {"runs": [summarize(record) for record in records], "next_cursor": next_cursor}
+
+@app.get("/runs/{run_id}")
+def get_run(run_id: str):
+    """A finished run with its task outputs and timings, or the checkpointed state of one still in progress."""
+    record = run_history.get(run_id)
+    if record is not None:
+        return record
+    saved = run_store.get(run_id)
+    if saved is None:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' not found.")
+    return saved.to_dict()
+
+@app.get("/runs/{run_id}/questions")
+def run_questions(run_id: str):
+    """Questions the run's agents asked a human. While any is pending the run is suspended."""
+    job = job_queue.get(run_id)
+    questions = human_loop.questions(run_id)
+    if job is None and not questions:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' not found.")
+    return {"run_id": run_id, "status": job.status if job else None, "questions": [q.to_dict() for q in questions]}
+
+@app.post("/runs/{run_id}/answer")
+def answer_question(run_id: str, request: AnswerRequest):
+    """Answers a pending question. Once none are left the run resumes on the next free worker."""
+    job = job_queue.get(run_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' not found.")
+    if job.status in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Run '{run_id}' has already {job.status}.")
+    try:
+        entry = human_loop.answer(run_id, request.answer, request.question_id)
+    except NoPendingQuestion:
+        raise HTTPException(status_code=409, detail=f"Run '{run_id}' has no such pending question.")
+    channel = event_bus.get(run_id)
+    if channel is not None:
+        channel.publish("question_answered", question_id=entry.id)
+    resumed = not human_loop.pending(run_id)
+    if resumed:
+        job_queue.resume(run_id)
+    return {"question": entry.to_dict(), "resumed": resumed, "status": job.status}
+
+@app.post("/runs/{run_id}/resume", status_code=202)
+def resume_run(run_id: str):
+    """
+    Retries a failed or cancelled run as a new job that starts at its first unfinished task,
+    reusing the checkpointed outputs and the Jira tickets the run already created.
+    """
+    record = run_store.get(run_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' not found.")
+    # A run still marked running that this process does not know was cut short by a restart
+    orphaned = record.status == "running" and job_queue.get(run_id) is None
+    if record.status not in ("failed", "cancelled") and not orphaned:
+        raise HTTPException(status_code=409, detail=f"Run '{run_id}' is {record.status}; it cannot be resumed.")
+    options = {**record.options, "resume_from": run_id}
+    try:
+        job = job_queue.submit(record.goal, options)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=f"Job queue is full: {e}")
+    event_bus.open(job.id)
+    return {"job_id": job.id, "status": job.status, "resumed_from": run_id, "completed_tasks": list(record.outputs)}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Per-task, per-agent, LLM, Jira and queue metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/summary")
+def metrics_summary():
+    """The same metrics digested into JSON for the dashboard."""
+    return metrics.summary()
+
+@app.get("/coalescing")
+def coalescing_stats():
+    """How many requests joined an in-flight run or were answered from a just-finished one, per goal."""
+    return single_flight.stats()
+
+@app.get("/rate-limits")
+def rate_limit_stats():
+    """Remaining LLM and Jira budget, callers queued for it by priority, and how long they waited."""
+    return rate_limits.stats()
+
+@app.get("/model-routing")
+def model_routing_stats():
+    """Which tier each task and agent uses, and per-tier calls, latency, cost and escalation rate."""
+    return {**router.stats(), "by_tier": metrics.summary()["llm"]["by_tier"]}
+
+@app.get("/llm-cache")
+def llm_cache_stats():
+    """Hit, miss and eviction counters of the LLM response cache, plus the model time it saved."""
+    if llm_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **llm_cache.snapshot()}
+
+@app.get("/rl-policy")
+def rl_policy_stats():
+    """Version of the policy serving requests, replay buffer size and the last training loss."""
+    return rl_optimizer.stats()
+
+@app.get("/runs/{run_id}/events")
+async def stream_run_events(run_id: str, request: Request, offset: int = 0,
+                            last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events stream of a run's agent steps, tool calls and task start/finish.
+    Pass `offset` (or let the browser send Last-Event-ID on reconnect) to replay from an event id.
+    """
+    channel = event_bus.get(run_id)
+    if channel is None:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' not found.")
+    if last_event_id is not None and last_event_id.isdigit():
+        offset = max(offset, int(last_event_id) + 1)
+
+    subscriber = channel.subscribe(asyncio.get_running_loop(), offset)
+
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                batch = await subscriber.next_batch(timeout=15)
+                if subscriber.dropped:
+                    # This client fell behind; tell it how much it missed so it can reconnect with an offset
+                    dropped, subscriber.dropped = subscriber.dropped, 0
+                    yield {"event": "dropped", "data": json.dumps({"count": dropped})}
+                for event in batch:
+                    yield {"id": str(event["id"]), "event": event["type"], "data": json.dumps(event)}
+                if subscriber.closed and not batch:
+                    break
+        finally:
+            channel.unsubscribe(subscriber)
+
+    return EventSourceResponse(event_stream())
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
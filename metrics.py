@@ -0,0 +1,311 @@
+# metrics.py
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, Tuple
+
+# Seconds; wide enough for both a Jira call and a whole crew run
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list:
+        lines = super().render()
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; observe() is a bisect and three additions under a lock."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def states(self) -> Dict[Tuple, tuple]:
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+
+    def quantile(self, q: float, counts: list) -> float:
+        """Estimates a quantile from bucket counts, interpolating inside the bucket like Prometheus does."""
+        count = sum(counts)
+        if count == 0:
+            return 0.0
+        rank, seen = q * count, 0
+        for i, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count > 0:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def render(self) -> list:
+        lines = super().render()
+        for key, (counts, total, count) in sorted(self.states().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """The Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- The DevBoss Metrics ---
+JOBS_TOTAL = REGISTRY.register(Counter(
+    "devboss_jobs_total", "Jobs that reached a final state.", ["status"]))
+JOBS_ACTIVE = REGISTRY.register(Gauge(
+    "devboss_jobs_active", "Jobs currently queued, running or waiting for a human.", ["state"]))
+JOBS_COALESCED = REGISTRY.register(Counter(
+    "devboss_jobs_coalesced_total", "Requests served by an identical in-flight or just-finished run.", ["kind"]))
+JOB_QUEUE_WAIT = REGISTRY.register(Histogram(
+    "devboss_job_queue_wait_seconds", "Time a job waited in the queue before a worker picked it up."))
+JOB_DURATION = REGISTRY.register(Histogram(
+    "devboss_job_duration_seconds", "Wall time of a crew run, from start to final state.", ["status"]))
+TASK_DURATION = REGISTRY.register(Histogram(
+    "devboss_task_duration_seconds", "Wall time of each crew task.", ["task", "agent"]))
+AGENT_SECONDS = REGISTRY.register(Counter(
+    "devboss_agent_seconds_total", "Total time each agent spent executing tasks.", ["agent"]))
+LLM_CALLS = REGISTRY.register(Counter(
+    "devboss_llm_calls_total", "LLM calls, by model and outcome.", ["model", "status"]))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "devboss_llm_tokens_total", "LLM tokens used, by model and kind (prompt/completion).", ["model", "kind"]))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    "devboss_llm_call_seconds", "Latency of each LLM call.", ["model"]))
+LLM_TIER_LATENCY = REGISTRY.register(Histogram(
+    "devboss_llm_tier_call_seconds", "Latency of routed LLM calls, by model tier.", ["tier"]))
+LLM_COST = REGISTRY.register(Counter(
+    "devboss_llm_cost_usd_total", "Estimated LLM spend in USD, by model tier.", ["tier"]))
+LLM_ESCALATIONS = REGISTRY.register(Counter(
+    "devboss_llm_escalations_total", "Small-model replies that failed validation and were redone on the large model.",
+    ["tier", "reason"]))
+TASK_PROMPT_TOKENS = REGISTRY.register(Counter(
+    "devboss_task_prompt_tokens_total", "LLM prompt tokens sent on behalf of each crew task.", ["task"]))
+CONTEXT_TOKENS = REGISTRY.register(Counter(
+    "devboss_context_tokens_total",
+    "Estimated tokens of earlier outputs handed to each task as context, before (raw) and after compaction.",
+    ["task", "stage"]))
+RATE_LIMIT_QUEUE = REGISTRY.register(Gauge(
+    "devboss_rate_limit_queued", "Calls waiting for the shared LLM/Jira budget.", ["upstream"]))
+RATE_LIMIT_WAIT = REGISTRY.register(Histogram(
+    "devboss_rate_limit_wait_seconds", "Time a call waited for the shared budget, by priority class.",
+    ["upstream", "priority"]))
+JIRA_REQUESTS = REGISTRY.register(Histogram(
+    "devboss_jira_request_seconds", "Latency of each Jira REST request, by endpoint and status code.",
+    ["method", "endpoint", "status"]))
+
+
+# --- Run Event Listener ---
+_task_starts = {}
+_task_starts_lock = threading.Lock()
+
+
+def record_run_event(run_id: str, event: dict):
+    """Turns a run's task_started/task_finished events into task and agent timings."""
+    kind = event["type"]
+    if kind == "task_started":
+        with _task_starts_lock:
+            _task_starts[(run_id, event.get("task_index"))] = event["timestamp"]
+    elif kind == "task_finished":
+        with _task_starts_lock:
+            started = _task_starts.pop((run_id, event.get("task_index")), None)
+        if started is not None:
+            duration = event["timestamp"] - started
+            agent = event.get("agent") or "unknown"
+            TASK_DURATION.observe(duration, task=event.get("task") or "unknown", agent=agent)
+            AGENT_SECONDS.inc(duration, agent=agent)
+    elif kind == "context_compacted":
+        task = event.get("task") or "unknown"
+        CONTEXT_TOKENS.inc(event["raw_tokens"], task=task, stage="raw")
+        CONTEXT_TOKENS.inc(event["context_tokens"], task=task, stage="compacted")
+    elif kind in ("run_finished", "run_suspended"):
+        # A suspended run resumes as a new attempt with new task_started events
+        with _task_starts_lock:
+            for key in [key for key in _task_starts if key[0] == run_id]:
+                del _task_starts[key]
+
+
+# --- Dashboard Summary ---
+def _histogram_summary(histogram: Histogram, group_by: int = None) -> dict:
+    """Per label value (or overall): count, mean, p50 and p95."""
+    grouped = {}
+    for key, (counts, total, count) in histogram.states().items():
+        group = key[group_by] if group_by is not None else "all"
+        entry = grouped.setdefault(group, [[0] * len(counts), 0.0, 0])
+        entry[0] = [a + b for a, b in zip(entry[0], counts)]
+        entry[1] += total
+        entry[2] += count
+    return {
+        group: {
+            "count": count,
+            "mean": round(total / count, 4) if count else 0.0,
+            "p50": round(histogram.quantile(0.5, counts), 4),
+            "p95": round(histogram.quantile(0.95, counts), 4),
+        }
+        for group, (counts, total, count) in grouped.items()
+    }
+
+
+def summary() -> dict:
+    """A JSON-friendly digest of the metrics above, shaped for the dashboard."""
+    jobs = {key[0]: value for key, value in JOBS_TOTAL.values().items()}
+    finished = sum(jobs.values())
+    active = {key[0]: value for key, value in JOBS_ACTIVE.values().items()}
+    tokens = {}
+    for (model, kind), value in LLM_TOKENS.values().items():
+        tokens.setdefault(model, {})[kind] = value
+    routing = {}
+    for tier, entry in _histogram_summary(LLM_TIER_LATENCY, 0).items():
+        routing[tier] = {"calls": entry["count"], "latency_s": entry, "cost_usd": 0.0, "escalations": 0}
+    for (tier,), value in LLM_COST.values().items():
+        routing.setdefault(tier, {"calls": 0})["cost_usd"] = round(value, 4)
+    for (tier, _), value in LLM_ESCALATIONS.values().items():
+        entry = routing.setdefault(tier, {"calls": 0})
+        entry["escalations"] = entry.get("escalations", 0) + value
+    for entry in routing.values():
+        # Escalated calls are counted under both tiers; the rate is per small-tier call
+        entry["escalation_rate"] = round(entry.get("escalations", 0) / entry["calls"], 4) if entry["calls"] else 0.0
+    context = {}
+    for (task, stage), value in CONTEXT_TOKENS.values().items():
+        context.setdefault(task, {"raw": 0, "compacted": 0})[stage] = value
+    for entry in context.values():
+        entry["reduction_pct"] = round(100 * (1 - entry["compacted"] / entry["raw"]), 1) if entry["raw"] else 0.0
+    jira_by_status = {}
+    for key, (_, _, count) in JIRA_REQUESTS.states().items():
+        jira_by_status[key[2]] = jira_by_status.get(key[2], 0) + count
+    return {
+        "jobs": {
+            "by_status": jobs,
+            "success_rate": round(100 * jobs.get("succeeded", 0) / finished, 1) if finished else 0.0,
+            "queued": active.get("queued", 0),
+            "running": active.get("running", 0),
+            "waiting_for_input": active.get("waiting_for_input", 0),
+            "duration_s": _histogram_summary(JOB_DURATION).get("all", {}),
+            "queue_wait_s": _histogram_summary(JOB_QUEUE_WAIT).get("all", {}),
+        },
+        "tasks": {
+            "completed": sum(entry["count"] for entry in _histogram_summary(TASK_DURATION, 0).values()),
+            "by_task": _histogram_summary(TASK_DURATION, 0),
+            "by_agent": _histogram_summary(TASK_DURATION, 1),
+            "prompt_tokens": {key[0]: value for key, value in TASK_PROMPT_TOKENS.values().items()},
+            "context_tokens": context,
+        },
+        "llm": {
+            "calls": {f"{model}:{status}": value for (model, status), value in LLM_CALLS.values().items()},
+            "tokens": tokens,
+            "latency_s": _histogram_summary(LLM_LATENCY, 0),
+            "by_tier": routing,
+        },
+        "jira": {
+            "requests_by_status": jira_by_status,
+            "latency_s": _histogram_summary(JIRA_REQUESTS, 1),
+        },
+        "rate_limits": {
+            "queued": {key[0]: value for key, value in RATE_LIMIT_QUEUE.values().items()},
+            "wait_s": _histogram_summary(RATE_LIMIT_WAIT, 0),
+            "wait_s_by_priority": _histogram_summary(RATE_LIMIT_WAIT, 1),
+        },
+    }
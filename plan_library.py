@@ -0,0 +1,145 @@
+# plan_library.py
+
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import List, Optional
+
+# --- Configuration ---
+DATA_DIR = os.getenv("DEVBOSS_DATA_DIR", ".devboss")
+# Set PLAN_LIBRARY_PATH to an empty string to always plan from scratch
+PLAN_LIBRARY_PATH = os.getenv("PLAN_LIBRARY_PATH", os.path.join(DATA_DIR, "plan_library.sqlite3"))
+PLAN_LIBRARY_SIZE = int(os.getenv("PLAN_LIBRARY_SIZE", "500"))
+# Above SEED the stored plan is handed to the coordinator as a starting point;
+# above SKIP it is used as is and the planning LLM call is skipped.
+PLAN_SEED_THRESHOLD = float(os.getenv("PLAN_SEED_THRESHOLD", "0.5"))
+PLAN_SKIP_THRESHOLD = float(os.getenv("PLAN_SKIP_THRESHOLD", "0.9"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    goal TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+STOPWORDS = {"a", "an", "the", "and", "or", "for", "to", "of", "in", "on", "with", "we", "i", "our",
+             "my", "me", "please", "need", "want", "that", "this", "is", "be", "it", "as", "by", "new"}
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def terms(text: str) -> Counter:
+    """Word unigrams plus bigrams, so word order still counts for a little."""
+    words = [w for w in TOKEN.findall(text.lower()) if w not in STOPWORDS]
+    return Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+@dataclass
+class PlanMatch:
+    goal: str
+    plan: str
+    similarity: float
+
+
+class PlanLibrary:
+    """
+    Completed plans indexed by a TF-IDF vector of their goal, computed locally.
+    Lookups walk an inverted index, so only plans sharing a term with the new goal are scored.
+    """
+
+    def __init__(self, path: str = PLAN_LIBRARY_PATH, max_plans: int = PLAN_LIBRARY_SIZE):
+        self.max_plans = max_plans
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+        self._plans = {}                      # id -> (goal, plan)
+        self._doc_terms = {}                  # id -> Counter of terms
+        self._postings = defaultdict(dict)    # term -> {id: term frequency}
+        self._norms = {}                      # id -> vector length under the current idf
+        self._norms_dirty = False
+        for plan_id, goal, plan in self._conn.execute("SELECT id, goal, plan FROM plans ORDER BY id"):
+            self._index(plan_id, goal, plan)
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    # --- Indexing ---
+    def add(self, goal: str, plan: str):
+        with self._lock:
+            with self._conn:
+                plan_id = self._conn.execute("INSERT INTO plans (goal, plan, created) VALUES (?, ?, ?)",
+                                             (goal, plan, time.time())).lastrowid
+            self._index(plan_id, goal, plan)
+            # Oldest plans go first once the library is full
+            while len(self._plans) > self.max_plans:
+                self._remove(min(self._plans))
+
+    def _index(self, plan_id: int, goal: str, plan: str):
+        # Caller must hold self._lock (or be the constructor)
+        doc_terms = terms(goal)
+        self._plans[plan_id] = (goal, plan)
+        self._doc_terms[plan_id] = doc_terms
+        for term, tf in doc_terms.items():
+            self._postings[term][plan_id] = tf
+        self._norms_dirty = True
+
+    def _remove(self, plan_id: int):
+        # Caller must hold self._lock
+        with self._conn:
+            self._conn.execute("DELETE FROM plans WHERE id = ?", (plan_id,))
+        for term in self._doc_terms.pop(plan_id):
+            del self._postings[term][plan_id]
+            if not self._postings[term]:
+                del self._postings[term]
+        del self._plans[plan_id]
+        self._norms.pop(plan_id, None)
+        self._norms_dirty = True
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self._plans)) / (1 + len(self._postings.get(term, ())))) + 1
+
+    def _refresh_norms(self):
+        # idf shifts whenever the library changes, so stored vector lengths are recomputed lazily
+        if not self._norms_dirty:
+            return
+        self._norms = {
+            plan_id: math.sqrt(sum((tf * self._idf(term)) ** 2 for term, tf in doc_terms.items()))
+            for plan_id, doc_terms in self._doc_terms.items()
+        }
+        self._norms_dirty = False
+
+    # --- Lookup ---
+    def nearest(self, goal: str, k: int = 3) -> List[PlanMatch]:
+        """The k stored plans whose goals are most similar (cosine over TF-IDF) to `goal`."""
+        query = terms(goal)
+        with self._lock:
+            self._refresh_norms()
+            weights = {term: tf * self._idf(term) for term, tf in query.items()}
+            query_norm = math.sqrt(sum(w * w for w in weights.values()))
+            if query_norm == 0:
+                return []
+
+            scores = defaultdict(float)
+            for term, weight in weights.items():
+                idf = self._idf(term)
+                for plan_id, tf in self._postings.get(term, {}).items():
+                    scores[plan_id] += weight * tf * idf
+
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [
+                PlanMatch(*self._plans[plan_id], similarity=score / (query_norm * self._norms[plan_id]))
+                for plan_id, score in best if self._norms[plan_id] > 0
+            ]
+
+    def best_match(self, goal: str, threshold: float = PLAN_SEED_THRESHOLD) -> Optional[PlanMatch]:
+        matches = self.nearest(goal, k=1)
+        return matches[0] if matches and matches[0].similarity >= threshold else None
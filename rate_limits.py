@@ -0,0 +1,166 @@
+# rate_limits.py
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from metrics import RATE_LIMIT_QUEUE, RATE_LIMIT_WAIT
+
+# --- Configuration ---
+# Budgets shared by every run in this process; 0 turns a budget off.
+LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", "8"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "450000"))
+JIRA_REQUESTS_PER_SECOND = float(os.getenv("JIRA_REQUESTS_PER_SECOND", "10"))
+# Bursts allowed on top of the steady rate, in seconds' worth of budget
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "1"))
+# Tokens charged up front for an LLM call before we have seen any real usage
+LLM_TOKENS_PER_CALL_ESTIMATE = float(os.getenv("LLM_TOKENS_PER_CALL_ESTIMATE", "2000"))
+# Pause after a 429 that did not say how long to wait
+RATE_LIMIT_COOLDOWN = float(os.getenv("RATE_LIMIT_COOLDOWN", "2"))
+
+# Priority classes: lower goes first. Runs already under way finish before new runs start planning.
+PRIORITY_FINISH = 0
+PRIORITY_START = 1
+PRIORITY_DEFAULT = 1
+PRIORITY_NAMES = {PRIORITY_FINISH: "finish", PRIORITY_START: "start"}
+
+_priority: ContextVar[int] = ContextVar("rate_limit_priority", default=PRIORITY_DEFAULT)
+
+
+def set_priority(priority: int):
+    """Sets the priority of the calls made from here on in this context (e.g. by the current task)."""
+    _priority.set(priority)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Sets the priority for the calls made inside the block, and restores the previous one after it."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """`rate` units per second, up to `capacity` banked. Charges may overdraw it; callers then wait it out."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        # A request larger than the bucket only waits for a full bucket, or it would never run
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+
+class RateLimiter:
+    """
+    Token buckets for one upstream (e.g. "llm" or "jira") with a priority queue in front of them.
+    Waiters are served strictly by priority, then in arrival order, so a burst of low-priority
+    calls cannot starve a run that is nearly done.
+    """
+
+    def __init__(self, name: str, budgets: Dict[str, float], burst: float = RATE_LIMIT_BURST):
+        self.name = name
+        # Budgets are per second; a zero budget is no limit at all
+        self.buckets = {unit: TokenBucket(rate, rate * burst) for unit, rate in budgets.items() if rate > 0}
+        self.cooldown_until = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.granted = 0
+        self.waited = 0.0
+
+    def acquire(self, cost: Optional[Dict[str, float]] = None, priority: Optional[int] = None) -> float:
+        """Blocks until the budgets cover `cost` (default: one request); returns the seconds waited."""
+        cost = cost or {"requests": 1}
+        priority = _priority.get() if priority is None else priority
+        started = time.monotonic()
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            RATE_LIMIT_QUEUE.inc(upstream=self.name)
+            try:
+                while True:
+                    if self._waiters[0] == ticket:
+                        delay = self._delay(cost, time.monotonic())
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                heapq.heappop(self._waiters)
+                for unit, amount in cost.items():
+                    if unit in self.buckets:
+                        self.buckets[unit].tokens -= amount
+                self.granted += 1
+                waited = time.monotonic() - started
+                self.waited += waited
+            except BaseException:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                raise
+            finally:
+                RATE_LIMIT_QUEUE.dec(upstream=self.name)
+                # The next waiter in line re-checks the budget
+                self._cond.notify_all()
+        RATE_LIMIT_WAIT.observe(waited, upstream=self.name, priority=PRIORITY_NAMES.get(priority, str(priority)))
+        return waited
+
+    def _delay(self, cost: Dict[str, float], now: float) -> float:
+        # Caller must hold self._cond
+        delay = self.cooldown_until - now
+        for unit, bucket in self.buckets.items():
+            bucket.refill(now)
+            delay = max(delay, bucket.wait_time(cost.get(unit, 0)))
+        return delay
+
+    def charge(self, unit: str, amount: float):
+        """Settles usage known only afterwards (e.g. LLM tokens); negative amounts refund."""
+        with self._cond:
+            bucket = self.buckets.get(unit)
+            if bucket is not None:
+                bucket.refill(time.monotonic())
+                bucket.tokens = min(bucket.capacity, bucket.tokens - amount)
+
+    def cool_down(self, seconds: Optional[float] = None):
+        """The upstream said 429: nobody calls it again until `seconds` have passed."""
+        with self._cond:
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + (RATE_LIMIT_COOLDOWN if seconds is None else seconds))
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            for bucket in self.buckets.values():
+                bucket.refill(now)
+            return {
+                "budgets": {unit: {"per_second": b.rate, "available": round(b.tokens, 1), "capacity": b.capacity}
+                            for unit, b in self.buckets.items()},
+                "queued": len(self._waiters),
+                "queued_by_priority": {PRIORITY_NAMES.get(p, str(p)): sum(1 for w in self._waiters if w[0] == p)
+                                       for p in sorted({w[0] for w in self._waiters})},
+                "cooling_down_s": round(max(0.0, self.cooldown_until - now), 3),
+                "granted": self.granted,
+                "mean_wait_s": round(self.waited / self.granted, 4) if self.granted else 0.0,
+            }
+
+
+llm_limiter = RateLimiter("llm", {"requests": LLM_REQUESTS_PER_SECOND, "tokens": LLM_TOKENS_PER_MINUTE / 60})
+jira_limiter = RateLimiter("jira", {"requests": JIRA_REQUESTS_PER_SECOND})
+
+
+def stats() -> dict:
+    return {"llm": llm_limiter.stats(), "jira": jira_limiter.stats()}
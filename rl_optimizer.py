@@ -1,9 +1,30 @@
 # rl_optimizer.py
 
+import argparse
+import os
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
 import torch
 import torch.nn as nn
 import torch.optim as optim
 
+from rl_policy import RL_EXPERIENCE_PATH, RL_MODE, RL_POLICY_PATH, ExperienceLog, calculate_reward, save_weights
+
+# --- Configuration ---
+DATA_DIR = os.getenv("DEVBOSS_DATA_DIR", ".devboss")
+# Set RL_CHECKPOINT_PATH to an empty string to start from a fresh policy on every restart
+RL_CHECKPOINT_PATH = os.getenv("RL_CHECKPOINT_PATH", os.path.join(DATA_DIR, "rl_policy.pt"))
+RL_BUFFER_SIZE = int(os.getenv("RL_BUFFER_SIZE", "10000"))
+RL_BATCH_SIZE = int(os.getenv("RL_BATCH_SIZE", "32"))
+# The trainer wakes up when a batch worth of new experience is waiting, or after this many seconds
+RL_TRAIN_INTERVAL = float(os.getenv("RL_TRAIN_INTERVAL", "30"))
+RL_MAX_STEPS_PER_ROUND = int(os.getenv("RL_MAX_STEPS_PER_ROUND", "10"))
+RL_LEARNING_RATE = float(os.getenv("RL_LEARNING_RATE", "0.01"))
+
 # --- A Simple Policy Network ---
 # This network will learn to make better decisions. For this prototype, it's very basic.
 class PolicyNetwork(nn.Module):
@@ -20,59 +41,281 @@ class PolicyNetwork(nn.Module):
         x = self.fc2(x)
         return self.softmax(x)
 
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    """An immutable copy of the policy weights; swapped in whole, so readers never need a lock."""
+    version: int
+    weights: Dict[str, torch.Tensor]
+
+    def probabilities(self, states: torch.Tensor) -> torch.Tensor:
+        w = self.weights
+        hidden = torch.relu(states @ w["fc1.weight"].T + w["fc1.bias"])
+        return torch.softmax(hidden @ w["fc2.weight"].T + w["fc2.bias"], dim=-1)
+
+
+@dataclass
+class Experience:
+    state: List[float]
+    action: int
+    reward: float
+
+
+# --- The Replay Buffer ---
+class ReplayBuffer:
+    """Bounded, thread-safe store of (state, action, reward); the oldest experience falls out first."""
+
+    def __init__(self, capacity: int = RL_BUFFER_SIZE, batch_size: int = RL_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._items = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.pending = 0  # added since the trainer last took a batch
+        self.batch_ready = threading.Event()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def add(self, experience: Experience):
+        with self._lock:
+            self._items.append(experience)
+            self.pending += 1
+            if self.pending >= self.batch_size:
+                self.batch_ready.set()
+
+    def take_pending(self) -> int:
+        """How much new experience arrived since the last call; resets the count."""
+        with self._lock:
+            pending, self.pending = self.pending, 0
+            self.batch_ready.clear()
+            return pending
+
+    def sample(self, size: int) -> List[Experience]:
+        with self._lock:
+            return random.sample(list(self._items), min(size, len(self._items)))
+
+
 # --- The RL Optimizer Class ---
 class RLOptimizer:
-    def __init__(self):
+    """
+    Request threads only read the policy: select_action() samples from the latest weight
+    snapshot and record() drops the outcome into the replay buffer. A background trainer
+    runs REINFORCE on mini-batches from the buffer and publishes a new snapshot after each step.
+    """
+
+    def __init__(self, checkpoint_path: str = RL_CHECKPOINT_PATH, buffer_size: int = RL_BUFFER_SIZE,
+                 batch_size: int = RL_BATCH_SIZE, train_interval: float = RL_TRAIN_INTERVAL,
+                 policy_path: str = RL_POLICY_PATH, store=None):
+        self.checkpoint_path = checkpoint_path
+        self.policy_path = policy_path
+        self.store = store  # rl_shared.SharedPolicyStore the new versions are published to, if any
+        self.batch_size = batch_size
+        self.train_interval = train_interval
+        self.buffer = ReplayBuffer(buffer_size, batch_size)
         self.policy_network = PolicyNetwork()
-        self.optimizer = optim.Adam(self.policy_network.parameters(), lr=0.01)
-        self.saved_log_probs = []
-        self.rewards = []
+        self.optimizer = optim.Adam(self.policy_network.parameters(), lr=RL_LEARNING_RATE)
+        self.version = 0
+        self.updates = 0
+        self.skipped = 0  # batches whose rewards were all equal, so there was nothing to learn
+        self.last_loss: Optional[float] = None
+        self.experience_offset = 0  # how far the trainer process has read the experience log
+        self._train_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if checkpoint_path:
+            self.load_checkpoint()
+        self.snapshot = self._take_snapshot()
 
-    def select_action(self, state):
+    # --- Inference (request threads) ---
+    def select_action(self, state) -> int:
         # In a real implementation, 'state' would come from the project context.
         # Here we use a dummy state tensor.
-        state_tensor = torch.tensor(state, dtype=torch.float32)
-        probs = self.policy_network(state_tensor)
-        
+        with torch.no_grad():
+            probs = self.snapshot.probabilities(torch.tensor(state, dtype=torch.float32))
         # We sample an action based on the probabilities from the network
-        action_dist = torch.distributions.Categorical(probs)
-        action = action_dist.sample()
-        
-        # Save the log probability of the action taken, needed for training
-        self.saved_log_probs.append(action_dist.log_prob(action))
-        return action.item()
-
-    def update_policy(self):
-        # This is the core of the REINFORCE algorithm
-        if not self.saved_log_probs:
+        return torch.distributions.Categorical(probs).sample().item()
+
+    def select_actions(self, states) -> List[int]:
+        """Batched selection: one forward pass for many states."""
+        with torch.no_grad():
+            probs = self.snapshot.probabilities(torch.tensor(states, dtype=torch.float32))
+        return torch.distributions.Categorical(probs).sample().tolist()
+
+    def record(self, state, action: int, reward: float):
+        """Queues one outcome for training; never blocks on the trainer."""
+        self.buffer.add(Experience(list(state), int(action), float(reward)))
+
+    # --- Training (background thread) ---
+    def update_policy(self) -> Optional[float]:
+        """
+        One REINFORCE step on a mini-batch from the replay buffer; returns the loss, or None
+        when the batch carries no learning signal.
+        """
+        batch = self.buffer.sample(self.batch_size)
+        if not batch:
+            return None
+        rewards = torch.tensor([e.reward for e in batch], dtype=torch.float32)
+        # Normalizing the rewards gives a baseline: only better-than-average outcomes are reinforced.
+        # When every reward is the same there is no better or worse, and a step would only move the
+        # weights by noise, so none is taken.
+        if len(batch) < 2 or rewards.std() < 1e-6:
+            self.skipped += 1
+            return None
+        rewards = (rewards - rewards.mean()) / rewards.std()
+        states = torch.tensor([e.state for e in batch], dtype=torch.float32)
+        actions = torch.tensor([e.action for e in batch], dtype=torch.long)
+
+        with self._train_lock:
+            log_probs = torch.distributions.Categorical(self.policy_network(states)).log_prob(actions)
+            policy_loss = -(log_probs * rewards).mean()
+            self.optimizer.zero_grad()
+            policy_loss.backward()
+            self.optimizer.step()
+            self.version += 1
+            self.updates += 1
+            self.last_loss = policy_loss.item()
+            self.snapshot = self._take_snapshot()
+        return self.last_loss
+
+    def train_pending(self) -> int:
+        """Trains on whatever arrived since the last round; returns the number of steps taken."""
+        pending = self.buffer.take_pending()
+        if not pending:
+            return 0
+        steps = min(RL_MAX_STEPS_PER_ROUND, max(1, pending // self.batch_size))
+        steps = sum(self.update_policy() is not None for _ in range(steps))
+        if not steps:
+            return 0
+        if self.checkpoint_path:
+            self.save_checkpoint()
+        if self.policy_path or self.store is not None:
+            self.export_weights()
+        print(f"--- RL Policy Updated (version {self.version}, {steps} step(s), loss {self.last_loss:.4f}) ---")
+        return steps
+
+    def start(self):
+        """Starts the background trainer; idempotent."""
+        if self._thread is not None and self._thread.is_alive():
             return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._train_loop, name="rl-trainer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stops the trainer after a last round, so recorded outcomes reach the checkpoint."""
+        self._stop.set()
+        self.buffer.batch_ready.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _train_loop(self):
+        while not self._stop.is_set():
+            self.buffer.batch_ready.wait(self.train_interval)
+            try:
+                self.train_pending()
+            except Exception as e:
+                # A bad batch must not kill the trainer; the next round starts fresh
+                print(f"--- RL training round failed: {e} ---")
+        try:
+            self.train_pending()
+        except Exception as e:
+            print(f"--- RL training round failed: {e} ---")
+
+    # --- Snapshots and Checkpoints ---
+    def _take_snapshot(self) -> PolicySnapshot:
+        weights = {name: tensor.detach().clone() for name, tensor in self.policy_network.state_dict().items()}
+        return PolicySnapshot(self.version, weights)
+
+    def save_checkpoint(self):
+        with self._train_lock:
+            state = {
+                "version": self.version,
+                "experience_offset": self.experience_offset,
+                "policy": self.policy_network.state_dict(),
+                "optimizer": self.optimizer.state_dict(),
+            }
+            if os.path.dirname(self.checkpoint_path):
+                os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+            # Write then rename, so a crash mid-save never leaves a truncated checkpoint behind
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            torch.save(state, tmp_path)
+            os.replace(tmp_path, self.checkpoint_path)
+
+    def load_checkpoint(self) -> bool:
+        if not os.path.exists(self.checkpoint_path):
+            return False
+        try:
+            state = torch.load(self.checkpoint_path, map_location="cpu")
+            self.policy_network.load_state_dict(state["policy"])
+            self.optimizer.load_state_dict(state["optimizer"])
+            self.version = state.get("version", 0)
+            self.experience_offset = state.get("experience_offset", 0)
+        except Exception as e:
+            print(f"--- Could not load RL checkpoint {self.checkpoint_path}, starting fresh: {e} ---")
+            return False
+        return True
+
+    def export_weights(self):
+        """Publishes the current snapshot for torch-free workers (rl_policy.InferencePolicy, rl_shared.SharedPolicy)."""
+        snapshot = self.snapshot
+        weights = {name: tensor.numpy() for name, tensor in snapshot.weights.items()}
+        if self.store is not None:
+            self.store.publish(weights, snapshot.version)
+        if self.policy_path:
+            save_weights(weights, self.policy_path, snapshot.version)
+
+    def stats(self) -> dict:
+        return {
+            "mode": "train",
+            "version": self.version,
+            "updates": self.updates,
+            "skipped_updates": self.skipped,
+            "buffered": len(self.buffer),
+            "pending": self.buffer.pending,
+            "last_loss": self.last_loss,
+            "training": self._thread is not None and self._thread.is_alive(),
+        }
+
+# --- Trainer Process ---
+# With RL_MODE=inference (or shared) the API workers never import torch; this process trains
+# on the outcomes they append to the experience log and exports weights for them to pick up.
+def run_trainer(experience_path: str = RL_EXPERIENCE_PATH, poll_interval: float = 5.0,
+                stop: Optional[threading.Event] = None, store=None):
+    """Trains until interrupted or `stop` is set. With a shared store, versions are published there."""
+    # With a shared store the .npz export is not needed; workers read the store
+    optimizer = RLOptimizer(policy_path="" if store is not None else RL_POLICY_PATH, store=store)
+    log = ExperienceLog(experience_path)
+    if store is not None:
+        # Workers start from what training has reached so far, not from random weights
+        optimizer.export_weights()
+    print(f"--- RL trainer started at policy version {optimizer.version}, reading {experience_path} ---")
+    stop = stop or threading.Event()
+    try:
+        while not stop.is_set():
+            records, optimizer.experience_offset = log.read_from(optimizer.experience_offset)
+            for record in records:
+                optimizer.record(record["state"], record["action"], record["reward"])
+            # Train on a full batch right away, or on a partial one once the log has gone quiet
+            if optimizer.buffer.pending >= optimizer.batch_size or (optimizer.buffer.pending and not records):
+                optimizer.train_pending()
+            if not records:
+                stop.wait(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    optimizer.train_pending()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the RL policy from the API workers' experience log.")
+    parser.add_argument("--experience", default=RL_EXPERIENCE_PATH)
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    args = parser.parse_args()
+    shared_store = None
+    if RL_MODE == "shared":
+        from rl_shared import SharedPolicyStore
 
-        policy_loss = []
-        for log_prob, reward in zip(self.saved_log_probs, self.rewards):
-            # First, calculate the loss
-            loss = -log_prob * reward
-            # Then, unsqueeze it and append it to the list
-            policy_loss.append(loss.unsqueeze(0)) # <-- CORRECTED LOGIC
-
-        self.optimizer.zero_grad()
-        policy_loss_sum = torch.cat(policy_loss).sum()
-        policy_loss_sum.backward()
-        self.optimizer.step()
-        
-        # Clear the memory for the next episode
-        self.saved_log_probs = []
-        self.rewards = []
-        print("--- RL Policy Updated ---")
-
-# --- Reward Calculation ---
-def calculate_reward(crew_result):
-    # For now, we'll simulate an outcome since we don't have real execution data.
-    # In a real system, you'd parse the 'crew_result' for metrics.
-    
-    # Mocked metrics
-    duration_penalty = 5 # (e.g., 5 hours over deadline)
-    quality_score = 95   # (e.g., 95/100)
-    
-    reward = quality_score - duration_penalty
-    print(f"--- Reward Calculated: {reward} ---")
-    return reward
\ No newline at end of file
+        # Waits while a worker (RL_SHARED_TRAINER=auto) or another trainer holds the lease
+        shared_store = SharedPolicyStore()
+        shared_store.acquire_trainer(blocking=True)
+    run_trainer(args.experience, args.poll_interval, store=shared_store)
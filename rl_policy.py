@@ -0,0 +1,224 @@
+# rl_policy.py
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# --- Configuration ---
+DATA_DIR = os.getenv("DEVBOSS_DATA_DIR", ".devboss")
+# "train": the API process imports PyTorch and trains in a background thread (rl_optimizer.py).
+# "inference": the API process only runs the exported weights with NumPy and appends outcomes
+# to RL_EXPERIENCE_PATH; a separate `python -m rl_optimizer` process trains and exports.
+# "shared": like inference, but the weights live in one memory-mapped store for all workers on
+# the host and a single trainer (one of the workers, or the trainer process) publishes to it.
+RL_MODE = os.getenv("RL_MODE", "train")
+RL_POLICY_PATH = os.getenv("RL_POLICY_PATH", os.path.join(DATA_DIR, "rl_policy.npz"))
+RL_EXPERIENCE_PATH = os.getenv("RL_EXPERIENCE_PATH", os.path.join(DATA_DIR, "rl_experience.jsonl"))
+# How often an inference worker checks whether the trainer exported new weights
+RL_RELOAD_INTERVAL = float(os.getenv("RL_RELOAD_INTERVAL", "5"))
+# What a run's outcome is worth to the policy: a base reward for success, a bonus per Jira
+# ticket created (capped) and a cost per minute of run time. Failed runs earn nothing.
+RL_REWARD_SUCCESS = float(os.getenv("RL_REWARD_SUCCESS", "100"))
+RL_REWARD_PER_TICKET = float(os.getenv("RL_REWARD_PER_TICKET", "1"))
+RL_REWARD_TICKET_CAP = int(os.getenv("RL_REWARD_TICKET_CAP", "20"))
+RL_REWARD_PER_MINUTE = float(os.getenv("RL_REWARD_PER_MINUTE", "2"))
+
+# The PolicyNetwork layout (4 -> 128 -> 2), in state_dict names
+LAYER_SHAPES = {"fc1.weight": (128, 4), "fc1.bias": (128,), "fc2.weight": (2, 128), "fc2.bias": (2,)}
+
+
+def initial_weights(seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Random weights drawn like nn.Linear's default init, for when nothing has been exported yet."""
+    rng = np.random.default_rng(seed)
+    weights = {}
+    for layer in ("fc1", "fc2"):
+        out_features, in_features = LAYER_SHAPES[f"{layer}.weight"]
+        bound = 1 / np.sqrt(in_features)
+        weights[f"{layer}.weight"] = rng.uniform(-bound, bound, (out_features, in_features)).astype(np.float32)
+        weights[f"{layer}.bias"] = rng.uniform(-bound, bound, out_features).astype(np.float32)
+    return weights
+
+
+def save_weights(weights: Dict[str, np.ndarray], path: str = RL_POLICY_PATH, version: int = 0):
+    """Writes the weights as .npz, then renames, so readers never see a half-written file."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, version=np.int64(version), **weights)
+    os.replace(tmp_path, path)
+
+
+def load_weights(path: str = RL_POLICY_PATH) -> tuple:
+    """Returns (weights, version) from an exported .npz."""
+    with np.load(path) as data:
+        weights = {name: data[name].astype(np.float32) for name in LAYER_SHAPES}
+        version = int(data["version"]) if "version" in data.files else 0
+    for name, shape in LAYER_SHAPES.items():
+        if weights[name].shape != shape:
+            raise ValueError(f"{name} has shape {weights[name].shape}, expected {shape}")
+    return weights, version
+
+
+class NumpyPolicy:
+    """The PolicyNetwork forward pass in NumPy. Immutable; replace the whole object to update it."""
+
+    def __init__(self, weights: Dict[str, np.ndarray], version: int = 0):
+        self.version = version
+        self.w1 = weights["fc1.weight"].T.copy()
+        self.b1 = weights["fc1.bias"]
+        self.w2 = weights["fc2.weight"].T.copy()
+        self.b2 = weights["fc2.bias"]
+
+    def probabilities(self, states: np.ndarray) -> np.ndarray:
+        """Action probabilities for a (batch, 4) array of states."""
+        hidden = np.maximum(states @ self.w1 + self.b1, 0)
+        logits = hidden @ self.w2 + self.b2
+        logits -= logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def sample(self, states: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """One sampled action per state, by inverting each row's cumulative distribution."""
+        cumulative = np.cumsum(self.probabilities(states), axis=-1)
+        draws = rng.random((len(states), 1))
+        return np.minimum((cumulative < draws).sum(axis=-1), cumulative.shape[-1] - 1)
+
+
+class ExperienceLog:
+    """Append-only JSONL of (state, action, reward) that the trainer process consumes."""
+
+    def __init__(self, path: str = RL_EXPERIENCE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def append(self, state, action: int, reward: float):
+        line = json.dumps({"state": [float(x) for x in state], "action": int(action), "reward": float(reward),
+                           "timestamp": time.time()})
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+    def read_from(self, offset: int) -> tuple:
+        """Complete records after byte `offset`, and the offset to resume from."""
+        if not os.path.exists(self.path):
+            return [], offset
+        records = []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written; pick it up next time
+                offset += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records, offset
+
+
+class InferencePolicy:
+    """
+    The torch-free policy for API workers. Same interface as RLOptimizer: select_action(s)
+    read the newest exported weights, record() hands the outcome to the trainer process.
+    """
+
+    def __init__(self, policy_path: str = RL_POLICY_PATH, experience_path: str = RL_EXPERIENCE_PATH,
+                 reload_interval: float = RL_RELOAD_INTERVAL, seed: Optional[int] = None):
+        self.policy_path = policy_path
+        self.reload_interval = reload_interval
+        self.experience = ExperienceLog(experience_path)
+        self.recorded = 0
+        self._rng = np.random.default_rng(seed)
+        # NumPy generators are not thread-safe, and every request thread samples from this one
+        self._rng_lock = threading.Lock()
+        self._mtime = None
+        self._checked = 0.0
+        self._reload_lock = threading.Lock()
+        self.policy = NumpyPolicy(initial_weights(seed))
+        self.reload()
+
+    def reload(self) -> bool:
+        """Swaps in the exported weights if the file changed since the last load."""
+        try:
+            mtime = os.stat(self.policy_path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            weights, version = load_weights(self.policy_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"--- Could not load RL policy {self.policy_path}: {e} ---")
+            return False
+        self.policy, self._mtime = NumpyPolicy(weights, version), mtime
+        return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval or not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked = now
+            self.reload()
+        finally:
+            self._reload_lock.release()
+
+    def select_actions(self, states) -> List[int]:
+        """Batched selection: one forward pass for many states."""
+        self._maybe_reload()
+        policy, states = self.policy, np.asarray(states, dtype=np.float32)
+        with self._rng_lock:
+            return policy.sample(states, self._rng).tolist()
+
+    def select_action(self, state) -> int:
+        return self.select_actions([state])[0]
+
+    def record(self, state, action: int, reward: float):
+        self.experience.append(state, action, reward)
+        self.recorded += 1
+
+    def start(self):
+        pass  # training happens in the trainer process
+
+    def stop(self, timeout: float = 10.0):
+        pass
+
+    def stats(self) -> dict:
+        return {"mode": "inference", "version": self.policy.version, "recorded": self.recorded,
+                "policy_path": self.policy_path}
+
+
+def create_policy():
+    """The policy object for this process; only "train" mode imports PyTorch."""
+    if RL_MODE == "inference":
+        return InferencePolicy()
+    if RL_MODE == "shared":
+        from rl_shared import SharedPolicy
+        return SharedPolicy()
+    from rl_optimizer import RLOptimizer
+    return RLOptimizer()
+
+
+# --- Reward Calculation ---
+def calculate_reward(succeeded: bool, duration: float = 0.0, tickets_created: int = 0) -> float:
+    """
+    Scores a run from its outcome: whether it succeeded, how long it ran (seconds) and how many
+    Jira tickets it created. Different outcomes score differently, which is what the trainer learns from.
+    """
+    if not succeeded:
+        reward = 0.0
+    else:
+        reward = (RL_REWARD_SUCCESS
+                  + RL_REWARD_PER_TICKET * min(tickets_created, RL_REWARD_TICKET_CAP)
+                  - RL_REWARD_PER_MINUTE * duration / 60)
+        # A slow success still beats a failure
+        reward = max(reward, 1.0)
+    reward = round(reward, 2)
+    print(f"--- Reward Calculated: {reward} ---")
+    return reward
@@ -0,0 +1,226 @@
+# rl_shared.py
+
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from rl_policy import (DATA_DIR, LAYER_SHAPES, RL_EXPERIENCE_PATH, RL_RELOAD_INTERVAL, InferencePolicy,
+                       NumpyPolicy)
+
+# --- Configuration ---
+# One memory-mapped file holds the live weights for every worker on the host (point it at
+# /dev/shm to keep it off disk; on disk it also survives restarts).
+RL_SHARED_POLICY_PATH = os.getenv("RL_SHARED_POLICY_PATH", os.path.join(DATA_DIR, "rl_policy.shm"))
+# "auto": the first worker to get the trainer lease trains in-process (and is the only one to
+# import PyTorch); "external": only `python -m rl_optimizer` trains.
+RL_SHARED_TRAINER = os.getenv("RL_SHARED_TRAINER", "auto")
+
+MAGIC = b"DBRLPOL1"
+# magic, parameter count, sequence (odd while a publish is in progress), version, active slot
+HEADER = struct.Struct("<8sQQQQ")
+HEADER_SIZE = 64
+SEQ_OFFSET = 16
+PARAM_COUNT = sum(int(np.prod(shape)) for shape in LAYER_SHAPES.values())
+SLOT_SIZE = PARAM_COUNT * 4
+
+
+def flatten(weights: Dict[str, np.ndarray]) -> np.ndarray:
+    return np.concatenate([np.asarray(weights[name], dtype=np.float32).ravel() for name in LAYER_SHAPES])
+
+
+def unflatten(params: np.ndarray) -> Dict[str, np.ndarray]:
+    weights, start = {}, 0
+    for name, shape in LAYER_SHAPES.items():
+        size = int(np.prod(shape))
+        weights[name] = params[start:start + size].reshape(shape)
+        start += size
+    return weights
+
+
+class SharedPolicyStore:
+    """
+    Versioned policy weights in a memory-mapped file, double-buffered. The single writer fills
+    the slot readers are not using and then flips the header; readers never lock and retry
+    only if a publish overtook their copy (a seqlock). Polling for a new version reads 8 bytes.
+    """
+
+    def __init__(self, path: str = RL_SHARED_POLICY_PATH):
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+        self._lease = None
+        self._write_lock = threading.Lock()
+
+    # --- Mapping ---
+    def _open(self, create: bool = False) -> Optional[mmap.mmap]:
+        if self._mm is not None:
+            return self._mm
+        size = HEADER_SIZE + 2 * SLOT_SIZE
+        if not create and (not os.path.exists(self.path) or os.path.getsize(self.path) != size):
+            return None  # nothing published yet
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, size)
+            mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        magic, count = HEADER.unpack_from(mm, 0)[:2]
+        if magic != MAGIC or count != PARAM_COUNT:
+            if not create:
+                mm.close()
+                return None
+            HEADER.pack_into(mm, 0, MAGIC, PARAM_COUNT, 0, 0, 0)
+        self._mm = mm
+        return mm
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    # --- Readers (any worker) ---
+    def generation(self) -> Optional[int]:
+        """Changes with every publish (even across trainer restarts); None before the first one."""
+        mm = self._open()
+        if mm is None:
+            return None
+        seq = struct.unpack_from("<Q", mm, SEQ_OFFSET)[0]
+        return seq or None
+
+    def read(self, retries: int = 100) -> Optional[tuple]:
+        """(weights, version) of the latest publish, copied out of the map; None before the first."""
+        mm = self._open()
+        if mm is None:
+            return None
+        for _ in range(retries):
+            _, _, seq, version, slot = HEADER.unpack_from(mm, 0)
+            if seq == 0:
+                return None
+            if seq % 2:
+                time.sleep(0)  # a publish is flipping the header right now
+                continue
+            view = np.frombuffer(mm, dtype=np.float32, count=PARAM_COUNT, offset=HEADER_SIZE + slot * SLOT_SIZE)
+            params = view.copy()
+            del view  # the map cannot be closed while a view exports its buffer
+            if struct.unpack_from("<Q", mm, SEQ_OFFSET)[0] == seq:
+                return unflatten(params), version
+        return None
+
+    # --- The Writer (the trainer holding the lease) ---
+    def acquire_trainer(self, blocking: bool = False) -> bool:
+        """Takes the host-wide trainer lease; the OS releases it if this process dies."""
+        import fcntl
+
+        if self._lease is not None:
+            return True
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lease = open(f"{self.path}.trainer.lock", "a")
+        try:
+            fcntl.flock(lease, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except OSError:
+            lease.close()
+            return False
+        self._lease = lease
+        return True
+
+    def release_trainer(self):
+        if self._lease is not None:
+            self._lease.close()  # closing the file drops the lock
+            self._lease = None
+
+    def publish(self, weights: Dict[str, np.ndarray], version: int):
+        """Writes the inactive slot, then flips the header to it. Only the lease holder may call this."""
+        params = flatten(weights)
+        with self._write_lock:
+            mm = self._open(create=True)
+            _, _, seq, _, slot = HEADER.unpack_from(mm, 0)
+            target = 1 - slot if seq else 0
+            start = HEADER_SIZE + target * SLOT_SIZE
+            mm[start:start + SLOT_SIZE] = params.tobytes()
+            struct.pack_into("<Q", mm, SEQ_OFFSET, seq + 1)
+            HEADER.pack_into(mm, 0, MAGIC, PARAM_COUNT, seq + 1, version, target)
+            struct.pack_into("<Q", mm, SEQ_OFFSET, seq + 2)
+            mm.flush()
+
+
+class SharedPolicy(InferencePolicy):
+    """
+    The policy for multi-worker deployments (RL_MODE=shared). Every worker samples from the
+    weights in the shared store and notices a new version on the next request, without a
+    restart or a lock. One trainer, in one worker or in its own process, learns from every
+    worker's outcomes and publishes the new versions.
+    """
+
+    def __init__(self, store: Optional[SharedPolicyStore] = None, experience_path: str = RL_EXPERIENCE_PATH,
+                 trainer: str = RL_SHARED_TRAINER, seed: Optional[int] = None):
+        self.store = store or SharedPolicyStore()
+        self.trainer = trainer
+        self._stop = threading.Event()
+        self._lease_thread: Optional[threading.Thread] = None
+        self.training = False
+        super().__init__(policy_path=self.store.path, experience_path=experience_path, seed=seed)
+
+    def reload(self) -> bool:
+        # _mtime holds the store generation we last loaded
+        generation = self.store.generation()
+        if generation is None or generation == self._mtime:
+            return False
+        loaded = self.store.read()
+        if loaded is None:
+            return False
+        weights, version = loaded
+        self.policy, self._mtime = NumpyPolicy(weights, version), generation
+        return True
+
+    def _maybe_reload(self):
+        # Cheap enough for every request: a new version is picked up as soon as it is published
+        if self.store.generation() != self._mtime and self._reload_lock.acquire(blocking=False):
+            try:
+                self.reload()
+            finally:
+                self._reload_lock.release()
+
+    def start(self):
+        """In "auto" mode, competes for the trainer lease in the background."""
+        if self.trainer != "auto" or self._lease_thread is not None:
+            return
+        self._stop.clear()
+        self._lease_thread = threading.Thread(target=self._lease_loop, name="rl-trainer-lease", daemon=True)
+        self._lease_thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._lease_thread is not None:
+            self._lease_thread.join(timeout)
+            self._lease_thread = None
+
+    def _lease_loop(self):
+        # Whoever holds the lease trains; the others keep trying, so a replacement takes over
+        # when the training worker exits
+        while not self._stop.is_set():
+            if self.store.acquire_trainer():
+                from rl_optimizer import run_trainer
+
+                self.training = True
+                print(f"--- This worker (pid {os.getpid()}) trains the shared RL policy ---")
+                try:
+                    run_trainer(self.experience.path, stop=self._stop, store=self.store)
+                except Exception as e:
+                    print(f"--- Shared RL trainer failed: {e} ---")
+                finally:
+                    self.training = False
+                    self.store.release_trainer()
+                return
+            self._stop.wait(RL_RELOAD_INTERVAL)
+
+    def stats(self) -> dict:
+        return {"mode": "shared", "version": self.policy.version, "recorded": self.recorded,
+                "store": self.store.path, "training_here": self.training, "pid": os.getpid()}
@@ -0,0 +1,216 @@
+# run_events.py
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+# --- Configuration ---
+# Each run keeps a bounded history for replay; each subscriber gets its own bounded buffer
+# so a slow client loses old events instead of slowing down the crew that publishes them.
+HISTORY_SIZE = int(os.getenv("DEVBOSS_EVENT_HISTORY", "1000"))
+SUBSCRIBER_BUFFER = int(os.getenv("DEVBOSS_EVENT_BUFFER", "256"))
+CHANNEL_RETENTION = int(os.getenv("DEVBOSS_EVENT_CHANNELS", "200"))
+
+# Longest excerpt of agent output/tool input we put on the wire
+MAX_TEXT = 2000
+
+
+def _clip(value) -> str:
+    text = str(value) if value is not None else ""
+    return text if len(text) <= MAX_TEXT else text[:MAX_TEXT] + "..."
+
+
+class Subscriber:
+    """One client's view of a run. `push` is called from crew threads, `next_batch` from the event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = SUBSCRIBER_BUFFER):
+        self._loop = loop
+        self._buffer = deque(maxlen=maxsize)
+        self._wakeup = asyncio.Event()
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.closed = False
+
+    def push(self, event: dict):
+        # Never blocks: when the buffer is full the oldest event is discarded.
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(event)
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def close(self):
+        self.closed = True
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def next_batch(self, timeout: float) -> list:
+        """Waits up to `timeout` seconds for events and returns everything buffered so far."""
+        if not self._buffer and not self.closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
+        # Taken together, so an event pushed meanwhile lands in this batch or the next, never in neither
+        with self._lock:
+            batch = list(self._buffer)
+            self._buffer.clear()
+        return batch
+
+
+class RunChannel:
+    """The ordered event log of one run. Event ids are offsets, so clients can replay from any id."""
+
+    def __init__(self, run_id: str, history_size: int = HISTORY_SIZE, listeners: Optional[list] = None):
+        self.run_id = run_id
+        self.closed = False
+        self._listeners = listeners if listeners is not None else []
+        self._history = deque(maxlen=history_size)
+        self._next_id = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event_type: str, **data) -> dict:
+        with self._lock:
+            event = {"id": self._next_id, "type": event_type, "timestamp": time.time(), **data}
+            self._next_id += 1
+            self._history.append(event)
+            for subscriber in self._subscribers:
+                subscriber.push(event)
+        for listener in self._listeners:
+            listener(self.run_id, event)
+        return event
+
+    def history(self) -> list:
+        """A copy of the retained events, oldest first."""
+        with self._lock:
+            return list(self._history)
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            for subscriber in self._subscribers:
+                subscriber.close()
+            self._subscribers.clear()
+
+    def subscribe(self, loop: asyncio.AbstractEventLoop, offset: int = 0) -> Subscriber:
+        """Registers a subscriber and pre-loads it with retained events whose id >= offset."""
+        subscriber = Subscriber(loop)
+        with self._lock:
+            for event in self._history:
+                if event["id"] >= offset:
+                    subscriber.push(event)
+            if self.closed:
+                subscriber.close()
+            else:
+                self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+
+class EventBus:
+    """Registry of run channels. Finished channels are kept for replay until evicted."""
+
+    def __init__(self, retention: int = CHANNEL_RETENTION):
+        self.retention = retention
+        self._channels: "OrderedDict[str, RunChannel]" = OrderedDict()
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """`listener(run_id, event)` is called synchronously for every event of every run; keep it cheap."""
+        self._listeners.append(listener)
+
+    def open(self, run_id: str) -> RunChannel:
+        with self._lock:
+            channel = self._channels.get(run_id)
+            if channel is None:
+                channel = self._channels[run_id] = RunChannel(run_id, listeners=self._listeners)
+            self._evict_closed()
+        return channel
+
+    def get(self, run_id: str) -> Optional[RunChannel]:
+        with self._lock:
+            return self._channels.get(run_id)
+
+    def _evict_closed(self):
+        excess = len(self._channels) - self.retention
+        if excess <= 0:
+            return
+        for run_id in [c.run_id for c in self._channels.values() if c.closed][:excess]:
+            del self._channels[run_id]
+
+
+# --- Crew Callback Glue ---
+class CrewEventForwarder:
+    """
+    Turns crew step and task callbacks into run events.
+    In a sequential crew the task that just finished tells us which one starts next;
+    task-graph runs report each task's start and finish explicitly.
+    """
+
+    def __init__(self, channel: RunChannel, tasks: list, names: Optional[list] = None):
+        self.channel = channel
+        self.tasks = tasks
+        self.names = names or [f"task_{i}" for i in range(len(tasks))]
+        self.current = 0
+        self._local = threading.local()
+
+    def _task_index(self, task) -> Optional[int]:
+        for i, t in enumerate(self.tasks):
+            if t is task:
+                return i
+        return None
+
+    def _task_name(self, index: Optional[int]) -> Optional[str]:
+        return self.names[index] if index is not None and index < len(self.names) else None
+
+    def _agent_role(self) -> Optional[str]:
+        task = getattr(self._local, "task", None)
+        if task is None and self.current < len(self.tasks):
+            task = self.tasks[self.current]
+        if task is not None and task.agent is not None:
+            return task.agent.role
+        return None
+
+    def task_started(self, task=None):
+        if task is None:
+            if self.current >= len(self.tasks):
+                return
+            task = self.tasks[self.current]
+        else:
+            self._local.task = task
+        index = self._task_index(task)
+        self.channel.publish("task_started", task_index=index, task=self._task_name(index), agent=task.agent.role,
+                             description=_clip(task.description))
+
+    def step_callback(self, step):
+        agent = self._agent_role()
+        tool = getattr(step, "tool", None)
+        if tool:
+            self.channel.publish("tool_call", agent=agent, tool=tool,
+                                 tool_input=_clip(getattr(step, "tool_input", None)),
+                                 thought=_clip(getattr(step, "thought", None)),
+                                 result=_clip(getattr(step, "result", None)))
+        else:
+            output = getattr(step, "output", None) or getattr(step, "result", None) or getattr(step, "text", step)
+            self.channel.publish("agent_step", agent=agent,
+                                 thought=_clip(getattr(step, "thought", None)), output=_clip(output))
+
+    def task_completed(self, task_output):
+        """Sequential crews: the current task finished; call task_started() once the next one really starts."""
+        self.channel.publish("task_finished", task_index=self.current, task=self._task_name(self.current),
+                             agent=self._agent_role(), output=_clip(getattr(task_output, "raw", task_output)))
+        self.current += 1
+
+    def task_finished(self, task, task_output):
+        """Task-graph runs: `task` finished, whichever thread it ran on."""
+        index = self._task_index(task)
+        self.channel.publish("task_finished", task_index=index, task=self._task_name(index), agent=task.agent.role,
+                             output=_clip(getattr(task_output, "raw", task_output)))
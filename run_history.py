@@ -0,0 +1,299 @@
+# run_history.py
+
+import json
+import os
+import re
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# --- Configuration ---
+DATA_DIR = os.getenv("DEVBOSS_DATA_DIR", ".devboss")
+RUN_HISTORY_DIR = os.getenv("RUN_HISTORY_DIR", os.path.join(DATA_DIR, "history"))
+# A new segment is started once the current one reaches this size
+RUN_HISTORY_SEGMENT_BYTES = int(os.getenv("RUN_HISTORY_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+RUN_HISTORY_PAGE_SIZE = 50
+RUN_HISTORY_MAX_PAGE_SIZE = 500
+
+# One fixed-size sidecar entry per run: when it was recorded, where its line is, and its id.
+# Entry i of a segment sits at byte i * INDEX_ENTRY.size, so any entry is one read away.
+INDEX_ENTRY = struct.Struct("<dQI32s")
+# Once a segment is full, its ids go to a second sidecar sorted by id, each with the entry of
+# its latest record in that segment, so finding a run there is a binary search of a few seeks.
+ID_ENTRY = struct.Struct("<32sI")
+_SEGMENT = re.compile(r"^segment-(\d{8})\.idx$")
+
+
+class InvalidCursor(ValueError):
+    """Raised for a pagination cursor this log did not hand out."""
+
+
+def encode_cursor(segment: int, entry: int) -> str:
+    return f"{segment}.{entry}"
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        segment, entry = cursor.split(".")
+        return int(segment), int(entry)
+    except ValueError:
+        raise InvalidCursor(cursor) from None
+
+
+class RunHistory:
+    """
+    Append-only history of finished runs: JSONL segments, each with a binary sidecar index.
+    Lookups by run id, pages, time-range scans and tail-following only read the index and
+    the lines they return, never a whole segment. Several worker processes may append to
+    the same directory; each picks up the others' entries from the indexes.
+    """
+
+    def __init__(self, directory: str = RUN_HISTORY_DIR, segment_bytes: int = RUN_HISTORY_SEGMENT_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._counts: Dict[int, int] = {}  # segment -> entries indexed so far
+        self._sealed: Set[int] = set()  # full segments whose sorted id file exists
+        # Only the segment being appended to keeps its ids in memory: run id -> entry of its latest record
+        self._tail_segment: Optional[int] = None
+        self._tail: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh()
+
+    # --- Files ---
+    def _data_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:08d}.jsonl")
+
+    def _index_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:08d}.idx")
+
+    def _ids_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:08d}.ids")
+
+    @contextmanager
+    def _append_lock(self):
+        # Serializes appends across processes sharing the directory
+        import fcntl
+
+        with open(os.path.join(self.directory, ".append.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        # Caller must hold self._lock. Reads only the tail's index entries added since the last refresh.
+        counts = {}
+        for name in os.listdir(self.directory):
+            match = _SEGMENT.match(name)
+            if match is not None:
+                segment = int(match.group(1))
+                counts[segment] = os.path.getsize(self._index_path(segment)) // INDEX_ENTRY.size
+        if not counts:
+            return
+        latest = max(counts)
+        for segment in counts:
+            if segment != latest and segment not in self._sealed:
+                # Normally sealed by whoever rolled over; this covers a writer that died before doing so
+                if not os.path.exists(self._ids_path(segment)):
+                    self._seal(segment)
+                self._sealed.add(segment)
+        known = self._counts.get(latest, 0)
+        if latest != self._tail_segment:
+            self._tail_segment, self._tail, known = latest, {}, 0
+        if counts[latest] > known:
+            with open(self._index_path(latest), "rb") as f:
+                f.seek(known * INDEX_ENTRY.size)
+                data = f.read((counts[latest] - known) * INDEX_ENTRY.size)
+            for i, (_, _, _, run_id) in enumerate(INDEX_ENTRY.iter_unpack(data)):
+                self._tail[run_id.rstrip(b"\0").decode()] = known + i
+        self._counts = counts
+
+    def _seal(self, segment: int):
+        # Writes the segment's sorted id file; a rename makes it appear whole or not at all
+        with open(self._index_path(segment), "rb") as f:
+            data = f.read()
+        latest = {run_id: entry for entry, (_, _, _, run_id) in enumerate(INDEX_ENTRY.iter_unpack(data))}
+        path = self._ids_path(segment)
+        with open(f"{path}.{os.getpid()}.tmp", "wb") as f:
+            f.write(b"".join(ID_ENTRY.pack(run_id, latest[run_id]) for run_id in sorted(latest)))
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+    def _find(self, segment: int, run_id: str) -> Optional[int]:
+        # Binary search on a sealed segment's sorted id file
+        key = run_id.encode()[:32].ljust(32, b"\0")
+        with open(self._ids_path(segment), "rb") as f:
+            low, high = 0, os.fstat(f.fileno()).st_size // ID_ENTRY.size
+            while low < high:
+                middle = (low + high) // 2
+                f.seek(middle * ID_ENTRY.size)
+                found, entry = ID_ENTRY.unpack(f.read(ID_ENTRY.size))
+                if found == key:
+                    return entry
+                if found < key:
+                    low = middle + 1
+                else:
+                    high = middle
+        return None
+
+    def _index_entry(self, segment: int, entry: int) -> tuple:
+        with open(self._index_path(segment), "rb") as f:
+            f.seek(entry * INDEX_ENTRY.size)
+            return INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+
+    def _read(self, segment: int, entry: int) -> dict:
+        _, offset, length, _ = self._index_entry(segment, entry)
+        with open(self._data_path(segment), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    # --- Writing ---
+    def append(self, run_id: str, record: dict) -> str:
+        """Appends one run; returns its cursor."""
+        with self._lock, self._append_lock():
+            # Stamped under the lock, so every segment's index stays in time order
+            record["recorded_at"] = recorded_at = time.time()
+            line = json.dumps(record, default=str).encode() + b"\n"
+            self._refresh()
+            segment = max(self._counts, default=0)
+            data_path = self._data_path(segment)
+            offset = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+            if offset >= self.segment_bytes and self._counts.get(segment):
+                # Sealed before the next segment exists, so readers that see it find the id file
+                self._seal(segment)
+                self._sealed.add(segment)
+                segment, offset = segment + 1, 0
+                data_path = self._data_path(segment)
+                self._tail_segment, self._tail = segment, {}
+            # The line goes first: readers only trust what the index points to
+            with open(data_path, "ab") as f:
+                f.write(line)
+            with open(self._index_path(segment), "ab") as f:
+                f.write(INDEX_ENTRY.pack(recorded_at, offset, len(line), run_id.encode()[:32]))
+            entry = self._counts.get(segment, 0)
+            self._counts[segment] = entry + 1
+            self._tail_segment = segment
+            self._tail[run_id] = entry
+        return encode_cursor(segment, entry)
+
+    # --- Reading ---
+    def get(self, run_id: str) -> Optional[dict]:
+        with self._lock:
+            if run_id not in self._tail:
+                # Maybe another worker recorded it
+                self._refresh()
+            if run_id in self._tail:
+                return self._read(self._tail_segment, self._tail[run_id])
+            sealed = sorted(self._sealed, reverse=True)
+        for segment in sealed:
+            entry = self._find(segment, run_id)
+            if entry is not None:
+                return self._read(segment, entry)
+        return None
+
+    def _first_at_or_after(self, segment: int, count: int, timestamp: float) -> int:
+        # Binary search on the index; entries are appended in time order
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if self._index_entry(segment, middle)[0] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _positions(self, cursor: Optional[str], order: str, since: Optional[float],
+                   until: Optional[float]) -> Iterator[Tuple[int, int]]:
+        with self._lock:
+            self._refresh()
+            counts = dict(self._counts)
+        segments = sorted(counts)
+        if cursor is not None:
+            start_segment, start_entry = decode_cursor(cursor)
+        if order == "asc":
+            for segment in segments:
+                if cursor is not None and segment < start_segment:
+                    continue
+                first = start_entry if cursor is not None and segment == start_segment else 0
+                if since is not None:
+                    first = max(first, self._first_at_or_after(segment, counts[segment], since))
+                yield from ((segment, entry) for entry in range(first, counts[segment]))
+        else:
+            for segment in reversed(segments):
+                if cursor is not None and segment > start_segment:
+                    continue
+                last = counts[segment] - 1
+                if cursor is not None and segment == start_segment:
+                    last = min(last, start_entry)
+                if until is not None:
+                    last = min(last, self._first_at_or_after(segment, counts[segment], until) - 1)
+                yield from ((segment, entry) for entry in range(last, -1, -1))
+
+    def page(self, cursor: Optional[str] = None, limit: int = RUN_HISTORY_PAGE_SIZE, order: str = "desc",
+             since: Optional[float] = None, until: Optional[float] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        Up to `limit` runs from `cursor` on, newest first ("desc") or oldest first ("asc"), within
+        [since, until). Returns them and the cursor of the next page. In "asc" order the cursor
+        past the newest run is returned even when the page is empty, so polling it follows the tail.
+        """
+        limit = max(1, min(limit, RUN_HISTORY_MAX_PAGE_SIZE))
+        records, next_cursor = [], None
+        for segment, entry in self._positions(cursor, order, since, until):
+            if len(records) == limit:
+                next_cursor = encode_cursor(segment, entry)
+                break
+            record = self._read(segment, entry)
+            stamp = record.get("recorded_at", 0)
+            if (since is not None and stamp < since) or (until is not None and stamp >= until):
+                if order == "desc" and since is not None and stamp < since:
+                    break  # older runs only from here on
+                if order == "asc" and until is not None and stamp >= until:
+                    break
+                continue
+            records.append(record)
+            next_cursor = encode_cursor(segment, entry + 1) if order == "asc" else None
+        if order == "asc" and next_cursor is None:
+            next_cursor = cursor
+        return records, next_cursor
+
+    def scan(self, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[dict]:
+        """Every run recorded in [since, until), oldest first, for trend analysis."""
+        cursor = None
+        while True:
+            records, cursor = self.page(cursor, RUN_HISTORY_MAX_PAGE_SIZE, "asc", since, until)
+            yield from records
+            if len(records) < RUN_HISTORY_MAX_PAGE_SIZE:
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return {"runs": sum(self._counts.values()), "segments": len(self._counts), "directory": self.directory}
+
+
+def summarize(record: dict) -> dict:
+    """The fields a history list shows; task outputs stay behind GET /runs/{id}."""
+    summary = {key: record.get(key) for key in ("run_id", "goal", "status", "reward", "action", "started_at",
+                                                "finished_at", "duration", "resumed_from")}
+    summary["tasks"] = [task["name"] for task in record.get("tasks", [])]
+    summary["jira_issues"] = len(record.get("jira_keys", []))
+    return summary
+
+
+def task_timings(events: List[dict]) -> Dict[str, dict]:
+    """Per-task agent and start/finish times, from a run's task_started/task_finished events."""
+    timings = {}
+    for event in events:
+        name = event.get("task")
+        if name is None:
+            continue
+        if event["type"] == "task_started":
+            timings[name] = {"agent": event.get("agent"), "started_at": event["timestamp"]}
+        elif event["type"] == "task_finished" and name in timings:
+            timings[name]["finished_at"] = event["timestamp"]
+            timings[name]["duration"] = round(event["timestamp"] - timings[name]["started_at"], 3)
+    return timings
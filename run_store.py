@@ -0,0 +1,200 @@
+# run_store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# --- Configuration ---
+DATA_DIR = os.getenv("DEVBOSS_DATA_DIR", ".devboss")
+RUN_STORE_PATH = os.getenv("RUN_STORE_PATH", os.path.join(DATA_DIR, "runs.sqlite3"))
+# Checkpoints of runs not touched for this many seconds are dropped
+RUN_STORE_TTL = float(os.getenv("RUN_STORE_TTL", str(7 * 24 * 3600)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    goal TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL,
+    action INTEGER,
+    reference TEXT,
+    resumed_from TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_update ON runs (updated);
+CREATE TABLE IF NOT EXISTS task_checkpoints (
+    run_id TEXT NOT NULL,
+    task TEXT NOT NULL,
+    output TEXT NOT NULL,
+    completed REAL NOT NULL,
+    PRIMARY KEY (run_id, task)
+);
+CREATE TABLE IF NOT EXISTS created_issues (
+    run_id TEXT NOT NULL,
+    task TEXT,
+    issue_key TEXT NOT NULL,
+    summary TEXT,
+    created REAL NOT NULL,
+    PRIMARY KEY (run_id, issue_key)
+);
+"""
+
+
+@dataclass
+class RunRecord:
+    run_id: str
+    goal: str
+    options: dict
+    status: str
+    action: Optional[int] = None
+    reference: Optional[dict] = None
+    resumed_from: Optional[str] = None
+    outputs: Dict[str, str] = field(default_factory=dict)  # task name -> output, in completion order
+    issues: List[dict] = field(default_factory=list)  # Jira tickets created so far: task, key, summary
+
+    def issues_for(self, task: str) -> List[dict]:
+        return [issue for issue in self.issues if issue["task"] == task]
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "goal": self.goal,
+            "status": self.status,
+            "resumed_from": self.resumed_from,
+            "completed_tasks": list(self.outputs),
+            "jira_issues": self.issues,
+        }
+
+
+class RunStore:
+    """
+    Per-task checkpoints of crew runs. Each finished task's output and every Jira ticket a
+    run creates are written as they happen, so a failed or suspended run can continue from
+    its first unfinished task without repeating LLM calls or creating duplicate tickets.
+    """
+
+    def __init__(self, path: str = RUN_STORE_PATH, ttl: float = RUN_STORE_TTL):
+        self.ttl = ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def start(self, run_id: str, goal: str, options: dict, action: Optional[int] = None,
+              reference: Optional[dict] = None, resumed_from: Optional[RunRecord] = None):
+        """Creates (or reopens) a run. A run resumed from another one inherits its checkpoints."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, goal, options, status, action, reference, resumed_from, created, updated) "
+                "VALUES (?, ?, ?, 'running', ?, ?, ?, ?, ?) "
+                "ON CONFLICT(run_id) DO UPDATE SET status = 'running', updated = excluded.updated",
+                (run_id, goal, json.dumps(options), action, json.dumps(reference),
+                 resumed_from.run_id if resumed_from else None, now, now))
+            if resumed_from is not None:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO task_checkpoints (run_id, task, output, completed) VALUES (?, ?, ?, ?)",
+                    [(run_id, task, output, now) for task, output in resumed_from.outputs.items()])
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO created_issues (run_id, task, issue_key, summary, created) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(run_id, i["task"], i["key"], i["summary"], now) for i in resumed_from.issues])
+            self._prune(now)
+
+    def checkpoint(self, run_id: str, task: str, output: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO task_checkpoints (run_id, task, output, completed) "
+                               "VALUES (?, ?, ?, ?)", (run_id, task, output, now))
+            self._conn.execute("UPDATE runs SET updated = ? WHERE run_id = ?", (now, run_id))
+
+    def record_issues(self, run_id: str, task: Optional[str], issues: List[tuple]):
+        """Remembers Jira tickets the moment they are created: (key, summary) pairs."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO created_issues (run_id, task, issue_key, summary, created) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, task, key, summary, now) for key, summary in issues])
+
+    def set_status(self, run_id: str, status: str):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET status = ?, updated = ? WHERE run_id = ?",
+                               (status, time.time(), run_id))
+
+    def get(self, run_id: str) -> Optional[RunRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, goal, options, status, action, reference, resumed_from FROM runs WHERE run_id = ?",
+                (run_id,)).fetchone()
+            if row is None:
+                return None
+            outputs = self._conn.execute(
+                "SELECT task, output FROM task_checkpoints WHERE run_id = ? ORDER BY completed, rowid",
+                (run_id,)).fetchall()
+            issues = self._conn.execute(
+                "SELECT task, issue_key, summary FROM created_issues WHERE run_id = ? ORDER BY created, rowid",
+                (run_id,)).fetchall()
+        return RunRecord(
+            run_id=row[0], goal=row[1], options=json.loads(row[2]), status=row[3], action=row[4],
+            reference=json.loads(row[5]) if row[5] else None, resumed_from=row[6],
+            outputs={task: output for task, output in outputs},
+            issues=[{"task": task, "key": key, "summary": summary} for task, key, summary in issues],
+        )
+
+    def _prune(self, now: float):
+        # Caller must hold self._lock
+        cutoff = now - self.ttl
+        stale = "SELECT run_id FROM runs WHERE updated < ?"
+        self._conn.execute(f"DELETE FROM task_checkpoints WHERE run_id IN ({stale})", (cutoff,))
+        self._conn.execute(f"DELETE FROM created_issues WHERE run_id IN ({stale})", (cutoff,))
+        self._conn.execute("DELETE FROM runs WHERE updated < ?", (cutoff,))
+
+
+# --- The Current Run ---
+# Tools run deep inside crewai, so the run and task they work for travel in context variables.
+# Task-graph runs copy the context into each task's thread, so every task sees its own name.
+_recorder: ContextVar[Optional["RunRecorder"]] = ContextVar("run_recorder", default=None)
+_task: ContextVar[Optional[str]] = ContextVar("run_task", default=None)
+
+
+@dataclass
+class RunRecorder:
+    run_id: str
+    store: RunStore
+
+    def enter_task(self, name: Optional[str]):
+        """Marks which task the tool calls from here on belong to."""
+        _task.set(name)
+
+    def record_issues(self, issues: List[tuple]):
+        if issues:
+            self.store.record_issues(self.run_id, _task.get(), issues)
+
+
+def current_task() -> Optional[str]:
+    return _task.get()
+
+
+def record_created_issues(issues: List[tuple]):
+    """Called by the Jira tools with (key, summary) pairs; a no-op outside a run."""
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.record_issues(issues)
+
+
+@contextmanager
+def recording(run_id: str, store: RunStore):
+    recorder = RunRecorder(run_id, store)
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
@@ -0,0 +1,129 @@
+# single_flight.py
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from job_queue import FINISHED_STATES, SUCCEEDED, Job, JobQueue
+from metrics import JOBS_COALESCED
+
+# --- Configuration ---
+# Seconds a succeeded run keeps answering identical requests; 0 disables the result cache
+COALESCE_RESULT_TTL = float(os.getenv("DEVBOSS_COALESCE_RESULT_TTL", "0"))
+# Distinct keys we keep stats for
+COALESCE_STATS_SIZE = int(os.getenv("DEVBOSS_COALESCE_STATS_SIZE", "1000"))
+
+INFLIGHT = "inflight"
+CACHED = "cached"
+
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_goal(goal: str) -> str:
+    """Case, surrounding whitespace and trailing punctuation do not make a goal different."""
+    return _SPACE.sub(" ", goal).strip().rstrip(".!?").strip().lower()
+
+
+def request_key(goal: str, options: Optional[dict]) -> str:
+    return normalize_goal(goal) + "|" + json.dumps(options or {}, sort_keys=True)
+
+
+class SingleFlight:
+    """
+    One crew per distinct request. Identical submissions (same normalized goal and options)
+    attach to the job already queued or running for that key and share its result; with a
+    result TTL, requests arriving shortly after a success get the finished job as well.
+    """
+
+    def __init__(self, queue: JobQueue, result_ttl: float = COALESCE_RESULT_TTL,
+                 stats_size: int = COALESCE_STATS_SIZE):
+        self.queue = queue
+        self.result_ttl = result_ttl
+        self.stats_size = stats_size
+        self._jobs = {}  # key -> latest job for it
+        self._requesters = {}  # job id -> requests attached to it
+        self._stats: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, goal: str, options: Optional[dict] = None) -> Tuple[Job, Optional[str]]:
+        """Returns the job serving this request and how it was coalesced (None for a new run)."""
+        options = options or {}
+        key = request_key(goal, options)
+        with self._lock:
+            job, shared = self._jobs.get(key), None
+            if job is not None and job.status not in FINISHED_STATES:
+                shared = INFLIGHT
+            elif job is not None and self._fresh(job) and not options.get("bypass_cache"):
+                shared = CACHED
+            if shared is not None:
+                self._requesters[job.id] = self._requesters.get(job.id, 0) + 1
+                JOBS_COALESCED.inc(kind=shared)
+            else:
+                # Still under the lock, so a concurrent duplicate cannot start a second crew
+                job = self.queue.submit(goal, options)
+                self._jobs[key] = job
+                self._requesters[job.id] = 1
+            self._count(key, goal, options, shared)
+            self._prune()
+        return job, shared
+
+    def cancel(self, job_id: str) -> Tuple[Optional[Job], bool]:
+        """
+        Detaches one requester. The run itself is only cancelled once nobody is waiting for it;
+        returns the job and whether it was cancelled.
+        """
+        with self._lock:
+            remaining = self._requesters.get(job_id, 1) - 1
+            if remaining > 0:
+                self._requesters[job_id] = remaining
+                return self.queue.get(job_id), False
+            self._requesters.pop(job_id, None)
+        return self.queue.cancel(job_id), True
+
+    def requesters(self, job_id: str) -> int:
+        with self._lock:
+            return self._requesters.get(job_id, 1)
+
+    def _fresh(self, job: Job) -> bool:
+        return (self.result_ttl > 0 and job.status == SUCCEEDED and job.finished_at is not None
+                and time.time() - job.finished_at < self.result_ttl)
+
+    def _count(self, key: str, goal: str, options: dict, shared: Optional[str]):
+        # Caller must hold self._lock
+        entry = self._stats.pop(key, None) or {"goal": normalize_goal(goal), "options": options, "requests": 0,
+                                              "runs": 0, "coalesced": 0, "cache_hits": 0}
+        entry["requests"] += 1
+        entry["runs"] += shared is None
+        entry["coalesced"] += shared == INFLIGHT
+        entry["cache_hits"] += shared == CACHED
+        entry["last_seen"] = time.time()
+        self._stats[key] = entry
+        while len(self._stats) > self.stats_size:
+            self._stats.popitem(last=False)
+
+    def _prune(self):
+        # Caller must hold self._lock. Forget finished jobs once they can no longer be shared.
+        for key in [k for k, job in self._jobs.items() if job.status in FINISHED_STATES and not self._fresh(job)]:
+            self._requesters.pop(self._jobs.pop(key).id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            keys = list(self._stats.values())
+            inflight = sum(1 for job in self._jobs.values() if job.status not in FINISHED_STATES)
+        requests = sum(entry["requests"] for entry in keys)
+        runs = sum(entry["runs"] for entry in keys)
+        return {
+            "result_ttl": self.result_ttl,
+            "inflight_keys": inflight,
+            "requests": requests,
+            "runs": runs,
+            "coalesced": sum(entry["coalesced"] for entry in keys),
+            "cache_hits": sum(entry["cache_hits"] for entry in keys),
+            "runs_saved": requests - runs,
+            # Most recent first; only keys that actually shared a run are interesting
+            "keys": [entry for entry in reversed(keys) if entry["requests"] > 1],
+        }
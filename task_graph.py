@@ -0,0 +1,176 @@
+# task_graph.py
+
+import contextvars
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# --- Configuration ---
+# How many crew tasks of one run may execute at the same time in "dag" mode
+TASK_GRAPH_PARALLELISM = int(os.getenv("DEVBOSS_TASK_PARALLELISM", "3"))
+
+# The separator crewai puts between context outputs in sequential mode
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
+
+
+class TaskGraphError(Exception):
+    """Raised when the tasks' context lists do not form a DAG over the given tasks."""
+
+
+@dataclass
+class TaskTiming:
+    description: str
+    agent: Optional[str]
+    started: float
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class GraphOutput:
+    """What a task-graph run returns; `raw` mirrors CrewOutput.raw (the last task's output)."""
+    raw: str
+    tasks_output: List[Any]
+    timings: List[TaskTiming]
+    wall_time: float
+    critical_path_time: float
+    critical_path: List[str] = field(default_factory=list)
+
+
+class TaskGraph:
+    """
+    The dependency graph implied by each Task's `context` list.
+    A task becomes ready as soon as every task in its context has finished. Context tasks
+    outside the run count as finished if they already carry an output (e.g. a resumed run).
+    """
+
+    def __init__(self, tasks: list):
+        self.tasks = tasks
+        self.index = {id(task): i for i, task in enumerate(tasks)}
+        self.deps: Dict[int, List[int]] = {}
+        for i, task in enumerate(tasks):
+            deps = []
+            for dep in task.context or []:
+                if id(dep) in self.index:
+                    deps.append(self.index[id(dep)])
+                elif getattr(dep, "output", None) is None:
+                    raise TaskGraphError(f"Task {i} depends on a task that is not part of this run.")
+            self.deps[i] = deps
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[int]:
+        order, state = [], {}
+
+        def visit(i):
+            if state.get(i) == "done":
+                return
+            if state.get(i) == "visiting":
+                raise TaskGraphError("The task context lists contain a cycle.")
+            state[i] = "visiting"
+            for dep in self.deps[i]:
+                visit(dep)
+            state[i] = "done"
+            order.append(i)
+
+        for i in range(len(self.tasks)):
+            visit(i)
+        return order
+
+    def critical_path(self, durations: Dict[int, float]) -> tuple:
+        """The longest dependency chain by duration: (its total time, the task indices on it)."""
+        finish, via = {}, {}
+        for i in self.order:
+            best = max(self.deps[i], key=lambda d: finish[d], default=None)
+            finish[i] = durations.get(i, 0.0) + (finish[best] if best is not None else 0.0)
+            via[i] = best
+        if not finish:
+            return 0.0, []
+        end = max(finish, key=finish.get)
+        path, node = [], end
+        while node is not None:
+            path.append(node)
+            node = via[node]
+        return finish[end], list(reversed(path))
+
+
+def _tools(task, agents: Optional[list]) -> list:
+    """The task's tools plus, for agents allowed to delegate, the crew's delegation tools."""
+    tools = list(task.tools or task.agent.tools or [])
+    others = [agent for agent in agents or [] if agent is not task.agent]
+    if getattr(task.agent, "allow_delegation", False) and others:
+        delegation = task.agent.get_delegation_tools(others)
+        names = {tool.name for tool in delegation}
+        tools = [tool for tool in tools if tool.name not in names] + delegation
+    return tools
+
+
+def _execute(task, context: str, agents: Optional[list]):
+    # Mirrors what a sequential crew does for each task
+    return task.execute_sync(agent=task.agent, context=context, tools=_tools(task, agents))
+
+
+def run_task_graph(tasks: list, max_parallel: int = TASK_GRAPH_PARALLELISM,
+                   on_task_started: Optional[Callable] = None,
+                   on_task_finished: Optional[Callable] = None,
+                   context_builder: Optional[Callable] = None,
+                   agents: Optional[list] = None) -> GraphOutput:
+    """
+    Runs crew tasks as a DAG: every task whose context is complete is started, up to
+    `max_parallel` at once. Reports the critical-path time next to the total wall time.
+    `context_builder(task, raw_outputs)` may shape the context a task receives; by default
+    its context tasks' raw outputs are joined as a sequential crew would.
+    `agents` are the crew's agents: those allowed to delegate get tools to hand work to the others.
+    """
+    graph = TaskGraph(tasks)
+    outputs: Dict[int, Any] = {}
+    timings: Dict[int, TaskTiming] = {}
+    running = {}
+    started = time.perf_counter()
+
+    def start(i):
+        task = tasks[i]
+        raws = [(outputs[graph.index[id(dep)]] if id(dep) in graph.index else dep.output).raw
+                for dep in task.context or []]
+        context = context_builder(task, raws) if context_builder else CONTEXT_SEPARATOR.join(raws)
+
+        def work():
+            if on_task_started:
+                on_task_started(task)
+            t0 = time.perf_counter()
+            output = _execute(task, context, agents)
+            timings[i] = TaskTiming(task.description[:80], getattr(task.agent, "role", None),
+                                    t0 - started, time.perf_counter() - started)
+            return output
+
+        # Each task sees the caller's context variables (e.g. the LLM cache bypass flag)
+        running[pool.submit(contextvars.copy_context().run, work)] = i
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix="crew-task") as pool:
+        pending = list(graph.order)
+        while pending or running:
+            for i in [i for i in pending if all(d in outputs for d in graph.deps[i])]:
+                pending.remove(i)
+                start(i)
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                outputs[i] = future.result()  # a failed task fails the run
+                if on_task_finished:
+                    on_task_finished(tasks[i], outputs[i])
+
+    wall_time = time.perf_counter() - started
+    critical_time, path = graph.critical_path({i: t.duration for i, t in timings.items()})
+    # Like a sequential crew, the run's result is the output of the last task in the list
+    return GraphOutput(
+        raw=outputs[len(tasks) - 1].raw if tasks else "",
+        tasks_output=[outputs[i] for i in range(len(tasks))],
+        timings=[timings[i] for i in range(len(tasks))],
+        wall_time=wall_time,
+        critical_path_time=critical_time,
+        critical_path=[timings[i].description for i in path],
+    )
@@ -1,9 +1,16 @@
 from crewai import Task
-from agents import coordinator, allocator, tracker, reviewer, resolver, reporter
 
 class ProjectTasks():
     # CORRECTED the function signature to accept 'project_goal'
-    def plan_project_task(self, agent, project_goal):
+    def plan_project_task(self, agent, project_goal, reference=None):
+        # A stored plan for a similar goal (see plan_library.py) gives the coordinator a head start
+        seed = ""
+        if reference is not None:
+            seed = (
+                f"\n\nA plan was already made for a similar request ('{reference.goal}'). "
+                "Adapt it to this request rather than starting from scratch:\n"
+                f"{reference.plan}"
+            )
         return Task(
             description=(
                 f"Your primary task is to create a comprehensive, high-level project plan "
@@ -11,43 +18,78 @@ class ProjectTasks():
                 "Your plan should identify the key stages and milestones. "
                 "The final plan should be clear and structured, ready to be passed to the "
                 "Task Allocator for detailed breakdown."
+                f"{seed}"
             ),
             agent=agent,
             expected_output="A structured, step-by-step project plan outlining key milestones and deliverables."
         )
 
-    def allocate_tasks_task(self, agent, context):
+    def allocate_tasks_task(self, agent, context, plan=None, existing_issues=None):
+        # When a stored plan is reused verbatim there is no planning task to take it from
+        reused_plan = f"\n\nThe project plan:\n{plan}" if plan is not None else ""
+        # A retried run must not create the tickets an earlier attempt already created
+        if existing_issues:
+            reused_plan += (
+                "\n\nThese tickets were already created by an earlier attempt; do NOT create them again, "
+                "only create the sub-tasks that are still missing and list these keys in your answer:\n"
+                + "\n".join(f"- {issue['key']}: {issue['summary']}" for issue in existing_issues)
+            )
         return Task(
             description=(
                 "Based on the detailed project plan provided, your responsibility is to do two things:\n"
                 "1. Break down the project into a list of specific, granular sub-tasks.\n"
-                "2. For EACH of those sub-tasks, use the 'Jira Ticket Creator' tool to create a ticket in Jira.\n"
+                "2. Create a Jira ticket for EACH of those sub-tasks by calling the 'Jira Bulk Ticket Creator' tool "
+                "ONCE with the full list. Only use the 'Jira Ticket Creator' tool to retry tickets the bulk call reported as failed.\n"
                 "You must use the project key 'TEST' for all tickets. The sub-task title should be the ticket summary, "
                 "and the details should be the ticket description."
+                f"{reused_plan}"
             ),
             agent=agent,
             context=context,
             expected_output="A list of confirmation messages, one for each Jira ticket that was successfully created (e.g., 'Successfully created Jira ticket: TEST-5')."
         )
 
+    def review_plan_task(self, agent, context, plan=None):
+        # Only needs the plan, so a task-graph run does it alongside allocation and tracking
+        reused_plan = f"\n\nThe project plan:\n{plan}" if plan is not None else ""
+        return Task(
+            description=(
+                "Review the project plan provided from a technical point of view. "
+                "Point out missing quality gates (code review, testing, security), risky or underspecified "
+                "milestones, and anything that is likely to cause rework later."
+                f"{reused_plan}"
+            ),
+            agent=agent,
+            context=context,
+            expected_output="A short list of technical risks and quality recommendations for the plan."
+        )
+
     def track_progress_task(self, agent, context):
         return Task(
             description=(
                 "Monitor the Jira project by using the 'Jira Issue Fetcher' tool to get the current status of all tasks. "
                 "You must use the project key 'TEST' as the input for the tool. "
-                "Analyze the returned list of issues and provide a concise summary of the project's current status."
+                "The default 'progress' mode returns per-status counts, which is enough for a status summary; "
+                "only use 'detail' mode if you need to look at individual tickets. "
+                "Analyze the returned status and provide a concise summary of the project's current status."
             ),
             agent=agent,
             context=context,
             expected_output="A summary report of the Jira project's status."
         )
 
-    def resolve_conflicts_task(self, agent, context):
+    def resolve_conflicts_task(self, agent, context, answers=None):
+        # A resumed run brings the human's answers to the questions that suspended it
+        answered = ""
+        if answers:
+            answered = "\n\nA human has already answered these questions; follow their decisions:\n" + "\n".join(
+                f"Q: {question}\nA: {answer}" for question, answer in answers)
         return Task(
             description=(
                 "You have been alerted to a potential conflict or blocker in the project. "
                 "The current project status and plan are provided as context. Your task is to analyze the situation. "
                 "If a decision is ambiguous, you MUST use the 'Human Input' tool to ask for guidance."
+                f"{answered}"
             ),
             agent=agent,
             context=context,
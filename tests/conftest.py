@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# The modules live at the repository root, next to main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Caches and stores are created on import; keep them out of the working tree
+os.environ.setdefault("DEVBOSS_DATA_DIR", tempfile.mkdtemp(prefix="devboss-tests-"))
+# Runs in the tests drive real crews; keep their telemetry off the network
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from crew_factory import AgentPool
+
+
+class FakeAgentSet:
+    def __init__(self, number):
+        self.number = number
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+class Factory:
+    def __init__(self, fail=0):
+        self.built = 0
+        self.fail = fail
+
+    def __call__(self):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("model client unavailable")
+        self.built += 1
+        return FakeAgentSet(self.built)
+
+
+def test_sets_are_built_lazily_and_reused_after_a_reset():
+    factory = Factory()
+    pool = AgentPool(size=2, factory=factory)
+    assert factory.built == 0
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as again:
+        assert again is first
+    assert factory.built == 1 and first.resets == 2
+    assert pool.stats() == {"size": 2, "built": 1, "idle": 1, "in_use": 0}
+
+
+def test_concurrent_runs_never_share_a_set_and_wait_when_all_are_in_use():
+    pool = AgentPool(size=2, factory=Factory())
+    got, third_started = [], threading.Event()
+
+    def third_run():
+        third_started.set()
+        with pool.checkout() as agents:
+            got.append(agents)
+
+    with pool.checkout() as one, pool.checkout() as two:
+        assert one is not two
+        waiter = threading.Thread(target=third_run)
+        waiter.start()
+        third_started.wait(5)
+        waiter.join(0.1)
+        # Both sets are out and the pool is full, so the third run waits
+        assert waiter.is_alive() and got == []
+        assert pool.stats()["in_use"] == 2
+    waiter.join(5)
+    assert got and got[0] in (one, two)
+    assert pool.stats()["built"] == 2
+
+
+def test_a_failed_build_frees_its_slot():
+    factory = Factory(fail=1)
+    pool = AgentPool(size=1, factory=factory)
+    with pytest.raises(RuntimeError):
+        with pool.checkout():
+            pass
+    assert pool.stats()["built"] == 0
+    with pool.checkout() as agents:
+        assert agents.number == 1
+
+
+def test_warm_builds_idle_sets_up_to_the_pool_size():
+    factory = Factory()
+    pool = AgentPool(size=3, factory=factory)
+    assert pool.warm(2) == 2
+    assert pool.warm(10) == 1
+    assert pool.stats() == {"size": 3, "built": 3, "idle": 3, "in_use": 0}
+    pool.warm_async().join(5)
+    assert factory.built == 3
@@ -0,0 +1,51 @@
+from context_compaction import ContextCompactor, estimate_tokens
+
+PLAN = "\n".join(["## Milestone 1: Auth"] + ["Some reasoning about the login flow."] * 40 +
+                 ["## Milestone 2: Billing"] + ["More prose about invoices."] * 40)
+TICKETS = "\n".join(f"Created DEV-{i}: ticket number {i} with a long description." for i in range(1, 60))
+
+
+def test_context_within_budget_is_verbatim():
+    compactor = ContextCompactor(budget=1000, task_budgets={})
+    parts, report = compactor.compact("execute", [("plan", "short plan"), ("research", "short notes")])
+    assert parts == ["short plan", "short notes"]
+    assert report.context_tokens == report.raw_tokens and report.digested == []
+
+
+def test_over_budget_outputs_are_digested_and_fit():
+    compactor = ContextCompactor(budget=100, task_budgets={})
+    parts, report = compactor.compact("track", [("plan", PLAN), ("allocate", TICKETS)])
+    assert report.digested == ["plan", "allocate"]
+    assert parts[0] == "Milestones:\n- Milestone 1: Auth\n- Milestone 2: Billing"
+    assert parts[1].startswith("Jira tickets (59): DEV-1, DEV-2")
+    assert report.context_tokens <= 100 < report.raw_tokens
+    assert report.reduction > 0.9
+
+
+def test_short_outputs_leave_their_share_to_long_ones():
+    compactor = ContextCompactor(budget=60, task_budgets={})
+    long = "word " * 400
+    parts, report = compactor.compact("execute", [("research", long), ("notes", "tiny")])
+    assert parts[1] == "tiny"
+    assert parts[0].endswith("[...]")
+    assert estimate_tokens(parts[0]) <= 60 - estimate_tokens("tiny")
+    assert report.context_tokens <= 60
+
+
+def test_task_budgets_and_disabling():
+    compactor = ContextCompactor(budget=50, task_budgets={"allocate": 4000})
+    assert compactor.budget_for("allocate") == 4000
+    assert compactor.budget_for("execute") == 50
+    parts, _ = compactor.compact("allocate", [("plan", PLAN)])
+    assert parts == [PLAN]
+
+    unlimited = ContextCompactor(budget=0, task_budgets={"allocate": 10})
+    assert unlimited.budget_for("allocate") == 0
+    assert unlimited.compact("allocate", [("plan", PLAN)])[0] == [PLAN]
+
+
+def test_missing_outputs_count_as_empty():
+    compactor = ContextCompactor(budget=100, task_budgets={})
+    parts, report = compactor.compact("track", [("plan", PLAN), ("research", None)])
+    assert parts[1] == ""
+    assert report.digested == ["plan"]
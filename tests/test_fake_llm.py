@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+from agents import create_agents
+from benchmarks.fake_llm import ScriptedLLM
+
+
+def test_agents_keep_the_scripted_llm():
+    fake = ScriptedLLM()
+    assert all(agent.llm is fake for agent in create_agents(fake).all())
+
+
+def test_allocator_uses_its_tool_once_then_answers():
+    fake = ScriptedLLM(tickets=2)
+    messages = [{"role": "system", "content": "You are Task Allocator. You are meticulous.\nObservation: ..."},
+                {"role": "user", "content": "Create the tickets."}]
+    assert "Action: Jira Bulk Ticket Creator" in fake.call(messages)
+    messages.append({"role": "assistant", "content": "Action: ...\nObservation: Successfully created"})
+    assert fake.call(messages).endswith("Successfully created Jira ticket: TEST-2")
+    assert fake.calls == 2
+
+
+def test_routed_llm_answers_from_the_fake_completion(monkeypatch):
+    import llm_config
+
+    fake = ScriptedLLM()
+    monkeypatch.setattr(llm_config.litellm, "completion", fake.completion)
+    monkeypatch.setattr(llm_config, "llm_cache", None)
+    messages = [{"role": "system", "content": "You are Conflict Resolver. You troubleshoot."},
+                {"role": "user", "content": "Resolve the conflicts."}]
+    calls = llm_config.LLM_CALLS.values().get((llm_config.LLM_MODEL_LARGE, "ok"), 0)
+    answer = llm_config.RoutedLLM(agent="Conflict Resolver").call(messages)
+    assert answer.endswith("No blocking conflicts found; proceed with the plan as allocated.")
+    assert fake.calls == 1
+    assert llm_config.LLM_CALLS.values()[(llm_config.LLM_MODEL_LARGE, "ok")] == calls + 1
@@ -0,0 +1,41 @@
+from jira_cache import JiraIssueCache
+
+
+class FakeJira:
+    def __init__(self, base_url: str, issues: list):
+        self.base_url = base_url
+        self.issues = issues
+        self.searches = 0
+
+    def iter_issues(self, jql, fields=None):
+        self.searches += 1
+        return iter(self.issues)
+
+
+def issue(key: str, status: str, category: str) -> dict:
+    return {"key": key, "fields": {"summary": key, "updated": None,
+                                   "status": {"name": status, "statusCategory": {"name": category}}}}
+
+
+def test_same_project_key_on_two_sites_is_kept_apart(tmp_path):
+    cache = JiraIssueCache(str(tmp_path / "cache.sqlite3"))
+    one = FakeJira("https://one.atlassian.net", [issue("TEST-1", "Done", "Done")])
+    two = FakeJira("https://two.atlassian.net", [issue("TEST-1", "To Do", "To Do"),
+                                                 issue("TEST-2", "To Do", "To Do")])
+    cache.ensure_fresh(one, "TEST")
+    cache.ensure_fresh(two, "TEST")
+    assert dict(cache.status_buckets(one.base_url, "TEST").groups) == {"DONE": [("TEST-1", "TEST-1")]}
+    assert dict(cache.status_buckets(two.base_url, "TEST").groups) == {"TO DO": [("TEST-1", "TEST-1"),
+                                                                                  ("TEST-2", "TEST-2")]}
+
+    # Fresh copies are not synced again
+    cache.ensure_fresh(one, "TEST")
+    assert one.searches == 1
+
+
+def test_created_tickets_are_written_through(tmp_path):
+    cache = JiraIssueCache(str(tmp_path / "cache.sqlite3"))
+    cache.record_created("https://one.atlassian.net", "TEST-7", "New ticket")
+    buckets = cache.status_buckets("https://one.atlassian.net", "TEST")
+    assert buckets.groups["TO DO"] == [("TEST-7", "New ticket")]
+    assert cache.status_buckets("https://two.atlassian.net", "TEST").total == 0
@@ -0,0 +1,78 @@
+import io
+
+import pytest
+import requests
+
+import jira_client
+from jira_client import JiraClient
+from rate_limits import RateLimiter
+
+
+def response(status: int, headers: dict = None, body: bytes = b"{}") -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update(headers or {})
+    r.raw = io.BytesIO(body)
+    return r
+
+
+@pytest.fixture
+def client(monkeypatch):
+    limiter = RateLimiter("jira", {})
+    monkeypatch.setattr(jira_client, "jira_limiter", limiter)
+    sleeps = []
+    monkeypatch.setattr(jira_client.time, "sleep", sleeps.append)
+    client = JiraClient("jira.example", "me@example.com", "token", max_retries=3, backoff_base=0.01)
+    client.limiter, client.sleeps = limiter, sleeps
+    return client
+
+
+def script(monkeypatch, client, responses):
+    calls = []
+
+    def send(method, url, **kwargs):
+        calls.append(method)
+        return responses.pop(0)
+
+    monkeypatch.setattr(client.session, "request", send)
+    return calls
+
+
+def test_get_retries_503_until_success(monkeypatch, client):
+    calls = script(monkeypatch, client, [response(503), response(503), response(200)])
+    assert client.get("rest/api/2/search").status_code == 200
+    assert len(calls) == 3
+    assert len(client.sleeps) == 2
+    assert client.limiter.granted == 3
+
+
+def test_gives_up_after_max_retries(monkeypatch, client):
+    calls = script(monkeypatch, client, [response(503) for _ in range(4)])
+    assert client.get("rest/api/2/search").status_code == 503
+    assert len(calls) == 4
+
+
+def test_post_is_not_retried_on_500(monkeypatch, client):
+    calls = script(monkeypatch, client, [response(500), response(201)])
+    assert client.post("rest/api/2/issue/bulk", json={}).status_code == 500
+    assert calls == ["POST"]
+
+
+def test_post_is_retried_on_429(monkeypatch, client):
+    calls = script(monkeypatch, client, [response(429, {"Retry-After": "0"}), response(201)])
+    assert client.post("rest/api/2/issue/bulk", json={}).status_code == 201
+    assert calls == ["POST", "POST"]
+
+
+def test_429_honours_retry_after_and_cools_down_every_caller(monkeypatch, client):
+    script(monkeypatch, client, [response(429, {"Retry-After": "0.2"}), response(200)])
+    assert client.get("rest/api/2/search").status_code == 200
+    assert client.sleeps == [0.2]
+    # The retry itself had to wait out the cool-down in the shared limiter
+    assert client.limiter.waited >= 0.15
+
+
+def test_retry_after_is_capped(client):
+    assert client._retry_after(response(429, {"Retry-After": "3600"})) == jira_client.JIRA_RETRY_AFTER_CAP
+    assert client._retry_after(response(429, {"Retry-After": "soon"})) is None
+    assert client._retry_after(response(429)) is None
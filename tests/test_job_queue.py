@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from job_queue import CANCELLED, FINISHED_STATES, QUEUED, RUNNING, JobQueue, QueueFullError
+
+
+@pytest.fixture
+def blocked():
+    """A runner that records the goals it ran and holds each one until `release` is set."""
+    state = {"ran": [], "release": threading.Event(), "started": threading.Event()}
+
+    def runner(job):
+        state["ran"].append(job.goal)
+        state["started"].set()
+        while not state["release"].wait(0.01):
+            job.check_cancelled()
+        return f"done: {job.goal}", 1.0
+
+    state["runner"] = runner
+    yield state
+    state["release"].set()
+
+
+def wait_until_finished(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while job.status not in FINISHED_STATES and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.status in FINISHED_STATES
+
+
+def test_submissions_beyond_the_pending_limit_are_refused(blocked):
+    queue = JobQueue(blocked["runner"], max_workers=1, max_pending=1)
+    running = queue.submit("first")
+    blocked["started"].wait(5)
+    waiting = queue.submit("second")
+    assert (running.status, waiting.status) == (RUNNING, QUEUED)
+    with pytest.raises(QueueFullError):
+        queue.submit("third")
+
+    # Room frees up once the waiting job starts
+    blocked["release"].set()
+    wait_until_finished(waiting)
+    wait_until_finished(queue.submit("third"))
+    queue.shutdown()
+    assert blocked["ran"] == ["first", "second", "third"]
+    assert running.result == "done: first" and running.reward == 1.0
+
+
+def test_full_queue_answers_503(monkeypatch):
+    pytest.importorskip("crewai")
+    from fastapi.testclient import TestClient
+
+    import main
+    from single_flight import SingleFlight
+
+    queue = JobQueue(lambda job: ("done", 1.0), max_workers=1, max_pending=0)
+    monkeypatch.setattr(main, "single_flight", SingleFlight(queue, result_ttl=0))
+    response = TestClient(main.app).post("/run-project", json={"goal": "Build a todo app"})
+    assert response.status_code == 503
+    assert "full" in response.json()["detail"]
+    queue.shutdown()
+
+
+def test_cancel_drops_queued_jobs_and_stops_running_ones(blocked):
+    queue = JobQueue(blocked["runner"], max_workers=1)
+    running = queue.submit("first")
+    blocked["started"].wait(5)
+    waiting = queue.submit("second")
+
+    assert queue.cancel(waiting.id) is waiting
+    assert waiting.status == CANCELLED
+    assert queue.cancel(running.id) is running
+    wait_until_finished(running)
+    assert running.status == CANCELLED and running.result is None
+    # Cancelling a finished job changes nothing; unknown ids are not found
+    assert queue.cancel(running.id).status == CANCELLED
+    assert queue.cancel("missing") is None
+    queue.shutdown()
+    assert blocked["ran"] == ["first"]
+
+
+def test_only_the_newest_finished_jobs_are_retained():
+    queue = JobQueue(lambda job: (job.goal, 1.0), max_workers=1, retention=2)
+    jobs = []
+    for i in range(4):
+        jobs.append(queue.submit(f"goal {i}"))
+        wait_until_finished(jobs[-1])
+    queue.shutdown()
+    # Eviction runs on submit: the fourth submission leaves its own job and the newest finished one
+    assert [queue.get(job.id) for job in jobs] == [None, None, jobs[2], jobs[3]]
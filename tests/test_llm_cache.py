@@ -0,0 +1,39 @@
+from llm_cache import LLMResponseCache, bypass_llm_cache
+
+REQUEST = {"model": "gpt-4o-mini", "temperature": 0.2,
+           "messages": [{"role": "user", "content": "Plan the release."}]}
+
+
+def test_hit_after_update(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"))
+    assert cache.lookup(REQUEST) is None
+    cache.update(REQUEST, "Final Answer: ship it")
+    assert cache.lookup(REQUEST) == "Final Answer: ship it"
+    assert cache.snapshot()["hits"] == 1
+    assert cache.snapshot()["misses"] == 1
+
+
+def test_formatting_only_differences_share_an_entry(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"))
+    cache.update(REQUEST, "Final Answer: ship it")
+    padded = {**REQUEST, "messages": [{"content": "  Plan the release.\n", "role": "user"}]}
+    assert cache.lookup(padded) == "Final Answer: ship it"
+    assert cache.lookup({**REQUEST, "model": "gpt-4o"}) is None
+
+
+def test_bypass_skips_lookup_and_update(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"))
+    with bypass_llm_cache():
+        cache.update(REQUEST, "Final Answer: ship it")
+        assert cache.lookup(REQUEST) is None
+    assert cache.lookup(REQUEST) is None
+    assert cache.snapshot()["bypassed"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"), max_bytes=100)
+    for i in range(5):
+        cache.update({**REQUEST, "seed": i}, "x" * 40)
+    assert cache.snapshot()["bytes"] <= 100
+    assert cache.lookup({**REQUEST, "seed": 4}) == "x" * 40
+    assert cache.lookup({**REQUEST, "seed": 0}) is None
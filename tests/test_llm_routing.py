@@ -0,0 +1,208 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+import contextvars
+
+import httpx
+import litellm
+
+import llm_config
+import rate_limits
+import run_store
+from agents import create_agents
+from llm_cache import LLMResponseCache, bypass_llm_cache
+from llm_config import LLMRateLimiter, RoutedLLM
+from rate_limits import RateLimiter
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    """Answers every completion with the reply scripted for its model; records the models called."""
+    replies, calls = {}, []
+    mock = litellm.completion
+
+    def completion(model, messages, **kwargs):
+        calls.append(model)
+        return mock(model=model, messages=messages, mock_response=replies[model])
+
+    monkeypatch.setattr(llm_config.litellm, "completion", completion)
+    monkeypatch.setattr(llm_config, "llm_cache", None)
+    return replies, calls
+
+
+@pytest.fixture
+def in_task(monkeypatch):
+    def enter(name):
+        monkeypatch.setattr(llm_config, "current_task", lambda: name)
+    return enter
+
+
+MESSAGES = [{"role": "user", "content": "Create the tickets."}]
+
+
+def test_agents_keep_the_routed_llm():
+    agents = create_agents()
+    for agent in agents.all():
+        # crewai would swap anything that is not a crewai LLM for LLM(model=...)
+        assert isinstance(agent.llm, RoutedLLM)
+        assert agent.llm.agent == agent.role
+    assert agents.allocator.llm.model == llm_config.LLM_MODEL_SMALL
+    assert agents.coordinator.llm.model == llm_config.LLM_MODEL_LARGE
+
+
+def test_calls_go_to_the_tier_of_the_current_task(completions, in_task):
+    replies, calls = completions
+    replies.update({llm_config.LLM_MODEL_SMALL: "Final Answer: 3 done",
+                    llm_config.LLM_MODEL_LARGE: "Final Answer: plan"})
+    llm = RoutedLLM(agent="Project Coordinator")
+    in_task("track")
+    assert llm.call(MESSAGES) == "Final Answer: 3 done"
+    in_task("plan")
+    assert llm.call(MESSAGES) == "Final Answer: plan"
+    assert calls == [llm_config.LLM_MODEL_SMALL, llm_config.LLM_MODEL_LARGE]
+
+
+def test_invalid_small_model_reply_is_escalated(completions, in_task):
+    replies, calls = completions
+    replies.update({llm_config.LLM_MODEL_SMALL: "Final Answer: all done",
+                    llm_config.LLM_MODEL_LARGE: "Final Answer: Created TEST-1"})
+    in_task("allocate")
+    before = llm_config.LLM_ESCALATIONS.values().get(("small", "invalid"), 0)
+    assert RoutedLLM(agent="Task Allocator").call(MESSAGES) == "Final Answer: Created TEST-1"
+    assert calls == [llm_config.LLM_MODEL_SMALL, llm_config.LLM_MODEL_LARGE]
+    assert llm_config.LLM_ESCALATIONS.values()[("small", "invalid")] == before + 1
+
+
+def test_pinned_tier_is_never_routed(completions, in_task):
+    replies, calls = completions
+    replies[llm_config.LLM_MODEL_LARGE] = "Final Answer: 1"
+    in_task("track")
+    assert RoutedLLM(agent="Progress Tracker", tier="large").call(MESSAGES) == "Final Answer: 1"
+    assert calls == [llm_config.LLM_MODEL_LARGE]
+
+
+def test_validate_output():
+    assert llm_config.validate_output("track", "") == "empty"
+    assert llm_config.validate_output("track", "Thinking it over") == "format"
+    assert llm_config.validate_output("allocate", "Final Answer: nothing") == "invalid"
+    assert llm_config.validate_output("allocate", "Final Answer: TEST-4") is None
+    assert llm_config.validate_output("allocate", "Action: Jira Bulk Ticket Creator") is None
+
+
+def test_identical_calls_are_answered_from_the_cache(completions, in_task, monkeypatch, tmp_path):
+    replies, calls = completions
+    monkeypatch.setattr(llm_config, "llm_cache", LLMResponseCache(str(tmp_path / "cache.sqlite3")))
+    replies[llm_config.LLM_MODEL_LARGE] = "Final Answer: plan"
+    in_task("plan")
+    llm = RoutedLLM(agent="Project Coordinator")
+    assert llm.call(MESSAGES) == llm.call(MESSAGES) == "Final Answer: plan"
+    assert calls == [llm_config.LLM_MODEL_LARGE]
+    with bypass_llm_cache():
+        llm.call(MESSAGES)
+    assert len(calls) == 2
+
+
+def test_agent_calls_are_routed_limited_and_cached(completions, in_task, monkeypatch, tmp_path):
+    replies, calls = completions
+    monkeypatch.setattr(llm_config, "llm_cache", LLMResponseCache(str(tmp_path / "cache.sqlite3")))
+    limiter = RateLimiter("llm", {"requests": 100, "tokens": 100000})
+    monkeypatch.setattr(llm_config, "llm_rate_limiter", LLMRateLimiter(limiter))
+    replies[llm_config.LLM_MODEL_SMALL] = "Final Answer: 3 done"
+    in_task("track")
+    # The coordinator's default tier is large; the tracking task routes it to small
+    llm = create_agents().coordinator.llm
+    assert llm.call(MESSAGES) == llm.call(MESSAGES) == "Final Answer: 3 done"
+    assert calls == [llm_config.LLM_MODEL_SMALL]
+    assert limiter.granted == 1
+
+
+def test_calls_are_counted_with_their_tokens(completions, in_task):
+    replies, _ = completions
+    model = llm_config.LLM_MODEL_LARGE
+    replies[model] = "Final Answer: plan"
+    in_task("plan")
+    calls = llm_config.LLM_CALLS.values().get((model, "ok"), 0)
+    prompt = llm_config.LLM_TOKENS.values().get((model, "prompt"), 0)
+    RoutedLLM(agent="Project Coordinator").call(MESSAGES)
+    assert llm_config.LLM_CALLS.values()[(model, "ok")] == calls + 1
+    assert llm_config.LLM_TOKENS.values()[(model, "prompt")] > prompt
+    assert llm_config.LLM_LATENCY.states()[(model,)]
+
+
+def test_failed_calls_are_counted(monkeypatch, in_task):
+    def completion(**params):
+        raise litellm.APIConnectionError("connection reset", llm_provider="openai", model=params["model"])
+
+    monkeypatch.setattr(llm_config.litellm, "completion", completion)
+    monkeypatch.setattr(llm_config, "llm_cache", None)
+    in_task("plan")
+    model = llm_config.LLM_MODEL_LARGE
+    errors = llm_config.LLM_CALLS.values().get((model, "error"), 0)
+    with pytest.raises(litellm.APIConnectionError):
+        RoutedLLM(agent="Project Coordinator").call(MESSAGES)
+    assert llm_config.LLM_CALLS.values()[(model, "error")] == errors + 1
+
+
+def test_429_cools_down_the_shared_budget_and_retries(completions, in_task, monkeypatch):
+    replies, calls = completions
+    model = llm_config.LLM_MODEL_LARGE
+    replies[model] = "Final Answer: plan"
+    answer = llm_config.litellm.completion
+    limiter = RateLimiter("llm", {"requests": 100, "tokens": 100000})
+    monkeypatch.setattr(llm_config, "llm_rate_limiter", LLMRateLimiter(limiter, estimate=500))
+    throttled = []
+
+    def completion(**params):
+        if not throttled:
+            throttled.append(params["model"])
+            response = httpx.Response(429, headers={"retry-after": "0.2"},
+                                      request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+            raise litellm.RateLimitError("Rate limit reached", llm_provider="openai", model=params["model"],
+                                         response=response)
+        return answer(**params)
+
+    monkeypatch.setattr(llm_config.litellm, "completion", completion)
+    in_task("plan")
+    errors = llm_config.LLM_CALLS.values().get((model, "error"), 0)
+    assert RoutedLLM(agent="Project Coordinator").call(MESSAGES) == "Final Answer: plan"
+    assert throttled == [model] and calls == [model]
+    assert llm_config.LLM_CALLS.values()[(model, "error")] == errors + 1
+    # The retry waited out the provider's Retry-After in the shared limiter
+    assert limiter.granted == 2
+    assert limiter.waited >= 0.15
+    # The estimate was refunded for the failed request and settled against real usage for the other
+    assert limiter.buckets["tokens"].tokens > limiter.buckets["tokens"].capacity - 500
+
+
+def test_429_is_raised_once_retries_run_out(in_task, monkeypatch):
+    monkeypatch.setattr(llm_config, "llm_cache", None)
+    monkeypatch.setattr(llm_config, "llm_rate_limiter", LLMRateLimiter(RateLimiter("llm", {})))
+    monkeypatch.setattr(llm_config, "LLM_RATE_LIMIT_RETRIES", 1)
+    attempts = []
+
+    def completion(**params):
+        attempts.append(params["model"])
+        raise litellm.RateLimitError("Rate limit reached", llm_provider="openai", model=params["model"])
+
+    monkeypatch.setattr(llm_config.litellm, "completion", completion)
+    monkeypatch.setattr(rate_limits, "RATE_LIMIT_COOLDOWN", 0.01)
+    in_task("plan")
+    with pytest.raises(litellm.RateLimitError):
+        RoutedLLM(agent="Project Coordinator").call(MESSAGES)
+    assert len(attempts) == 2
+
+
+def test_prompt_tokens_are_recorded_for_the_task_making_the_call(completions, monkeypatch):
+    replies, _ = completions
+    replies[llm_config.LLM_MODEL_SMALL] = "Final Answer: 3 open"
+    # The task comes from the same context variable the run recorder sets
+    monkeypatch.setattr(llm_config, "current_task", run_store.current_task)
+    before = llm_config.TASK_PROMPT_TOKENS.values().get(("track",), 0)
+
+    def in_track_task():
+        run_store._task.set("track")
+        return RoutedLLM(agent="Progress Tracker").call(MESSAGES)
+
+    assert contextvars.copy_context().run(in_track_task) == "Final Answer: 3 open"
+    assert llm_config.TASK_PROMPT_TOKENS.values()[("track",)] > before
@@ -0,0 +1,11 @@
+import metrics
+
+
+def test_suspended_runs_release_their_task_starts():
+    metrics.record_run_event("run-1", {"type": "task_started", "task_index": 0, "timestamp": 1.0})
+    metrics.record_run_event("run-2", {"type": "task_started", "task_index": 0, "timestamp": 1.0})
+    metrics.record_run_event("run-1", {"type": "run_suspended", "timestamp": 2.0})
+    assert ("run-1", 0) not in metrics._task_starts
+    assert ("run-2", 0) in metrics._task_starts
+    metrics.record_run_event("run-2", {"type": "run_finished", "timestamp": 3.0})
+    assert ("run-2", 0) not in metrics._task_starts
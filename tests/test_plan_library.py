@@ -0,0 +1,43 @@
+import pytest
+
+from plan_library import PLAN_SEED_THRESHOLD, PLAN_SKIP_THRESHOLD, PlanLibrary
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = PlanLibrary(str(tmp_path / "plans.sqlite3"))
+    library.add("Build a todo app with user login and a REST API", "PLAN A")
+    library.add("Migrate the billing service to Kubernetes", "PLAN B")
+    library.add("Set up CI pipelines for the mobile app", "PLAN C")
+    return library
+
+
+def test_a_restated_goal_skips_planning(library):
+    match = library.best_match("build a TODO app with user login and a REST API.")
+    assert match.plan == "PLAN A"
+    assert match.similarity >= PLAN_SKIP_THRESHOLD
+
+
+def test_a_similar_goal_only_seeds_the_plan(library):
+    match = library.best_match("Build a todo app with a GraphQL API and user login")
+    assert match.plan == "PLAN A"
+    assert PLAN_SEED_THRESHOLD <= match.similarity < PLAN_SKIP_THRESHOLD
+    # Below the seed threshold nothing is offered at all
+    assert library.best_match("Build a todo app with a GraphQL API and user login", threshold=0.99) is None
+
+
+def test_an_unrelated_goal_gets_no_plan(library):
+    assert library.nearest("Write the quarterly marketing report") == []
+    assert library.best_match("Set up billing for the marketing team") is None
+
+
+def test_oldest_plans_are_evicted_and_the_rest_reloaded(tmp_path):
+    path = str(tmp_path / "plans.sqlite3")
+    library = PlanLibrary(path, max_plans=2)
+    for name in ("alpha", "beta", "gamma"):
+        library.add(f"Launch the {name} service", name)
+    assert len(library) == 2
+    assert library.best_match("Launch the alpha service", threshold=0.9) is None
+
+    reloaded = PlanLibrary(path, max_plans=2)
+    assert [reloaded.best_match(f"Launch the {name} service").plan for name in ("beta", "gamma")] == ["beta", "gamma"]
@@ -0,0 +1,37 @@
+import threading
+import time
+
+from rate_limits import (PRIORITY_DEFAULT, PRIORITY_FINISH, PRIORITY_START, RateLimiter, _priority,
+                         request_priority, set_priority)
+
+
+def test_higher_priority_waiters_go_first():
+    limiter = RateLimiter("test", {"requests": 5}, burst=0.2)
+    limiter.acquire()  # the one banked request is spent; everyone else waits for the refill
+    order, threads = [], []
+    for name, priority in [("start-1", PRIORITY_START), ("start-2", PRIORITY_START), ("finish", PRIORITY_FINISH)]:
+        thread = threading.Thread(target=lambda n=name, p=priority: (limiter.acquire(priority=p), order.append(n)))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join(5)
+    # Everyone queued before the refill, so the finishing run overtakes both starting ones
+    assert order == ["finish", "start-1", "start-2"]
+    assert limiter.granted == 4 and limiter.waited > 0
+
+
+def test_a_zero_retry_after_is_not_replaced_by_the_default_cool_down():
+    limiter = RateLimiter("test", {})
+    limiter.cool_down(0)
+    assert limiter.stats()["cooling_down_s"] == 0
+    limiter.cool_down()
+    assert limiter.stats()["cooling_down_s"] > 0
+
+
+def test_request_priority_restores_the_previous_priority():
+    assert _priority.get() == PRIORITY_DEFAULT
+    with request_priority(PRIORITY_START):
+        set_priority(PRIORITY_FINISH)
+        assert _priority.get() == PRIORITY_FINISH
+    assert _priority.get() == PRIORITY_DEFAULT
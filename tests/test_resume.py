@@ -0,0 +1,68 @@
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("crewai")
+
+import main
+import tools
+from agents import create_agents
+from benchmarks.fake_llm import ScriptedLLM
+from crew_factory import AgentPool
+from human_loop import HumanLoop
+from job_queue import Job, JobSuspended
+from run_store import RunStore
+
+QUESTION = "Should the login page support SSO?"
+
+
+class AskingLLM(ScriptedLLM):
+    """The scripted crew, except that the resolver asks a human until the task carries an answer."""
+
+    def __init__(self):
+        super().__init__()
+        self.roles = Counter()
+
+    def respond(self, role, task, used_tool):
+        self.roles[role] += 1
+        if role == "Conflict Resolver" and not used_tool and "already answered" not in task:
+            return self._action("Human Input", {"question": QUESTION})
+        return super().respond(role, task, used_tool)
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    fake = AskingLLM()
+    monkeypatch.setattr(main, "agent_pool", AgentPool(size=1, factory=lambda: create_agents(fake)))
+    monkeypatch.setattr(main, "human_loop", HumanLoop(str(tmp_path / "questions.sqlite3")))
+    monkeypatch.setattr(main, "run_store", RunStore(str(tmp_path / "runs.sqlite3")))
+    monkeypatch.setattr(main, "plan_library", None)
+    monkeypatch.setattr(main, "PLAN_REVIEW", False)
+    # No Jira here: the Jira tools report that, and the scripted agents carry on
+    monkeypatch.setattr(tools, "get_jira_client", lambda: None)
+    return fake
+
+
+def test_answered_run_resumes_without_repeating_finished_tasks(app):
+    job = Job(id="resume-test", goal="Build a login page")
+    with pytest.raises(JobSuspended):
+        main.run_crew(job)
+
+    saved = main.run_store.get(job.id)
+    assert saved.status == "suspended"
+    assert list(saved.outputs) == ["plan", "allocate", "track"]
+    [question] = main.human_loop.pending(job.id)
+    assert (question.question, question.task) == (QUESTION, "resolve")
+    before = Counter(app.roles)
+
+    main.human_loop.answer(job.id, "Yes, support Google SSO.")
+    result, reward = main.run_crew(job)
+
+    resumed = app.roles - before
+    # Plan, allocation and tracking came from the checkpoints; only resolve and execute ran again
+    assert set(resumed) == {"Conflict Resolver", "Project Coordinator"}
+    assert resumed["Conflict Resolver"] == 1
+    saved = main.run_store.get(job.id)
+    assert saved.status == "succeeded"
+    assert list(saved.outputs) == ["plan", "allocate", "track", "resolve", "execute"]
+    assert result.raw and reward > 0
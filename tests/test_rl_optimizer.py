@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("torch")
+
+from rl_optimizer import RLOptimizer
+
+
+@pytest.fixture
+def optimizer(tmp_path):
+    return RLOptimizer(checkpoint_path="", policy_path="", batch_size=4)
+
+
+def test_constant_rewards_take_no_step(optimizer):
+    for i in range(8):
+        optimizer.record([10 + i, 6, 5, 1], i % 2, 90.0)
+    assert optimizer.train_pending() == 0
+    assert optimizer.version == 0
+    assert optimizer.skipped > 0
+
+
+def test_varied_rewards_update_the_policy(optimizer):
+    for i in range(8):
+        optimizer.record([10 + i, 6, 5, 1], i % 2, 100.0 if i % 2 else 20.0)
+    assert optimizer.train_pending() > 0
+    assert optimizer.version > 0
+    assert optimizer.last_loss is not None
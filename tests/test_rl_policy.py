@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from rl_policy import InferencePolicy, calculate_reward
+
+
+def test_concurrent_selection_matches_the_seeded_sequence(tmp_path):
+    def policy():
+        return InferencePolicy(policy_path=str(tmp_path / "missing.npz"),
+                               experience_path=str(tmp_path / "experience.jsonl"), seed=7)
+
+    alone = policy()
+    expected = sorted(alone.select_action([20, 6, 5, 1]) for _ in range(400))
+    shared = policy()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        actions = list(pool.map(lambda _: shared.select_action([20, 6, 5, 1]), range(400)))
+    # Every draw comes from the one generator exactly once, whichever thread makes it
+    assert sorted(actions) == expected
+
+
+def test_rewards_follow_the_run_outcome():
+    fast = calculate_reward(True, duration=60, tickets_created=10)
+    slow = calculate_reward(True, duration=600, tickets_created=10)
+    fewer_tickets = calculate_reward(True, duration=60, tickets_created=2)
+    failed = calculate_reward(False, duration=60, tickets_created=10)
+    assert fast > slow > failed
+    assert fast > fewer_tickets
+    # Ticket bonuses are capped, and even a very slow success beats a failure
+    assert calculate_reward(True, tickets_created=500) == calculate_reward(True, tickets_created=20)
+    assert calculate_reward(True, duration=10 ** 6) > failed == 0
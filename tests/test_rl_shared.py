@@ -0,0 +1,63 @@
+import struct
+
+import numpy as np
+
+import rl_shared
+from rl_policy import initial_weights
+from rl_shared import SEQ_OFFSET, SharedPolicyStore
+
+
+def same(a, b):
+    return all(np.array_equal(a[name], b[name]) for name in a)
+
+
+def test_publishes_are_read_back_by_other_workers(tmp_path):
+    path = str(tmp_path / "policy.shm")
+    reader = SharedPolicyStore(path)
+    assert reader.read() is None and reader.generation() is None
+
+    writer, first, second = SharedPolicyStore(path), initial_weights(1), initial_weights(2)
+    writer.publish(first, 1)
+    weights, version = reader.read()
+    assert version == 1 and same(weights, first)
+    generation = reader.generation()
+    writer.publish(second, 2)
+    assert reader.generation() != generation
+    weights, version = reader.read()
+    assert version == 2 and same(weights, second)
+
+
+def test_a_read_overtaken_by_publishes_is_retried(tmp_path, monkeypatch):
+    path = str(tmp_path / "policy.shm")
+    writer, reader = SharedPolicyStore(path), SharedPolicyStore(path)
+    weights = [initial_weights(seed) for seed in range(3)]
+    writer.publish(weights[0], 1)
+    frombuffer, copies = np.frombuffer, []
+
+    def overtaken(*args, **kwargs):
+        view = frombuffer(*args, **kwargs)
+        if not copies:
+            # While the reader copies slot 0, two publishes land: the second rewrites that very slot
+            writer.publish(weights[1], 2)
+            writer.publish(weights[2], 3)
+        copies.append(view[:4].copy())
+        return view
+
+    monkeypatch.setattr(rl_shared.np, "frombuffer", overtaken)
+    loaded, version = reader.read()
+    # The first copy mixed in version 3's data under version 1's header, so it was thrown away
+    assert len(copies) == 2
+    assert version == 3 and same(loaded, weights[2])
+
+
+def test_readers_wait_out_a_publish_in_progress(tmp_path):
+    path = str(tmp_path / "policy.shm")
+    writer, reader = SharedPolicyStore(path), SharedPolicyStore(path)
+    writer.publish(initial_weights(0), 1)
+    mm = writer._open()
+    seq = struct.unpack_from("<Q", mm, SEQ_OFFSET)[0]
+
+    struct.pack_into("<Q", mm, SEQ_OFFSET, seq + 1)  # odd: the header is being flipped
+    assert reader.read(retries=5) is None
+    struct.pack_into("<Q", mm, SEQ_OFFSET, seq)
+    assert reader.read()[1] == 1
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from run_history import InvalidCursor, RunHistory
+
+
+@pytest.fixture
+def history(tmp_path):
+    # Tiny segments, so paging has to cross segment boundaries
+    return RunHistory(str(tmp_path), segment_bytes=64)
+
+
+def fill(history, count):
+    return [history.append(f"run-{i}", {"run_id": f"run-{i}", "goal": f"goal {i}"}) for i in range(count)]
+
+
+def ids(records):
+    return [record["run_id"] for record in records]
+
+
+def test_pages_cover_every_run_once_in_both_orders(history):
+    fill(history, 7)
+    assert history.stats()["segments"] > 1
+
+    seen, cursor = [], None
+    while True:
+        records, cursor = history.page(cursor, limit=3, order="desc")
+        seen += ids(records)
+        if cursor is None:
+            break
+    assert seen == [f"run-{i}" for i in reversed(range(7))]
+
+    seen, cursor = [], None
+    for _ in range(3):
+        records, cursor = history.page(cursor, limit=3, order="asc")
+        seen += ids(records)
+    assert seen == [f"run-{i}" for i in range(7)]
+
+
+def test_asc_cursor_follows_the_tail(history):
+    fill(history, 2)
+    records, cursor = history.page(None, limit=10, order="asc")
+    assert ids(records) == ["run-0", "run-1"]
+    assert history.page(cursor, order="asc") == ([], cursor)
+    history.append("run-2", {"run_id": "run-2"})
+    records, _ = history.page(cursor, order="asc")
+    assert ids(records) == ["run-2"]
+
+
+def test_time_range(history):
+    fill(history, 2)
+    time.sleep(0.01)
+    since = time.time()
+    history.append("run-2", {"run_id": "run-2"})
+    history.append("run-3", {"run_id": "run-3"})
+    time.sleep(0.01)
+    until = time.time()
+    history.append("run-4", {"run_id": "run-4"})
+
+    assert ids(history.page(order="asc", since=since, until=until)[0]) == ["run-2", "run-3"]
+    assert ids(history.page(order="desc", since=since, until=until)[0]) == ["run-3", "run-2"]
+    assert ids(history.scan(since=since)) == ["run-2", "run-3", "run-4"]
+
+
+def test_get_returns_the_latest_record_and_sees_other_writers(history, tmp_path):
+    history.append("run-0", {"run_id": "run-0", "status": "waiting_for_input"})
+    history.append("run-0", {"run_id": "run-0", "status": "succeeded"})
+    assert history.get("run-0")["status"] == "succeeded"
+    assert history.get("missing") is None
+
+    other = RunHistory(str(tmp_path), segment_bytes=64)
+    other.append("run-1", {"run_id": "run-1"})
+    assert history.get("run-1")["run_id"] == "run-1"
+    assert history.stats()["runs"] == 3
+
+
+def test_invalid_cursor(history):
+    with pytest.raises(InvalidCursor):
+        history.page("not-a-cursor")
+
+
+def test_full_segments_are_looked_up_on_disk(history, tmp_path):
+    fill(history, 7)
+    history.append("run-1", {"run_id": "run-1", "goal": "again"})
+    stats = history.stats()
+    # Only the segment being appended to keeps its ids in memory
+    assert set(history._tail) == {"run-1"} and stats["segments"] == 8
+    for i in range(7):
+        assert history.get(f"run-{i}")["run_id"] == f"run-{i}"
+    assert history.get("run-1")["goal"] == "again"
+    assert history.get("run-07") is None
+
+    # A writer that died before sealing its full segment: the next reader seals it
+    (tmp_path / "segment-00000003.ids").unlink()
+    other = RunHistory(str(tmp_path), segment_bytes=64)
+    assert (tmp_path / "segment-00000003.ids").exists()
+    assert other.get("run-3")["goal"] == "goal 3"
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from job_queue import CANCELLED, FINISHED_STATES, RUNNING, SUCCEEDED, JobQueue
+from single_flight import CACHED, INFLIGHT, SingleFlight
+
+
+@pytest.fixture
+def runs():
+    """A queue whose runner counts runs and holds each one until `release` is set."""
+    state = {"runs": 0, "release": threading.Event(), "started": threading.Event()}
+
+    def runner(job):
+        state["runs"] += 1
+        state["started"].set()
+        while not state["release"].wait(0.01):
+            job.check_cancelled()
+        return f"done: {job.goal}", 1.0
+
+    state["queue"] = queue = JobQueue(runner, max_workers=2)
+    yield state
+    state["release"].set()
+    queue.shutdown()
+
+
+def wait_until_finished(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while job.status not in FINISHED_STATES and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.status in FINISHED_STATES
+
+
+def test_identical_goals_share_one_run(runs):
+    flight = SingleFlight(runs["queue"], result_ttl=0)
+    first, shared = flight.submit("Build a todo app.")
+    assert shared is None
+    runs["started"].wait(5)
+    second, shared = flight.submit("  build a TODO app ")
+    assert shared == INFLIGHT and second is first
+    other, shared = flight.submit("Build a todo app", {"review_plan": False})
+    assert shared is None and other is not first
+
+    runs["release"].set()
+    wait_until_finished(first)
+    wait_until_finished(other)
+    assert runs["runs"] == 2
+    assert first.result == "done: Build a todo app."
+    stats = flight.stats()
+    assert (stats["requests"], stats["runs"], stats["coalesced"], stats["runs_saved"]) == (3, 2, 1, 1)
+
+
+def test_result_ttl_serves_finished_runs(runs):
+    flight = SingleFlight(runs["queue"], result_ttl=60)
+    runs["release"].set()
+    first, _ = flight.submit("Build a todo app")
+    wait_until_finished(first)
+    assert first.status == SUCCEEDED
+    assert flight.submit("build a todo app") == (first, CACHED)
+    again, shared = flight.submit("build a todo app", {"bypass_cache": True})
+    assert shared is None and again is not first
+
+
+def test_cancel_only_stops_the_run_once_nobody_waits(runs):
+    flight = SingleFlight(runs["queue"], result_ttl=0)
+    job, _ = flight.submit("Build a todo app")
+    flight.submit("Build a todo app")
+    runs["started"].wait(5)
+    assert flight.requesters(job.id) == 2
+
+    assert flight.cancel(job.id) == (job, False)
+    assert job.status == RUNNING and not job.cancel_requested
+    assert flight.cancel(job.id) == (job, True)
+    wait_until_finished(job)
+    assert job.status == CANCELLED
+
+    # A cancelled run is not shared; the next identical request starts a new one
+    fresh, shared = flight.submit("Build a todo app")
+    assert shared is None and fresh is not job
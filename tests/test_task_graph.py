@@ -0,0 +1,127 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from task_graph import CONTEXT_SEPARATOR, TaskGraphError, run_task_graph
+
+
+class FakeTool:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeAgent:
+    def __init__(self, role, tools=(), allow_delegation=False):
+        self.role = role
+        self.tools = list(tools)
+        self.allow_delegation = allow_delegation
+
+    def get_delegation_tools(self, agents):
+        return [FakeTool("Delegate work to coworker"), FakeTool("Ask question to coworker")]
+
+
+class FakeTask:
+    """Records when it ran, with which context and tools, and how many tasks ran alongside it."""
+
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, name, context=(), agent=None, seconds=0.05):
+        self.description = name
+        self.context = list(context)
+        self.agent = agent or FakeAgent(name)
+        self.tools = None
+        self.output = None
+        self.seconds = seconds
+        self.received = None
+
+    def execute_sync(self, agent, context, tools):
+        cls = FakeTask
+        with cls.lock:
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        self.received = SimpleNamespace(context=context, tools=[tool.name for tool in tools],
+                                        started=time.perf_counter())
+        time.sleep(self.seconds)
+        with cls.lock:
+            cls.running -= 1
+        self.finished = time.perf_counter()
+        return SimpleNamespace(raw=f"{self.description} done")
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    FakeTask.running = FakeTask.peak = 0
+
+
+def diamond():
+    plan = FakeTask("plan")
+    allocate = FakeTask("allocate", [plan])
+    review = FakeTask("review", [plan])
+    execute = FakeTask("execute", [allocate, review])
+    return [plan, allocate, review, execute]
+
+
+def test_tasks_start_once_their_context_has_finished():
+    plan, allocate, review, execute = tasks = diamond()
+    result = run_task_graph(tasks, max_parallel=3)
+    for task in (allocate, review):
+        assert task.received.started >= plan.finished
+        assert task.received.context == "plan done"
+    assert execute.received.started >= max(allocate.finished, review.finished)
+    assert execute.received.context == CONTEXT_SEPARATOR.join(["allocate done", "review done"])
+    assert result.raw == "execute done"
+    # The two middle tasks overlapped, so the run took about three task lengths, not four
+    assert FakeTask.peak == 2
+    assert result.wall_time < sum(timing.duration for timing in result.timings)
+    assert result.critical_path[0] == "plan" and result.critical_path[-1] == "execute"
+
+
+def test_parallelism_is_capped():
+    tasks = [FakeTask(f"task {i}") for i in range(6)]
+    run_task_graph(tasks, max_parallel=2)
+    assert FakeTask.peak == 2
+
+    FakeTask.peak = 0
+    run_task_graph([FakeTask(f"task {i}") for i in range(4)], max_parallel=1)
+    assert FakeTask.peak == 1
+
+
+def test_cycles_and_missing_context_are_rejected():
+    first, second = FakeTask("first"), FakeTask("second")
+    first.context, second.context = [second], [first]
+    with pytest.raises(TaskGraphError):
+        run_task_graph([first, second])
+    with pytest.raises(TaskGraphError):
+        run_task_graph([FakeTask("orphan", [FakeTask("not in this run")])])
+
+
+def test_delegating_agents_get_the_crews_delegation_tools():
+    coordinator = FakeAgent("coordinator", allow_delegation=True)
+    tracker = FakeAgent("tracker", tools=[FakeTool("Jira Issue Fetcher")])
+    plan, track = FakeTask("plan", agent=coordinator), FakeTask("track", agent=tracker)
+    run_task_graph([plan, track], agents=[coordinator, tracker])
+    assert plan.received.tools == ["Delegate work to coworker", "Ask question to coworker"]
+    assert track.received.tools == ["Jira Issue Fetcher"]
+
+    # Without the crew's agents there is nobody to delegate to
+    run_task_graph([plan], agents=None)
+    assert plan.received.tools == []
+
+
+def test_real_agents_can_delegate_in_dag_mode():
+    pytest.importorskip("crewai")
+    from agents import create_agents
+    from task_graph import _tools
+
+    agents = create_agents()
+    for agent in (agents.coordinator, agents.resolver):
+        task = SimpleNamespace(agent=agent, tools=None)
+        names = [tool.name for tool in _tools(task, agents.all())]
+        assert "Delegate work to coworker" in names and "Ask question to coworker" in names
+    # The resolver keeps its own tool next to the delegation tools
+    assert agents.resolver.tools[0].name in [tool.name for tool in _tools(
+        SimpleNamespace(agent=agents.resolver, tools=None), agents.all())]
@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+import tools
+
+
+class FakeJira:
+    base_url = "https://test.atlassian.net"
+
+    def __init__(self):
+        self.created = []
+
+    def create_issues_bulk(self, fields):
+        self.created.extend(fields)
+        return [{"key": f"TEST-{i + 1}"} for i in range(len(fields))]
+
+
+@pytest.fixture
+def jira(monkeypatch):
+    jira = FakeJira()
+    monkeypatch.setattr(tools, "get_jira_client", lambda: jira)
+    monkeypatch.setattr(tools, "get_issue_cache", lambda: None)
+    monkeypatch.setattr(tools, "record_created_issues", lambda created: None)
+    return jira
+
+
+def test_bulk_create_reports_each_ticket(jira):
+    result = tools.JiraBulkCreateTicketsTool()._run("TEST", [
+        {"summary": "Set up CI", "description": "Pipeline"},
+        tools.JiraTicketSpec(summary="Write docs", description="README"),
+    ])
+    assert result.splitlines() == ["Successfully created Jira ticket: TEST-1",
+                                   "Successfully created Jira ticket: TEST-2"]
+
+
+def test_created_tickets_are_reported_when_the_cache_write_fails(monkeypatch, jira):
+    class BrokenCache:
+        def record_created(self, domain, key, summary):
+            raise RuntimeError("database is locked")
+
+    checkpointed = []
+    monkeypatch.setattr(tools, "get_issue_cache", BrokenCache)
+    monkeypatch.setattr(tools, "record_created_issues", checkpointed.extend)
+    result = tools.JiraBulkCreateTicketsTool()._run("TEST", [{"summary": "Set up CI", "description": "Pipeline"}])
+    assert result == "Successfully created Jira ticket: TEST-1"
+    assert checkpointed == [("TEST-1", "Set up CI")]
+
+
+def test_bulk_create_returns_an_error_for_invalid_tickets(jira):
+    result = tools.JiraBulkCreateTicketsTool()._run("TEST", [{"summary": "No description"}])
+    assert result.startswith("Error: invalid ticket list")
+    assert jira.created == []
+
+
+def test_progress_mode_never_touches_the_issue_cache(monkeypatch, jira):
+    def no_cache():
+        raise AssertionError("progress mode must stay count-only")
+
+    monkeypatch.setattr(tools, "get_issue_cache", no_cache)
+    monkeypatch.setattr(tools, "fetch_status_counts",
+                        lambda jira, project_key: {"TO DO": 1, "IN PROGRESS": 1, "DONE": 2})
+    result = tools.json.loads(tools.JiraFetchIssuesTool()._run("TEST"))
+    assert result["progress"] == 50
@@ -1,57 +1,58 @@
-import os
 import requests
-from requests.auth import HTTPBasicAuth
-from collections import defaultdict
-from typing import Type
+from typing import List, Type
 
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 import json
 
+from jira_client import get_jira_client, fetch_status_buckets, fetch_status_counts, issue_fields
+from jira_cache import get_issue_cache
+from human_loop import current_session
+from run_store import record_created_issues
+
 # --- Tool for fetching Jira Issues ---
 
 # Define the input schema for the tool
 class JiraToolArgs(BaseModel):
     project_key: str = Field(description="The Jira project key, e.g., 'TEST'.")
+    mode: str = Field(
+        description="'progress' returns only per-status counts and the completion percentage (fast). "
+                    "'detail' also lists every issue; use it only when individual tickets matter.",
+        default="progress",
+    )
 
 class JiraFetchIssuesTool(BaseTool):
     name: str = "Jira Issue Fetcher"
-    description: str = "Fetches and lists all issues from a specific Jira project, and calculates the completion percentage."
+    description: str = (
+        "Calculates the completion percentage of a Jira project from per-status issue counts. "
+        "In 'detail' mode it also lists every issue grouped by status."
+    )
     args_schema: Type[BaseModel] = JiraToolArgs
 
-    def _run(self, project_key: str) -> str:
-        # Load credentials from environment variables
-        jira_domain = os.getenv("JIRA_DOMAIN")
-        email = os.getenv("EMAIL")
-        api_token = os.getenv("JIRA_API_TOKEN")
-
-        if not all([jira_domain, email, api_token]):
+    def _run(self, project_key: str, mode: str = "progress") -> str:
+        # The shared client is built once from the environment variables
+        jira = get_jira_client()
+        if jira is None:
             return json.dumps({"error": "Jira credentials are not fully set."})
 
-        url = f"https://{jira_domain}/rest/api/2/search"
-        query = {'jql': f"project = {project_key}", 'maxResults': 50}
-
         try:
-            response = requests.get(url, params=query, auth=HTTPBasicAuth(email, api_token), timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
-            issues = data.get('issues', [])
-            if not issues:
+            if mode != "detail":
+                # Count-only queries; the issue cache would first have to download every issue
+                return self._progress(jira, project_key)
+
+            # Served from the local issue cache when enabled; it pulls only a delta once it is stale.
+            # Otherwise walks every page of the project, keeping only each issue's key, summary and status
+            cache = get_issue_cache()
+            if cache is not None:
+                cache.ensure_fresh(jira, project_key)
+                buckets = cache.status_buckets(jira.base_url, project_key)
+            else:
+                buckets = fetch_status_buckets(jira, project_key)
+            if buckets.total == 0:
                 return json.dumps({"summary": f"No issues found for project '{project_key}'.", "progress": 0})
 
-            # --- NEW: Progress Calculation Logic ---
-            status_groups = defaultdict(list)
-            done_count = 0
-            for issue in issues:
-                status_name = issue['fields']['status']['name'].upper()
-                status_groups[status_name].append(issue)
-                if status_name == 'DONE':
-                    done_count += 1
-            
-            total_count = len(issues)
-            progress_percentage = int((done_count / total_count) * 100) if total_count > 0 else 0
-            # --- END of new logic ---
+            status_groups = buckets.groups
+            progress_percentage = buckets.progress
 
             output_lines = [f"Jira Issues for Project: {project_key}\n"]
             statuses_to_report = ['TO DO', 'IN PROGRESS', 'DONE']
@@ -59,8 +60,8 @@ class JiraFetchIssuesTool(BaseTool):
             for status in statuses_to_report:
                 output_lines.append(f"--- {status} ---")
                 if status in status_groups:
-                    for issue in status_groups[status]:
-                        output_lines.append(f"- {issue['key']}: {issue['fields']['summary']}")
+                    for key, summary in status_groups[status]:
+                        output_lines.append(f"- {key}: {summary}")
                 else:
                     output_lines.append(" (No issues)")
                 output_lines.append("")
@@ -78,7 +79,26 @@ class JiraFetchIssuesTool(BaseTool):
             return json.dumps({"error": f"Error connecting to Jira: {e}"})
         except Exception as e:
             return json.dumps({"error": f"An unexpected error occurred: {e}"})
-                
+
+
+    def _progress(self, jira, project_key: str) -> str:
+        # Only the per-status totals are transferred, however many issues the project has
+        counts = fetch_status_counts(jira, project_key)
+        total_count = sum(counts.values())
+        if total_count == 0:
+            return json.dumps({"summary": f"No issues found for project '{project_key}'.", "progress": 0})
+
+        progress_percentage = int((counts['DONE'] / total_count) * 100)
+        summary_lines = [f"Jira Issue Counts for Project: {project_key}"]
+        summary_lines += [f"{status}: {count}" for status, count in counts.items()]
+        summary_lines.append(f"TOTAL: {total_count}")
+
+        return json.dumps({
+            "summary": "\n".join(summary_lines),
+            "progress": progress_percentage,
+            "counts": counts
+        })
+
 
 # --- Tool for Human Input ---
 
@@ -94,10 +114,30 @@ class HumanInputTool(BaseTool):
     def _run(self, question: str) -> str:
         """
         The agent uses this tool to ask a question.
-        The question is passed to the step_callback, which pauses and waits for a human response.
+        Inside a run the question is stored and the run suspends once the current task ends
+        (see human_loop.py); it resumes, on any worker, when a human posts the answer.
         """
-        # This tool no longer waits for input. It simply returns the question.
-        return question
+        session = current_session()
+        if session is None:
+            # Outside a job there is nobody to pause; hand the question back as before
+            return question
+        return session.ask(question)
+
+def _record_created(jira, created: List[tuple]):
+    """
+    Writes new (key, summary) tickets through to the local issue cache and the run's checkpoint.
+    The tickets exist in Jira either way, so a cache failure is logged rather than reported as a
+    failed creation, which would make the agent create them again.
+    """
+    cache = get_issue_cache()
+    if cache is not None:
+        try:
+            for key, summary in created:
+                cache.record_created(jira.base_url, key, summary)
+        except Exception as e:
+            print(f"--- Could not write created tickets to the issue cache: {e} ---")
+    # ...and into the run's checkpoint, so a retried run does not create them twice
+    record_created_issues(created)
 
 # Define the input schema for the new tool
 class JiraCreateTicketArgs(BaseModel):
@@ -112,48 +152,70 @@ class JiraCreateTicketTool(BaseTool):
     args_schema: Type[BaseModel] = JiraCreateTicketArgs
 
     def _run(self, project_key: str, summary: str, description: str, issue_type: str = "Task") -> str:
-        # Load credentials from environment variables
-        jira_domain = os.getenv("JIRA_DOMAIN")
-        email = os.getenv("EMAIL")
-        api_token = os.getenv("JIRA_API_TOKEN")
-
-        if not all([jira_domain, email, api_token]):
+        # The shared client carries the credentials and JSON headers
+        jira = get_jira_client()
+        if jira is None:
             return "Error: Jira credentials are not fully set in the .env file."
 
-        # Construct the API URL for creating an issue
-        url = f"https://{jira_domain}/rest/api/2/issue"
-
-        # Set up the authentication header
-        auth = HTTPBasicAuth(email, api_token)
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
-
         # Construct the payload with the ticket details
-        payload = {
-            "fields": {
-                "project": {
-                    "key": project_key
-                },
-                "summary": summary,
-                "description": description,
-                "issuetype": {
-                    "name": issue_type
-                }
-            }
-        }
+        payload = {"fields": issue_fields(project_key, summary, description, issue_type)}
 
         try:
-            response = requests.post(url, json=payload, headers=headers, auth=auth, timeout=10)
+            response = jira.post("rest/api/2/issue", json=payload)
             response.raise_for_status()
             
             # If successful, Jira returns the details of the created ticket
             created_ticket = response.json()
             ticket_key = created_ticket['key']
+
+            _record_created(jira, [(ticket_key, summary)])
             return f"Successfully created Jira ticket: {ticket_key}"
 
         except requests.exceptions.RequestException as e:
-            return f"Error creating Jira ticket: {e}. Response: {e.response.text if e.response else 'No response'}"
+            return f"Error creating Jira ticket: {e}. Response: {e.response.text if e.response is not None else 'No response'}"
+        except Exception as e:
+            return f"An unexpected error occurred: {e}"
+
+# --- Tool for creating many Jira tickets at once ---
+
+class JiraTicketSpec(BaseModel):
+    summary: str = Field(description="The title or summary of the Jira ticket.")
+    description: str = Field(description="The detailed description for the Jira ticket.")
+    issue_type: str = Field(description="The type of the issue, e.g., 'Task', 'Story', or 'Bug'.", default="Task")
+
+class JiraBulkCreateTicketsArgs(BaseModel):
+    project_key: str = Field(description="The Jira project key, e.g., 'TEST'.")
+    tickets: List[JiraTicketSpec] = Field(description="Every sub-task to create, each with a summary and description.")
+
+class JiraBulkCreateTicketsTool(BaseTool):
+    name: str = "Jira Bulk Ticket Creator"
+    description: str = (
+        "A tool to create many tickets in a Jira project in one call. "
+        "Pass all sub-tasks at once; it reports success or failure for each ticket."
+    )
+    args_schema: Type[BaseModel] = JiraBulkCreateTicketsArgs
+
+    def _run(self, project_key: str, tickets: List) -> str:
+        jira = get_jira_client()
+        if jira is None:
+            return "Error: Jira credentials are not fully set in the .env file."
+
+        try:
+            # The agent may hand us plain dicts rather than JiraTicketSpec objects
+            specs = [t if isinstance(t, JiraTicketSpec) else JiraTicketSpec.model_validate(t) for t in tickets]
+            fields = [issue_fields(project_key, t.summary, t.description, t.issue_type) for t in specs]
+            results = jira.create_issues_bulk(fields)
+        except ValidationError as e:
+            return f"Error: invalid ticket list, nothing was created: {e}"
         except Exception as e:
-            return f"An unexpected error occurred: {e}"
\ No newline at end of file
+            return f"An unexpected error occurred: {e}"
+
+        lines, created = [], []
+        for spec, result in zip(specs, results):
+            if "key" in result:
+                created.append((result['key'], spec.summary))
+                lines.append(f"Successfully created Jira ticket: {result['key']}")
+            else:
+                lines.append(f"Failed to create Jira ticket '{spec.summary}': {result['error']}")
+        _record_created(jira, created)
+        return "\n".join(lines)
\ No newline at end of file
@@ -0,0 +1,221 @@
+# web_search.py
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# --- Configuration ---
+DATA_DIR = os.getenv("DEVBOSS_DATA_DIR", ".devboss")
+# "duckduckgo", or "local" to answer from a JSON file of canned results (offline runs, demos, benchmarks)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "duckduckgo")
+SEARCH_LOCAL_PATH = os.getenv("SEARCH_LOCAL_PATH", os.path.join(DATA_DIR, "search_results.json"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+# Queries of one batch that may hit the backend at the same time
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))
+# The most queries a single tool call may run
+SEARCH_MAX_QUERIES = int(os.getenv("SEARCH_MAX_QUERIES", "8"))
+
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case and spacing do not make a different query."""
+    return _SPACE.sub(" ", query).strip().lower()
+
+
+# --- Backends ---
+class SearchBackend:
+    """Answers one query with text. The default async path runs the blocking call off the event loop."""
+
+    name = "base"
+
+    def search(self, query: str) -> str:
+        raise NotImplementedError
+
+    async def asearch(self, query: str) -> str:
+        return await asyncio.to_thread(self.search, query)
+
+
+class DuckDuckGoBackend(SearchBackend):
+    """DuckDuckGo through LangChain; the client is built once, on the first search."""
+
+    name = "duckduckgo"
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from langchain_community.tools import DuckDuckGoSearchRun
+                    self._client = DuckDuckGoSearchRun()
+        return self._client
+
+    def search(self, query: str) -> str:
+        return self.client().run(query)
+
+
+class LocalSearchBackend(SearchBackend):
+    """Canned results from a JSON object of query -> text; unknown queries find nothing."""
+
+    name = "local"
+
+    def __init__(self, path: str = SEARCH_LOCAL_PATH, results: Optional[Dict[str, str]] = None):
+        if results is None:
+            results = {}
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    results = json.load(f)
+        self.results = {normalize_query(query): text for query, text in results.items()}
+
+    def search(self, query: str) -> str:
+        return self.results.get(normalize_query(query), f"No good search results found for '{query}'.")
+
+    async def asearch(self, query: str) -> str:
+        return self.search(query)
+
+
+BACKENDS = {"duckduckgo": DuckDuckGoBackend, "local": LocalSearchBackend}
+
+
+def create_backend(name: str = SEARCH_BACKEND) -> SearchBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown search backend '{name}'; choose one of {sorted(BACKENDS)}.")
+    return BACKENDS[name]()
+
+
+# --- Result Cache ---
+class SearchCache:
+    """In-memory results by normalized query. Entries expire after `ttl` seconds; the least recently used go first."""
+
+    def __init__(self, max_size: int = SEARCH_CACHE_SIZE, ttl: float = SEARCH_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] > self.ttl:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key: str, value: str):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {**self.stats, "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                    "entries": len(self._entries), "max_size": self.max_size}
+
+
+# --- Batched Search ---
+class WebSearch:
+    """
+    Runs a batch of queries concurrently against one shared backend. Repeated queries, within
+    a batch or across calls, are served from the cache; failed searches are not cached.
+    """
+
+    def __init__(self, backend: Optional[SearchBackend] = None, cache: Optional[SearchCache] = None,
+                 max_concurrency: int = SEARCH_MAX_CONCURRENCY):
+        self.backend = backend or create_backend()
+        self.cache = cache or SearchCache()
+        self.max_concurrency = max(1, max_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="web-search")
+
+    def _plan(self, queries: List[str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        # Normalized key -> cached result, and -> the query to send for every miss
+        cached, missing = {}, {}
+        for query in queries:
+            key = normalize_query(query)
+            if not key or key in cached or key in missing:
+                continue
+            result = self.cache.get(key)
+            if result is not None:
+                cached[key] = result
+            else:
+                missing[key] = query
+        return cached, missing
+
+    def _store(self, key: str, query: str, result) -> str:
+        if isinstance(result, BaseException):
+            return f"Search failed for '{query}': {result}"
+        self.cache.put(key, result)
+        return result
+
+    @staticmethod
+    def _in_order(queries: List[str], results: Dict[str, str]) -> List[Tuple[str, str]]:
+        return [(query, results[normalize_query(query)]) for query in queries if normalize_query(query)]
+
+    def search_many(self, queries: List[str]) -> List[Tuple[str, str]]:
+        """(query, result) for every query, in the order given."""
+        results, missing = self._plan(queries)
+        futures = {key: self._pool.submit(self.backend.search, query) for key, query in missing.items()}
+        for key, future in futures.items():
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = e
+            results[key] = self._store(key, missing[key], outcome)
+        return self._in_order(queries, results)
+
+    async def asearch_many(self, queries: List[str]) -> List[Tuple[str, str]]:
+        results, missing = self._plan(queries)
+        limit = asyncio.Semaphore(self.max_concurrency)
+
+        async def one(query):
+            async with limit:
+                return await self.backend.asearch(query)
+
+        outcomes = await asyncio.gather(*(one(query) for query in missing.values()), return_exceptions=True)
+        for (key, query), outcome in zip(missing.items(), outcomes):
+            results[key] = self._store(key, query, outcome)
+        return self._in_order(queries, results)
+
+    def stats(self) -> dict:
+        return {"backend": self.backend.name, "max_concurrency": self.max_concurrency, **self.cache.snapshot()}
+
+
+def format_results(results: List[Tuple[str, str]]) -> str:
+    return "\n\n".join(f"Results for '{query}':\n{text}" for query, text in results)
+
+
+# --- Shared Instance ---
+_search: Optional[WebSearch] = None
+_search_lock = threading.Lock()
+
+
+def get_web_search() -> WebSearch:
+    """The process-wide WebSearch, so every agent shares one client and one cache."""
+    global _search
+    if _search is None:
+        with _search_lock:
+            if _search is None:
+                _search = WebSearch()
+    return _search
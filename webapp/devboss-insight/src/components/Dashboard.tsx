@@ -1,10 +1,12 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { Progress } from '@/components/ui/progress';
+import { Button } from '@/components/ui/button';
+import { Textarea } from '@/components/ui/textarea';
 import { 
   Bot, GitBranch, Users, Eye, CheckCircle, Shield, FileText,
-  Activity, TrendingUp
+  Activity, TrendingUp, HelpCircle
 } from 'lucide-react';
 import { AgentCard } from './AgentCard';
 import { ProjectInput } from './ProjectInput';
@@ -18,12 +20,96 @@ export interface Agent {
 }
 export interface SystemMetrics {
   tasksCompleted: number; avgResolutionTime: string; successRate: number; activeProjects: number; currentLoad: number;
+  agentWorkload?: { name: string; value: number }[];
 }
 
+const API_BASE = 'http://localhost:8000';
+const POLL_INTERVAL_MS = 2000;
+// A run waiting for a human only moves once someone answers, so it is checked less often
+const WAITING_POLL_INTERVAL_MS = 10000;
+const METRICS_INTERVAL_MS = 10000;
+
+interface JobStatus {
+  job_id: string; status: 'queued' | 'running' | 'waiting_for_input' | 'succeeded' | 'failed' | 'cancelled';
+  result?: { raw?: string }; reward?: number; error?: string;
+}
+
+// A question an agent asked a human (GET /runs/{id}/questions)
+interface Question {
+  id: string; task?: string; question: string; answer?: string; pending: boolean;
+}
+
+// Polls GET /jobs/{id} until the job reaches a final state. `onStatus` hears every status change,
+// e.g. a run suspending to wait for an answer.
+const pollJob = async (jobId: string, onStatus?: (job: JobStatus) => void): Promise<JobStatus> => {
+  let last: JobStatus['status'] | undefined;
+  for (;;) {
+    const response = await fetch(`${API_BASE}/jobs/${jobId}`);
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status} - ${await response.text()}`);
+    }
+    const job: JobStatus = await response.json();
+    if (job.status !== last) onStatus?.(job);
+    last = job.status;
+    if (job.status === 'succeeded' || job.status === 'failed' || job.status === 'cancelled') {
+      return job;
+    }
+    const interval = job.status === 'waiting_for_input' ? WAITING_POLL_INTERVAL_MS : POLL_INTERVAL_MS;
+    await new Promise(resolve => setTimeout(resolve, interval));
+  }
+};
+
+// Maps backend agent roles to the names and colours used by the activity feed
+const AGENT_BY_ROLE: Record<string, { name: string; color: string }> = {
+  'Project Coordinator': { name: 'Coordinator', color: 'coordinator' },
+  'Task Allocator': { name: 'Allocator', color: 'allocator' },
+  'Progress Tracker': { name: 'Tracker', color: 'tracker' },
+  'Code Reviewer': { name: 'Reviewer', color: 'reviewer' },
+  'Conflict Resolver': { name: 'Resolver', color: 'resolver' },
+  'Reporting Specialist': { name: 'Reporter', color: 'reporter' },
+};
+
+interface RunEvent {
+  id: number; type: string; agent?: string; tool?: string; tool_input?: string;
+  thought?: string; output?: string; description?: string;
+}
+
+// The parts of GET /metrics/summary the dashboard renders
+interface MetricsSummary {
+  jobs: { success_rate: number; queued: number; running: number; duration_s: { mean?: number } };
+  tasks: { completed: number; by_agent: Record<string, { count: number; mean: number }> };
+}
+
+const formatDuration = (seconds?: number): string => {
+  if (!seconds) return '-';
+  if (seconds < 60) return `${seconds.toFixed(1)}s`;
+  if (seconds < 3600) return `${(seconds / 60).toFixed(1)}m`;
+  return `${(seconds / 3600).toFixed(1)}h`;
+};
+
+const toSystemMetrics = (summary: MetricsSummary): SystemMetrics => {
+  const agentSeconds = Object.entries(summary.tasks.by_agent).map(([role, stats]) => ({
+    name: AGENT_BY_ROLE[role]?.name ?? role, seconds: stats.count * stats.mean,
+  }));
+  const totalSeconds = agentSeconds.reduce((sum, agent) => sum + agent.seconds, 0);
+  return {
+    tasksCompleted: summary.tasks.completed,
+    avgResolutionTime: formatDuration(summary.jobs.duration_s.mean),
+    successRate: summary.jobs.success_rate,
+    activeProjects: summary.jobs.queued + summary.jobs.running,
+    currentLoad: summary.jobs.running,
+    agentWorkload: agentSeconds.map(agent => ({
+      name: agent.name, value: totalSeconds ? Math.round((100 * agent.seconds) / totalSeconds) : 0,
+    })),
+  };
+};
+
 const Dashboard: React.FC = () => {
   const [systemStatus, setSystemStatus] = useState<'running' | 'paused' | 'stopped'>('stopped');
   const [isLoading, setIsLoading] = useState(false);
   const [messages, setMessages] = useState<ActivityMessage[]>([]);
+  const [pendingQuestion, setPendingQuestion] = useState<{ runId: string; question: Question } | null>(null);
+  const [answer, setAnswer] = useState('');
   
   // Static data for display
   const agents: Agent[] = [
@@ -35,14 +121,84 @@ const Dashboard: React.FC = () => {
     { id: 'reporter', name: 'Reporter', role: 'Analytics & Reports', status: 'idle', icon: FileText, color: 'reporter', currentTask: 'Standby', lastActivity: 'Ready', performance: 92 }
   ];
   const [metrics, setMetrics] = useState<SystemMetrics>({
-    tasksCompleted: 147, avgResolutionTime: '2.3h', successRate: 94.2, activeProjects: 8, currentLoad: 0
+    tasksCompleted: 0, avgResolutionTime: '-', successRate: 0, activeProjects: 0, currentLoad: 0
   });
 
+  // Refresh the metrics panel from the backend's measurements
+  useEffect(() => {
+    const refresh = async () => {
+      try {
+        const response = await fetch(`${API_BASE}/metrics/summary`);
+        if (response.ok) setMetrics(toSystemMetrics(await response.json()));
+      } catch (error) {
+        console.error("Failed to load metrics:", error);
+      }
+    };
+    refresh();
+    const timer = setInterval(refresh, METRICS_INTERVAL_MS);
+    return () => clearInterval(timer);
+  }, []);
+
   const addMessage = (from: string, message: string, agentColor: string, type: ActivityMessage['type'] = 'communication') => {
     setMessages(prev => [{ id: Date.now().toString(), timestamp: new Date(), from, message, type, agentColor }, ...prev]);
   };
   
-  // SIMPLIFIED API Handler for the synchronous backend
+  // Streams live agent activity for a run over Server-Sent Events
+  const subscribeToRun = (runId: string): EventSource => {
+    const source = new EventSource(`${API_BASE}/runs/${runId}/events`);
+    const onEvent = (type: ActivityMessage['type'], describe: (event: RunEvent) => string) => (raw: MessageEvent) => {
+      const event: RunEvent = JSON.parse(raw.data);
+      const agent = (event.agent && AGENT_BY_ROLE[event.agent]) || { name: 'System', color: 'primary' };
+      addMessage(agent.name, describe(event), agent.color, type);
+    };
+    source.addEventListener('task_started', onEvent('status', e => `Started task: ${e.description}`));
+    source.addEventListener('tool_call', onEvent('action', e => `Using ${e.tool}: ${e.tool_input}`));
+    source.addEventListener('agent_step', onEvent('communication', e => e.output || e.thought || ''));
+    source.addEventListener('task_finished', onEvent('success', e => `Finished task: ${e.output}`));
+    source.addEventListener('run_finished', () => source.close());
+    return source;
+  };
+
+  // Shows the oldest question the suspended run is waiting on
+  const loadPendingQuestion = async (runId: string) => {
+    const response = await fetch(`${API_BASE}/runs/${runId}/questions`);
+    if (!response.ok) return;
+    const { questions }: { questions: Question[] } = await response.json();
+    const question = questions.find(q => q.pending);
+    setPendingQuestion(question ? { runId, question } : null);
+    if (question) {
+      addMessage('System', `The agents need your input: ${question.question}`, 'warning', 'alert');
+    }
+  };
+
+  // Answers the pending question; the run resumes once no question is left
+  const submitAnswer = async () => {
+    if (!pendingQuestion || !answer.trim()) return;
+    const { runId, question } = pendingQuestion;
+    try {
+      const response = await fetch(`${API_BASE}/runs/${runId}/answer`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ answer: answer.trim(), question_id: question.id }),
+      });
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status} - ${await response.text()}`);
+      }
+      const { resumed } = await response.json();
+      setAnswer('');
+      addMessage('System', resumed ? 'Answer sent, the run is resuming.' : 'Answer sent.', 'primary', 'status');
+      if (resumed) {
+        setPendingQuestion(null);
+        setSystemStatus('running');
+      } else {
+        await loadPendingQuestion(runId);
+      }
+    } catch (error) {
+      addMessage('System', `Could not send the answer: ${error instanceof Error ? error.message : String(error)}`, 'error', 'error');
+    }
+  };
+
+  // Submit the project as a job, then poll until the backend reports a final state
   const handleProjectSubmit = async (project: { query: string; file?: File }) => {
     setIsLoading(true);
     setSystemStatus('running');
@@ -50,7 +206,7 @@ const Dashboard: React.FC = () => {
     addMessage('System', `Submitting project: "${project.query}". Please wait, the agents are working...`, 'primary', 'status');
 
     try {
-        const response = await fetch('http://localhost:8000/run-project', {
+        const response = await fetch(`${API_BASE}/run-project`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ goal: project.query }),
@@ -61,8 +217,25 @@ const Dashboard: React.FC = () => {
             throw new Error(`HTTP error! status: ${response.status} - ${errorText}`);
         }
 
-        const data = await response.json();
-        const finalReport = data.result?.raw || "Project completed, but no detailed report was generated.";
+        const { job_id } = await response.json();
+        addMessage('System', `Project queued as job ${job_id}.`, 'primary', 'status');
+
+        const events = subscribeToRun(job_id);
+        const job = await pollJob(job_id, ({ status }) => {
+          if (status === 'waiting_for_input') {
+            setSystemStatus('paused');
+            loadPendingQuestion(job_id);
+          }
+        }).finally(() => events.close());
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'The crew failed to complete the project.');
+        }
+        if (job.status === 'cancelled') {
+            addMessage('System', 'Project execution was cancelled.', 'warning', 'alert');
+            return;
+        }
+
+        const finalReport = job.result?.raw || "Project completed, but no detailed report was generated.";
         
         addMessage('System', 'Project execution completed successfully!', 'success', 'success');
         addMessage('Reporter', finalReport, 'reporter', 'status');
@@ -73,6 +246,7 @@ const Dashboard: React.FC = () => {
     } finally {
         setIsLoading(false);
         setSystemStatus('stopped');
+        setPendingQuestion(null);
     }
   };
 
@@ -86,7 +260,7 @@ const Dashboard: React.FC = () => {
           </div>
           <Badge variant="secondary" className={`border-${isLoading ? 'success' : 'muted'} text-${isLoading ? 'success' : 'muted'}`}>
             <Activity className="h-3 w-3 mr-1" />
-            {isLoading ? 'RUNNING' : 'IDLE'}
+            {isLoading ? (pendingQuestion ? 'WAITING FOR INPUT' : 'RUNNING') : 'IDLE'}
           </Badge>
         </div>
       </div>
@@ -94,13 +268,26 @@ const Dashboard: React.FC = () => {
       <div className="grid grid-cols-12 gap-6">
         <div className="col-span-12 lg:col-span-4 space-y-6">
           <ProjectInput onSubmit={handleProjectSubmit} isLoading={isLoading} />
+          {pendingQuestion && (
+            <Card className="shadow-card">
+              <CardHeader>
+                <CardTitle className="flex items-center gap-2"><HelpCircle className="h-5 w-5 text-warning" />The agents need your input</CardTitle>
+                <CardDescription>The run is paused until you answer.</CardDescription>
+              </CardHeader>
+              <CardContent className="space-y-4">
+                <p className="text-sm">{pendingQuestion.question.question}</p>
+                <Textarea value={answer} onChange={e => setAnswer(e.target.value)} placeholder="Your answer..." />
+                <Button onClick={submitAnswer} disabled={!answer.trim()} className="w-full">Send answer</Button>
+              </CardContent>
+            </Card>
+          )}
           <Card className="shadow-card">
             <CardHeader><CardTitle className="flex items-center gap-2"><TrendingUp className="h-5 w-5 text-success" />Project Progress</CardTitle></CardHeader>
             <CardContent>
               {/* Progress bar will now show 0 or 100 */}
               <Progress value={isLoading ? 50 : (messages.length > 1 ? 100 : 0)} className="h-2" />
                <p className="text-xs text-center mt-2 text-muted-foreground">
-                {isLoading ? "Agents are processing..." : "Awaiting project."}
+                {isLoading ? (pendingQuestion ? "Waiting for your answer..." : "Agents are processing...") : "Awaiting project."}
                </p>
             </CardContent>
           </Card>
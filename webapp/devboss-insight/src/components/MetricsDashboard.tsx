@@ -60,6 +60,14 @@ const resolutionTimes = [
 ];
 
 export const MetricsDashboard: React.FC<MetricsDashboardProps> = ({ metrics }) => {
+  // Measured share of agent time from /metrics/summary once the backend has run something
+  const workload = metrics.agentWorkload?.length
+    ? metrics.agentWorkload.map(agent => ({
+        ...agent,
+        color: agentWorkload.find(sample => sample.name === agent.name)?.color ?? 'hsl(var(--primary))',
+      }))
+    : agentWorkload;
+
   return (
     <div className="space-y-6">
       {/* KPI Cards */}
@@ -190,7 +198,7 @@ export const MetricsDashboard: React.FC<MetricsDashboardProps> = ({ metrics }) =
             <ResponsiveContainer width="100%" height={300}>
               <PieChart>
                 <Pie
-                  data={agentWorkload}
+                  data={workload}
                   cx="50%"
                   cy="50%"
                   innerRadius={60}
@@ -199,7 +207,7 @@ export const MetricsDashboard: React.FC<MetricsDashboardProps> = ({ metrics }) =
                   stroke="hsl(var(--background))"
                   strokeWidth={2}
                 >
-                  {agentWorkload.map((entry, index) => (
+                  {workload.map((entry, index) => (
                     <Cell key={`cell-${index}`} fill={entry.color} />
                   ))}
                 </Pie>
@@ -213,7 +221,7 @@ export const MetricsDashboard: React.FC<MetricsDashboardProps> = ({ metrics }) =
               </PieChart>
             </ResponsiveContainer>
             <div className="grid grid-cols-2 gap-2 mt-4">
-              {agentWorkload.map((agent, index) => (
+              {workload.map((agent, index) => (
                 <div key={index} className="flex items-center gap-2">
                   <div 
                     className="w-3 h-3 rounded-full" 